@@ -11,6 +11,17 @@ INFLUX_READ_MEASUREMENT = "csi_measurement"
 
 INFLUX_TOKEN = "=="
 
+# ==============================================================================
+# 입력 소스 선택
+# ==============================================================================
+# "influx": InfluxDB에서 주기적으로 조회 (기본)
+# "mqtt"  : ESP32가 발행하는 MQTT 토픽을 직접 구독 (InfluxDB는 Mqtt/csi_data.py가 저장소로만 사용)
+DATA_SOURCE = "influx"
+
+MQTT_BROKER = "13.209.47.2"
+MQTT_PORT = 1883
+MQTT_TOPIC = "sensor/csi_measurement"
+
 # ==============================================================================
 # InfluxDB 설정 (결과 쓰기용)
 # ==============================================================================
@@ -30,12 +41,30 @@ SAMPLING_RATE = 60.0    # 센서 데이터 샘플링 레이트 (Hz)
 WINDOW_SECONDS = 4      # 1회 추론에 사용할 데이터 창 크기 (초)
 STEP_SECONDS = 3.0      # main.py 루프 주기 및 데이터 조회 간격 (초)
 
+# 증분 조회: 매 루프마다 WINDOW_SECONDS 전체를 다시 조회하지 않고, 마지막으로 받은 _time 이후(r._time > cursor)만
+# 조회해 로컬 버퍼에서 윈도우를 자름 (InfluxConnector.get_window). 비용을 실측하기 전까지는 기본값 False(기존 get_data).
+INFLUX_INCREMENTAL_FETCH = False
+# 배치 쓰기로 늦게 도착하는 행을 받기 위해 커서보다 앞에서부터 다시 조회하는 구간 (초). 0이면 커서 이후만 조회.
+# 비용: 0.5초마다 약 SAMPLING_RATE * 0.5 = 30행을 매 루프 다시 조회/pivot한 뒤 버림. STEP_SECONDS보다 훨씬 작게 (≤ 0.5초).
+INFLUX_FETCH_OVERLAP_SEC = 0.0
+
 # 초 단위를 데이터 포인트 개수로 자동 변환
 WINDOW_SIZE = int(SAMPLING_RATE * WINDOW_SECONDS) # 240
 STEP_SIZE = int(SAMPLING_RATE * STEP_SECONDS)     # 180
 MODEL_INPUT_SIZE = int(WINDOW_SECONDS * SAMPLING_RATE)
 RAW_CSI_COLUMN = "data"
 
+# 계산 정밀도: "float32"는 진폭(원본 I/Q는 int16)부터 DWT/PCA/FFT, 모델 입력까지 float32로 처리 (메모리 대역폭 절반).
+# "float64"는 기준 결과 비교용 (test/precision_parity.py). 타임스탬프는 항상 float64.
+PRECISION = "float32"
+
+# 프레임 진폭 캐시 크기(프레임 수). 겹치는 윈도우에서 같은 프레임을 한 번만 디코딩 (utils/frame_cache.py). 0이면 끔.
+AMP_CACHE_FRAMES = WINDOW_SIZE * 4
+
+# CSV 재생(main_csv_test.py): 파일 전체를 메모리에 올리지 않고 이 행 수씩 스트리밍 (몇 시간짜리 녹화 대비).
+# 파일이 시간 순서로 기록돼 있어야 함 (예: 50_000). None이면 기존처럼 전체를 읽어 정렬 (기본).
+CSV_CHUNK_ROWS = None
+
 # ==============================================================================
 # 모델 및 전처리 파라미터
 # ==============================================================================
@@ -59,10 +88,28 @@ PRESENCE_VARIANCE_THRESHOLD = 0.0000075
 # --- BPM 계산 파라미터 ---
 BPM_MIN_FREQ = 0.0  # 0 BPM
 BPM_MAX_FREQ = 1.0  # 60 BPM
+# 윈도우 BPM 추정 방식: "fft"(rfft 피크, 4초 윈도우에서 15 BPM 간격) 또는
+# "zoom"(BREATH_BPM_MIN~MAX 대역만 0.1 BPM 간격으로 계산 + 포물선 보간, signal_processing.calculate_bpm_zoom).
+# 4초 윈도우에는 호흡이 1회 정도라 zoom도 윈도우마다 흔들림 (test/bpm_zoom_compare.py). 8초 이상에서 효과가 큼
+BPM_ESTIMATOR = "fft"
+
+# 장기 호흡수 추정 (utils/breathing.py). True면 최근 BREATH_AGG_SECONDS 구간의 Welch PSD로 매 스텝 BPM을 계산
+# (4초 윈도우 FFT는 0.25 Hz = 15 BPM 해상도). 누적이 부족한 동안은 윈도우 FFT 결과를 사용합니다.
+BREATH_STREAMING = True
+BREATH_AGG_SECONDS = 30      # 권장 20~40초
+BREATH_WELCH_SECONDS = 10    # Welch 세그먼트 길이 (50% 겹침)
+BREATH_BPM_MIN = 6.0
+BREATH_BPM_MAX = 36.0
+BREATH_QUALITY_MIN = 4.0     # 피크 / 대역 중앙값. 이보다 낮으면 ok=False
 
 # --- 전처리 파라미터 ---
 PCA_COMPONENTS = 1
+PCA_METHOD = "eigh"        # "eigh" 또는 "power" (이전 윈도우 주성분에서 시작하는 power iteration, utils/pca.py)
+PCA_ALIGN_SIGN = True      # 주성분 부호를 이전 윈도우에 맞춤. False면 sklearn PCA와 같은 부호
 FILTER_RATIO = 0.05 # 5% 저역 통과 필터
+DENOISE_METHOD = "dwt"     # "dwt" 또는 "kalman" (채널별 칼만 필터, utils/signal_processing.kalman_denoise_matrix)
+KALMAN_MODE = "steady"     # "steady"(정상상태 이득, lfilter 한 번) 또는 "exact"(시간 가변 이득, 학습 전처리와 동일)
+KALMAN_Q_FACTOR = 0.01     # 프로세스 잡음 q = KALMAN_Q_FACTOR * r (r은 채널별 var(diff)/2)
 
 
 # ==============================================================================
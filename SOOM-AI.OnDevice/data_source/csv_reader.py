@@ -1,21 +1,67 @@
 # data_source/csv_reader.py
 
+import io
+
+import numpy as np
 import pandas as pd
 from typing import Iterator
 
+from utils.csi_codec import normalize_timestamp_column
+from data_source.session_archive import SessionArchive, is_archive
+
 class CSVReader:
     """
     Reads a large CSV file in chunks based on numerical time windows and strides.
     It returns chunks with a proper DatetimeIndex for convenient use.
+
+    `file_path` may also be a session archive directory (data_source/session_archive.py).
+    It is opened lazily (memory-mapped) and each chunk's 'data' column holds already
+    decoded int8 rows, so replays skip CSV and string parsing entirely.
+
+    With `chunk_rows`, the CSV is streamed instead of loaded: only the rows of the current
+    window plus one read chunk are kept in memory, which matters for multi-hour recordings
+    on the board. The file must then be recorded in time order (rows that arrive after a
+    window containing their timestamp was already yielded raise a ValueError, and the
+    window range is taken from the first and last rows); convert unsorted files to an
+    archive or load them without `chunk_rows`.
     """
-    def __init__(self, file_path: str, window_sec: float, step_sec: float, timestamp_col: str = 'real_timestamp'):
+    def __init__(self, file_path: str, window_sec: float, step_sec: float, timestamp_col: str = 'real_timestamp',
+                 chunk_rows: int | None = None):
         """
         Initializes the reader, loads the CSV, and creates a separate
         datetime index for later use without affecting the numerical timestamp column.
+
+        Args:
+            chunk_rows (int | None): stream the CSV this many rows at a time. None loads the whole file.
         """
+        self.timestamp_col = timestamp_col
+        self.window_sec = window_sec
+        self.step_sec = step_sec
+        self.archive = None
+        self.chunk_rows = chunk_rows
+
+        if is_archive(file_path):
+            print(f"Opening session archive {file_path}...")
+            self.archive = SessionArchive(file_path)
+            self.df = None
+            self.start_time = self.archive.timestamps[0]
+            self.end_time = self.archive.timestamps[-1]
+            print(f"Archive opened ({len(self.archive)} rows).")
+            self._timestamps = self.archive.timestamps
+            self._build_windows()
+            return
+
+        if chunk_rows:
+            self._open_stream(file_path)
+            return
+
         print(f"Loading data from {file_path}...")
         try:
             self.df = pd.read_csv(file_path)
+
+            # Accept both v1 (text) and v2 (packed, utils/csi_codec.py) exports.
+            # The 'data' column may mix both; it is decoded later by amp_phase_from_csi.
+            normalize_timestamp_column(self.df, timestamp_col)
             
             # --- ✨ [CHANGE 1] ---
             # Create a new column for the DatetimeIndex.
@@ -27,39 +73,145 @@ class CSVReader:
         except Exception as e:
             print(f"Error loading or processing CSV file: {e}")
             raise
-        
-        self.timestamp_col = timestamp_col
-        self.window_sec = window_sec
-        self.step_sec = step_sec
-        
+
         self.start_time = self.df[self.timestamp_col].min()
         self.end_time = self.df[self.timestamp_col].max()
 
+        # Keep the numerical column for the window search and set the DatetimeIndex once;
+        # every chunk is then a positional slice of this frame.
+        self._timestamps = self.df[self.timestamp_col].to_numpy(dtype=np.float64)
+        self.df.set_index('datetime_index', inplace=True)
+        self._build_windows()
+
+    def _window_starts(self) -> np.ndarray:
+        # Window starts are accumulated exactly like the old `start_time += step_sec` loop
+        # (np.cumsum adds sequentially), so the float boundaries are bit-for-bit the same.
+        n_max = int((self.end_time - self.start_time) / self.step_sec) + 2
+        starts = np.cumsum(np.r_[self.start_time, np.full(n_max, self.step_sec)])
+        return starts[starts < self.end_time]
+
+    def _build_windows(self):
+        """
+        Pre-computes every window as a [lo, hi) row range of the sorted timestamps
+        (start <= t < start + window_sec), so iterating is O(1) per window instead of
+        a boolean mask over the whole file.
+        """
+        self._starts = self._window_starts()
+        self._lo = np.searchsorted(self._timestamps, self._starts, side="left")
+        self._hi = np.searchsorted(self._timestamps, self._starts + self.window_sec, side="left")
+        self._next_window = 0
+
+    def _open_stream(self, file_path: str):
+        """
+        Streaming mode: the window starts come from the first and last timestamps of the
+        file (first chunk + a short read of the file tail), so nothing is scanned twice.
+        len() is therefore exact only for a file recorded in time order.
+        """
+        print(f"Opening {file_path} (streaming, {self.chunk_rows} rows per chunk)...")
+        self.df = None
+        self._chunks = pd.read_csv(file_path, chunksize=self.chunk_rows)
+        self._buf = None                # rows of the current window onward, indexed by datetime
+        self._buf_ts = np.empty(0)
+        self._eof = False
+        self._emitted_until = -np.inf   # end of the last yielded window
+
+        while not self._eof and len(self._buf_ts) == 0:
+            self._read_chunk()
+        if len(self._buf_ts) == 0:
+            raise ValueError(f"{file_path} has no timestamped rows")
+        self.start_time = self._buf_ts[0]
+        self.end_time = max(self._tail_timestamp(file_path), self._buf_ts[-1])
+        self._starts = self._window_starts()
+        self._next_window = 0
+
+    def _tail_timestamp(self, file_path: str, tail_bytes: int = 1 << 16) -> float:
+        """Largest timestamp among the last rows of the file (reads at most `tail_bytes`)."""
+        with open(file_path, "rb") as f:
+            header = f.readline()
+            body_start = f.tell()
+            f.seek(0, 2)
+            f.seek(max(body_start, f.tell() - tail_bytes))
+            partial = f.tell() > body_start
+            tail = f.read()
+        lines = tail.splitlines(keepends=True)
+        if partial:
+            lines = lines[1:]   # first line was cut by the seek
+        if not lines:
+            return -np.inf
+        part = pd.read_csv(io.BytesIO(header + b"".join(lines)))
+        ts = normalize_timestamp_column(part, self.timestamp_col).get(self.timestamp_col)
+        return float(ts.max()) if ts is not None and ts.notna().any() else -np.inf
+
+    def _read_chunk(self) -> bool:
+        """Appends the next CSV chunk to the stream buffer. False at end of file."""
+        try:
+            part = next(self._chunks)
+        except StopIteration:
+            self._eof = True
+            return False
+        normalize_timestamp_column(part, self.timestamp_col)
+        part = part[part[self.timestamp_col].notna()]
+        if part.empty:
+            return True
+        part = part.sort_values(by=self.timestamp_col, kind="stable")
+        if part[self.timestamp_col].iloc[0] < self._emitted_until:
+            raise ValueError(
+                "CSV is not in time order across chunks; load it without chunk_rows "
+                "or convert it with data_source.session_archive")
+        part.index = pd.DatetimeIndex(pd.to_datetime(part[self.timestamp_col], unit='s'), name='datetime_index')
+
+        if self._buf is not None and len(self._buf) and part[self.timestamp_col].iloc[0] < self._buf_ts[-1]:
+            # Small reordering across the chunk boundary: merge like the full-load sort would.
+            self._buf = pd.concat([self._buf, part]).sort_values(by=self.timestamp_col, kind="stable")
+        else:
+            self._buf = part if self._buf is None else pd.concat([self._buf, part])
+        self._buf_ts = self._buf[self.timestamp_col].to_numpy(dtype=np.float64)
+        return True
+
+    def _stream_chunk(self, start: float, end: float) -> pd.DataFrame:
+        # Rows are sorted, so once a row at/after `end` is buffered the window is complete.
+        while not self._eof and (len(self._buf_ts) == 0 or self._buf_ts[-1] < end):
+            self._read_chunk()
+        lo, hi = np.searchsorted(self._buf_ts, [start, end], side="left")
+        # Window starts only move forward: drop everything before this one.
+        self._buf, self._buf_ts = self._buf.iloc[lo:], self._buf_ts[lo:]
+        self._emitted_until = end
+        return self._buf.iloc[:hi - lo]
+
+    def __len__(self) -> int:
+        """Total number of windows (including empty ones), for progress bars."""
+        return len(self._starts)
+
     def __iter__(self) -> Iterator[pd.DataFrame]:
         """Returns the iterator object (self)."""
         return self
 
     def __next__(self) -> pd.DataFrame:
         """
-        Yields the next chunk of data, setting the datetime column as
-        the final index before returning.
+        Yields the next chunk of data, indexed by the datetime column.
+        CSV chunks are positional slices of the loaded frame (no copy) and must be
+        treated as read-only.
         """
-        current_window_end = self.start_time + self.window_sec
-        
-        if self.start_time >= self.end_time:
+        i = self._next_window
+        if i >= len(self._starts):
             raise StopIteration
-        
-        # Use fast numerical comparison on the original timestamp column
-        mask = (self.df[self.timestamp_col] >= self.start_time) & \
-               (self.df[self.timestamp_col] < current_window_end)
-        chunk_df = self.df.loc[mask].copy() # Use .copy() to avoid SettingWithCopyWarning
-        
-        # --- ✨ [CHANGE 2] ---
-        # Set the pre-made datetime column as the index on the final chunk
-        # before returning it. This is what main_csv_test.py expects.
-        chunk_df.set_index('datetime_index', inplace=True)
-        
-        # Move the start time for the next iteration
-        self.start_time += self.step_sec
-        
-        return chunk_df
\ No newline at end of file
+        self._next_window += 1
+        self.start_time = self._starts[i]
+        if self.chunk_rows and self.archive is None:
+            return self._stream_chunk(self.start_time, self.start_time + self.window_sec)
+        lo, hi = int(self._lo[i]), int(self._hi[i])
+
+        if self.archive is not None:
+            return self._archive_chunk(lo, hi)
+        return self.df.iloc[lo:hi]
+
+    def _archive_chunk(self, lo: int, hi: int) -> pd.DataFrame:
+        """Same window as the CSV path (rows [lo, hi)), read from the archive."""
+        window_ts = self._timestamps[lo:hi]
+        raw = self.archive.raw(lo, hi)
+        chunk_df = pd.DataFrame({
+            self.timestamp_col: window_ts,
+            'data': list(raw),
+        }, index=pd.to_datetime(window_ts, unit='s'))
+        chunk_df.index.name = 'datetime_index'
+        return chunk_df
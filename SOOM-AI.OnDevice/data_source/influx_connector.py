@@ -1,34 +1,56 @@
 import pandas as pd
 from influxdb_client import InfluxDBClient
 
+from utils.csi_codec import normalize_timestamp_column
+
 class InfluxConnector:
     def __init__(self, url, token, org):
         print(f"Connecting to InfluxDB... ({url})")
         self.client = InfluxDBClient(url=url, token=token, org=org)
         self.query_api = self.client.query_api()
+
+        # 증분 조회(get_window) 상태: 마지막으로 본 _time과 시간 인덱스 버퍼
+        self._cursor = None
+        self._buffer = None
         print("Connection to data source completed.")
 
     def get_data(self, bucket: str, measurement: str, interval_sec: int) -> pd.DataFrame | None:
         """
         InfluxDB에서 지정된 시간 간격만큼의 원본(raw) 데이터를 가져옵니다.
         데이터 파싱은 파이프라인에서 처리하므로, 여기서는 데이터를 그대로 전달합니다.
+        v1(문자열)과 v2(packed, utils/csi_codec.py) 형식이 섞여 있어도 같은 형태로 반환합니다.
         
         Returns:
             pd.DataFrame: DatetimeIndex를 가지고, 'real_timestamp'와 'data' 컬럼을
                           포함하는 데이터프레임. (csv_reader와 동일한 형식)
         """
+        return self._query(bucket, measurement, f"-{interval_sec}s")
+
+    def _query(self, bucket: str, measurement: str, range_start: str, after: str | None = None) -> pd.DataFrame | None:
+        """
+        CSI 필드를 조회해 get_data와 같은 형태의 데이터프레임으로 정리합니다.
+
+        Args:
+            range_start (str): Flux range의 start 값 (예: "-4s", "2025-10-05T12:00:00.000000Z")
+            after (str | None): 주어지면 _time이 이 시각보다 큰 행만 가져옵니다 (range start는 포함이므로 별도 필터).
+        """
+        time_filter = f'\n          |> filter(fn: (r) => r._time > time(v: "{after}"))' if after else ""
         # Flux 쿼리: _time을 기준으로 real_timestamp와 data 필드를 가져옵니다.
         query = f'''
         from(bucket: "{bucket}")
-          |> range(start: -{interval_sec}s)
+          |> range(start: {range_start}){time_filter}
           |> filter(fn: (r) => r._measurement == "{measurement}")
-          |> filter(fn: (r) => r._field == "data" or r._field == "real_timestamp")
+          |> filter(fn: (r) => r._field == "data" or r._field == "real_timestamp" or r._field == "real_ts")
           |> pivot(rowKey:["_time"], columnKey: ["_field"], valueColumn: "_value")
           |> sort(columns: ["_time"])
         '''
         try:
             df = self.query_api.query_data_frame(query=query)
 
+            # v1/v2 행은 csi_fmt 태그가 달라 서로 다른 테이블로 오며, 이때는 리스트로 반환됩니다.
+            if isinstance(df, list):
+                df = pd.concat(df, ignore_index=True) if df else pd.DataFrame()
+
             if df.empty:
                 return None
             
@@ -43,10 +65,10 @@ class InfluxConnector:
             if '_time' in df.columns:
                 df.rename(columns={'_time': 'datetime_index'}, inplace=True)
                 df.set_index('datetime_index', inplace=True)
+                df.sort_index(inplace=True)
 
-            # 3. real_timestamp 컬럼을 숫자 형식으로 변환 (안정성 확보)
-            if 'real_timestamp' in df.columns:
-                df['real_timestamp'] = pd.to_numeric(df['real_timestamp'])
+            # 3. real_timestamp 컬럼을 숫자 형식으로 변환 (v2의 real_ts도 여기로 합침)
+            normalize_timestamp_column(df, 'real_timestamp')
             
             # 최종적으로 파이프라인에 필요한 'data'와 'real_timestamp' 컬럼이 포함된 DF 반환
             return df
@@ -55,6 +77,49 @@ class InfluxConnector:
             print(f"Failed to read from InfluxDB: {e}")
             return None
 
+    def get_window(self, bucket: str, measurement: str, interval_sec: float, overlap_sec: float = 0.0) -> pd.DataFrame | None:
+        """
+        get_data의 증분(streaming) 버전입니다. 마지막으로 받은 _time(커서) 이후의 행만
+        (r._time > cursor) 조회해 로컬 버퍼(DatetimeIndex)에 붙이고, 버퍼에서 최신 interval_sec
+        구간을 잘라 반환합니다. 조회량은 루프 주기 동안 새로 쓰인 행 수만큼입니다.
+
+        overlap_sec > 0이면 커서보다 그만큼 앞에서부터 조회해, 배치 쓰기로 늦게 도착한 행도 받습니다.
+        겹친 구간은 매번 다시 조회/pivot된 뒤 버려지므로 STEP_SECONDS보다 훨씬 작게 유지해야 합니다.
+
+        Returns:
+            pd.DataFrame | None: get_data와 같은 형식. 새 행이 없으면 None.
+        """
+        if self._cursor is None:
+            new_df = self._query(bucket, measurement, f"-{interval_sec}s")
+        else:
+            since = self._cursor - pd.Timedelta(seconds=overlap_sec)
+            since = (since.tz_convert("UTC") if since.tzinfo else since).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+            new_df = self._query(bucket, measurement, since, after=since)
+
+        if new_df is not None and self._buffer is not None and overlap_sec > 0:
+            new_df = new_df[~new_df.index.isin(self._buffer.index)]
+        if new_df is None or new_df.empty:
+            return None
+
+        if self._buffer is None:
+            self._buffer = new_df
+        else:
+            self._buffer = pd.concat([self._buffer, new_df])
+            if not self._buffer.index.is_monotonic_increasing:
+                self._buffer.sort_index(inplace=True)
+        self._cursor = self._buffer.index[-1]
+
+        # 다음 조회의 중복 제거에 필요한 overlap_sec 구간까지만 남기고 오래된 행은 버림
+        horizon = pd.Timedelta(seconds=max(interval_sec, overlap_sec))
+        self._buffer = self._buffer[self._buffer.index > self._cursor - horizon]
+
+        return self._buffer[self._buffer.index > self._cursor - pd.Timedelta(seconds=interval_sec)]
+
+    def reset_cursor(self):
+        """증분 조회 상태를 비웁니다. 다음 get_window는 처음처럼 interval_sec 전체를 조회합니다."""
+        self._cursor = None
+        self._buffer = None
+
     def close(self):
         """DB 클라이언트 연결을 종료합니다."""
         self.client.close()
\ No newline at end of file
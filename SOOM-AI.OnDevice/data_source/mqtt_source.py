@@ -0,0 +1,130 @@
+# data_source/mqtt_source.py
+
+import json
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+from paho.mqtt.client import Client
+
+from utils.extract import NUM_CSI_VALUES, parse_csi_matrix
+from utils.sliding_window import SlidingWindow
+
+try:
+    # paho-mqtt 2.x는 콜백 API 버전을 명시해야 합니다.
+    from paho.mqtt.enums import CallbackAPIVersion
+except ImportError:  # paho-mqtt 1.x
+    CallbackAPIVersion = None
+
+
+class MqttCSISource:
+    """
+    MQTT(`sensor/csi_measurement`)를 직접 구독해 CSI 프레임을 메모리 버퍼에 쌓고,
+    step 간격마다 추론용 윈도우를 내주는 데이터 소스입니다.
+    InfluxDB를 거쳐 다시 조회하는 지연/중복 I/O 없이 동작하며, Influx는 저장소로만 남습니다.
+
+    메시지 형식은 ESP32 -> Mqtt/csi_data.py와 같습니다: {"real_timestamp": ..., "data": "[i,r,...]"}
+    (data는 v2 packed base64 문자열이어도 됩니다. utils/csi_codec.py 참고)
+    """
+    def __init__(self, broker: str, port: int, topic: str, window_size: int, step_size: int,
+                 client_id: str = "ondevice_csi_source"):
+        """
+        Args:
+            broker (str), port (int), topic (str): MQTT 접속 정보.
+            window_size (int): 한 윈도우의 프레임 수 (config.WINDOW_SIZE).
+            step_size (int): 윈도우 사이에 새로 들어와야 하는 프레임 수 (config.STEP_SIZE).
+        """
+        self.broker = broker
+        self.port = port
+        self.topic = topic
+
+        # 원본 I/Q 128개를 그대로 보관 (진폭 계산은 파이프라인에서)
+        self.window = SlidingWindow(window_size, step_size, n_features=NUM_CSI_VALUES, dtype=np.int16)
+
+        # 네트워크 스레드(on_message)는 JSON만 풀어 여기에 쌓고, 파싱은 소비 쪽에서 한 번에 처리
+        self._lock = threading.Lock()
+        self._has_data = threading.Condition(self._lock)
+        self._pending_ts = []
+        self._pending_data = []
+        self.received = 0
+        self.parse_errors = 0
+
+        if CallbackAPIVersion is not None:
+            self.client = Client(CallbackAPIVersion.VERSION2, client_id=client_id)
+        else:
+            self.client = Client(client_id=client_id)
+        self.client.on_connect = self._on_connect
+        self.client.on_message = self.on_message
+
+    def start(self):
+        """브로커에 접속하고 백그라운드 네트워크 스레드를 시작합니다."""
+        print(f"Connecting to MQTT broker... ({self.broker}:{self.port}, topic={self.topic})")
+        self.client.connect(self.broker, self.port)
+        self.client.loop_start()
+
+    def close(self):
+        self.client.loop_stop()
+        self.client.disconnect()
+
+    def _on_connect(self, client, userdata, flags, *args):
+        # 재접속할 때도 다시 구독
+        client.subscribe(self.topic)
+        print("MQTT subscription completed.")
+
+    def on_message(self, client, userdata, msg):
+        """프레임 하나를 수신 시각과 함께 대기 목록에 추가합니다."""
+        received_at = time.time()
+        try:
+            payload = json.loads(msg.payload)
+            data = payload["data"]
+        except (ValueError, KeyError, TypeError):
+            with self._lock:
+                self.parse_errors += 1
+            return
+        with self._has_data:
+            self._pending_ts.append(received_at)
+            self._pending_data.append(data)
+            self.received += 1
+            self._has_data.notify()
+
+    def _drain_pending(self):
+        """대기 중인 프레임을 한 번에 파싱해 윈도우 버퍼에 추가합니다."""
+        with self._lock:
+            ts, data = self._pending_ts, self._pending_data
+            self._pending_ts, self._pending_data = [], []
+        if not data:
+            return
+        raw, valid = parse_csi_matrix(pd.Series(data, dtype=object))
+        n_bad = int((~valid).sum())
+        if n_bad:
+            with self._lock:   # on_message(네트워크 스레드)도 증가시킴
+                self.parse_errors += n_bad
+        self.window.extend(raw[valid], np.asarray(ts)[valid])
+
+    def get_window(self, timeout: float | None = None) -> tuple[np.ndarray, np.ndarray] | None:
+        """
+        윈도우가 준비될 때까지(처음엔 window_size, 이후엔 step_size개의 새 프레임) 기다렸다가 반환합니다.
+
+        Returns:
+            tuple | None: timestamps (window_size,) 수신 시각(Unix 초), raw (window_size, 128) int16.
+                          timeout 안에 준비되지 않으면 None.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            self._drain_pending()
+            if self.window.is_ready():
+                timestamps = self.window.latest_timestamps(self.window.window_size).copy()
+                return timestamps, self.window.get_window(copy=True)
+
+            needed = self.window.window_size - self.window.current_size
+            with self._has_data:
+                while len(self._pending_data) < needed:
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        break
+                    self._has_data.wait(remaining)
+            if deadline is not None and time.monotonic() >= deadline:
+                self._drain_pending()
+                if not self.window.is_ready():
+                    return None
@@ -0,0 +1,213 @@
+# data_source/serial_reader.py
+#
+# Chunked serial CSI reader. The same file is copied to SOOM-EM.devices/csi_saver/serial_reader.py;
+# keep the two in sync.
+#
+# Supported line formats (one frame per line):
+#   csi_recv firmware / csi_saver : 140.017,"[0,0,-18,12,...]"               (timestamp_field=0)
+#   esp32-csi-tool CSI_DATA       : CSI_DATA,28415,...,140.017,128,0,"[...]"  (timestamp_field=13, line_prefix=b"CSI_DATA")
+
+import re
+import select
+import time
+import threading
+import numpy as np
+from typing import Callable, Iterator, Optional
+
+NUM_CSI_VALUES = 128
+
+# Exactly the first 128 integers inside the brackets (a row may carry more; they are ignored).
+# The lookahead stops the last number from being cut in half by backtracking.
+_CSI_VALUES_PATTERN = rb"\[[ \t]*((?:-?\d+[ \t]*,[ \t]*){%d}-?\d+)(?=[ \t]*[,\]])" % (NUM_CSI_VALUES - 1)
+
+
+def build_line_pattern(timestamp_field: Optional[int] = 0, line_prefix: bytes = b"",
+                       keep_text: bool = False) -> re.Pattern:
+    """
+    Compiles the multiline regex that matches one CSI frame per line.
+
+    Args:
+        timestamp_field (int | None): Index of the comma-separated field holding the
+            numeric timestamp. None if the line has no usable timestamp.
+        line_prefix (bytes): Lines must start with this (e.g. b"CSI_DATA"). Other lines are skipped.
+        keep_text (bool): Also capture the whole bracketed payload as sent ("[...]", all values).
+
+    Returns:
+        re.Pattern: Groups are (timestamp, values) or (values,) when timestamp_field is None.
+            With keep_text the payload group comes before values: (timestamp, payload, values).
+    """
+    head = rb"^[ \t]*" + re.escape(line_prefix)
+    if timestamp_field is None:
+        head += rb"[^\n\[]*"
+    else:
+        head += (rb"(?:[^,\n]*,){%d}" % timestamp_field) + rb'[ \t]*"?(-?\d+(?:\.\d*)?)"?[ \t]*,[^\n\[]*'
+    if keep_text:
+        return re.compile(head + rb"(" + _CSI_VALUES_PATTERN + rb"[^\]\n]*\])", re.MULTILINE)
+    return re.compile(head + _CSI_VALUES_PATTERN, re.MULTILINE)
+
+
+class SerialCSIReader:
+    """
+    Reads CSI frames from a serial port (or any object with `read(n)`, e.g. a pty,
+    socket.makefile('rb', buffering=0) or serial.serial_for_url("socket://...")).
+
+    Bytes are read in large chunks and every complete line in a chunk is parsed with a
+    single regex call plus one numpy conversion, instead of readline() + decode + parse
+    per frame. Frames are written into preallocated (batch_size, 128) int8 blocks and
+    handed out as (timestamps float64 (n,), raw int8 (n, 128)) batches, interleaved
+    Im/Re exactly like utils.extract.parse_csi_matrix. Every batch owns its block, so
+    consumers may keep it without copying.
+
+    With keep_text=True every batch also carries a third item: a list of
+    (timestamp token, payload) bytes per frame exactly as received, for writers that
+    store the original text instead of re-serializing the parsed values.
+    """
+    def __init__(self, port, batch_size: int = 256, chunk_size: int = 65536,
+                 timestamp_field: Optional[int] = 0, line_prefix: bytes = b"",
+                 flush_interval: float = 0.1, max_line_bytes: int = 8192, keep_text: bool = False):
+        """
+        Args:
+            port: Opened serial port or file-like object with read(n).
+            batch_size (int): Maximum frames per batch.
+            chunk_size (int): Maximum bytes per read call.
+            timestamp_field (int | None): See build_line_pattern. Missing timestamps are NaN.
+            line_prefix (bytes): See build_line_pattern.
+            flush_interval (float): A partially filled batch is emitted after this many seconds.
+            max_line_bytes (int): An unterminated tail longer than this is discarded (garbage/no newline).
+            keep_text (bool): Yield (timestamps, raw, texts) batches, see the class docstring.
+        """
+        self.port = port
+        self.batch_size = batch_size
+        self.chunk_size = chunk_size
+        self.flush_interval = flush_interval
+        self.max_line_bytes = max_line_bytes
+        self.has_timestamp = timestamp_field is not None
+        self.keep_text = keep_text
+        self.pattern = build_line_pattern(timestamp_field, line_prefix, keep_text)
+        self._stop = threading.Event()
+        self._is_serial = hasattr(port, "in_waiting")
+        try:
+            port.fileno()
+            self._selectable = not self._is_serial
+        except (AttributeError, OSError, ValueError):
+            # io.UnsupportedOperation is an OSError/ValueError subclass (e.g. io.BytesIO)
+            self._selectable = False
+
+        # counters
+        self.bytes_read = 0
+        self.frames = 0
+        self.skipped_lines = 0
+        self.batches = 0
+
+    def stop(self):
+        """Makes read_batches()/run() return after the current read."""
+        self._stop.set()
+
+    def _read_chunk(self) -> Optional[bytes]:
+        """Returns the next chunk, None when nothing arrived in time, or b"" at EOF (non-serial only)."""
+        port = self.port
+        if self._is_serial:
+            # pyserial: take whatever is buffered, otherwise block (up to the port timeout) for 1 byte
+            return port.read(min(max(port.in_waiting, 1), self.chunk_size)) or None
+        if self._selectable:
+            # pty / socket: wait at most flush_interval so partial batches still go out on time
+            ready, _, _ = select.select([port], [], [], self.flush_interval)
+            if not ready:
+                return None
+        return port.read(self.chunk_size)
+
+    def parse_lines(self, buf: bytes) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Parses complete lines in `buf` in one pass.
+
+        Returns:
+            tuple: timestamps float64 (n,), raw int16 (n, 128).
+                With keep_text also the list of (timestamp token, payload) bytes.
+        """
+        matches = self.pattern.findall(buf)
+        self.skipped_lines += buf.count(b"\n") - len(matches)
+        if not matches:
+            empty = np.empty(0), np.empty((0, NUM_CSI_VALUES), dtype=np.int16)
+            return empty + ([],) if self.keep_text else empty
+
+        if self.keep_text:
+            if not self.has_timestamp:
+                matches = [(b"",) + m for m in matches]
+            texts = [(m[0], m[1]) for m in matches]
+            matches = [(m[0], m[2]) for m in matches] if self.has_timestamp else [m[2] for m in matches]
+
+        if self.has_timestamp:
+            ts_parts, value_parts = zip(*matches)
+            ts = np.fromstring(b",".join(ts_parts), dtype=np.float64, sep=",")
+        else:
+            value_parts = matches
+            ts = np.full(len(matches), np.nan)
+        values = np.fromstring(b",".join(value_parts), dtype=np.int16, sep=",")
+        if self.keep_text:
+            return ts, values.reshape(-1, NUM_CSI_VALUES), texts
+        return ts, values.reshape(-1, NUM_CSI_VALUES)
+
+    def read_batches(self) -> Iterator[tuple[np.ndarray, np.ndarray]]:
+        """
+        Yields (timestamps, raw) batches until stop() is called or the stream hits EOF
+        (only for objects without `in_waiting`, where an empty read means EOF).
+        With keep_text the batches are (timestamps, raw, texts).
+        """
+        pending = b""
+        ts_block = np.empty(self.batch_size, dtype=np.float64)
+        raw_block = np.empty((self.batch_size, NUM_CSI_VALUES), dtype=np.int8)
+        text_block = []
+        filled = 0
+        batch_started = time.monotonic()
+
+        while not self._stop.is_set():
+            chunk = self._read_chunk()
+            eof = chunk == b""
+
+            if chunk:
+                self.bytes_read += len(chunk)
+                pending += chunk
+                cut = pending.rfind(b"\n")
+                if cut >= 0:
+                    ts, raw, *texts = self.parse_lines(pending[:cut + 1])
+                    pending = pending[cut + 1:]
+                    self.frames += len(ts)
+
+                    start = 0
+                    while start < len(ts):
+                        if filled == 0:
+                            batch_started = time.monotonic()
+                        take = min(self.batch_size - filled, len(ts) - start)
+                        ts_block[filled:filled + take] = ts[start:start + take]
+                        raw_block[filled:filled + take] = raw[start:start + take]
+                        if texts:
+                            text_block.extend(texts[0][start:start + take])
+                        filled += take
+                        start += take
+                        if filled == self.batch_size:
+                            self.batches += 1
+                            yield (ts_block, raw_block, text_block) if self.keep_text else (ts_block, raw_block)
+                            ts_block = np.empty(self.batch_size, dtype=np.float64)
+                            raw_block = np.empty((self.batch_size, NUM_CSI_VALUES), dtype=np.int8)
+                            text_block = []
+                            filled = 0
+                elif len(pending) > self.max_line_bytes:
+                    self.skipped_lines += 1
+                    pending = b""
+
+            if filled and (eof or time.monotonic() - batch_started >= self.flush_interval):
+                self.batches += 1
+                batch = ts_block[:filled], raw_block[:filled]
+                yield batch + (text_block,) if self.keep_text else batch
+                ts_block = np.empty(self.batch_size, dtype=np.float64)
+                raw_block = np.empty((self.batch_size, NUM_CSI_VALUES), dtype=np.int8)
+                text_block = []
+                filled = 0
+
+            if eof:
+                break
+
+    def run(self, callback: Callable[[np.ndarray, np.ndarray], None]):
+        """Calls callback(timestamps, raw) (plus texts with keep_text) for every batch. Blocks until stop() or EOF."""
+        for batch in self.read_batches():
+            callback(*batch)
@@ -0,0 +1,165 @@
+# data_source/session_archive.py
+#
+# Columnar archive for recorded sessions (e.g. SLEEP_1010.csv), so replays skip CSV/string parsing.
+#
+#   SLEEP_1010.csiarc/
+#     index.json        format/version, row count, time range, chunk list
+#     ts_00000.npy      (n,) float64 timestamps (seconds, same as real_timestamp), sorted
+#     csi_00000.npy     (n, 128) int8 raw CSI, interleaved Im/Re like utils.extract.parse_csi_matrix
+#                       (int16 for a chunk whose values do not fit in int8)
+#     ...
+#
+# Raw I/Q is stored instead of amplitudes: it is exact (the ESP32 values are int8), smaller than
+# float32 amplitudes (128 B vs 208 B per frame) and the amplitude/phase step is a cheap vectorized op.
+# Rows that could not be parsed are kept as zeros, exactly what amp_phase_from_csi produces for them.
+#
+# Convert (run from the SOOM-AI.OnDevice folder):
+#   python -m data_source.session_archive SLEEP_1010.csv            -> SLEEP_1010.csiarc/
+#   python -m data_source.session_archive SLEEP_1010.csv -o out.csiarc --chunk-rows 500000
+
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from utils.csi_codec import PACKED_TIMESTAMP_FIELD, normalize_timestamp_column
+from utils.extract import NUM_CSI_VALUES, parse_csi_matrix
+
+ARCHIVE_FORMAT = "soom-csi-archive"
+ARCHIVE_VERSION = 1
+INDEX_FILE = "index.json"
+
+
+def is_archive(path: str) -> bool:
+    return os.path.isfile(os.path.join(path, INDEX_FILE))
+
+
+class SessionArchive:
+    """
+    Lazily opened archive. Timestamps of all chunks are loaded (8 bytes/frame);
+    the CSI chunks are memory-mapped and only the requested rows are read.
+    """
+    def __init__(self, path: str):
+        with open(os.path.join(path, INDEX_FILE), "r", encoding="utf-8") as f:
+            self.index = json.load(f)
+        if self.index.get("format") != ARCHIVE_FORMAT:
+            raise ValueError(f"{path} is not a {ARCHIVE_FORMAT} directory")
+
+        self.path = path
+        chunks = self.index["chunks"]
+        self._raw = [np.load(os.path.join(path, c["csi"]), mmap_mode="r") for c in chunks]
+        ts = [np.load(os.path.join(path, c["ts"])) for c in chunks]
+        self.timestamps = np.concatenate(ts) if ts else np.empty(0)
+        # chunk i covers rows [_offsets[i], _offsets[i + 1])
+        self._offsets = np.concatenate([[0], np.cumsum([len(t) for t in ts])]).astype(np.int64)
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def raw(self, start: int, stop: int) -> np.ndarray:
+        """Rows [start, stop) as an (n, 128) array (a view when they sit in one chunk)."""
+        first = int(np.searchsorted(self._offsets, start, side="right")) - 1
+        parts = []
+        i = max(first, 0)
+        while start < stop and i < len(self._raw):
+            lo, hi = self._offsets[i], self._offsets[i + 1]
+            parts.append(self._raw[i][start - lo:min(stop, hi) - lo])
+            start = min(stop, hi)
+            i += 1
+        if not parts:
+            return np.empty((0, NUM_CSI_VALUES), dtype=np.int8)
+        return parts[0] if len(parts) == 1 else np.concatenate(parts)
+
+
+def _write_chunk(out_dir: str, i: int, ts: np.ndarray, raw: np.ndarray) -> dict:
+    ts_name, csi_name = f"ts_{i:05d}.npy", f"csi_{i:05d}.npy"
+    np.save(os.path.join(out_dir, ts_name), ts.astype(np.float64))
+    fits_int8 = raw.size == 0 or (raw.min() >= -128 and raw.max() <= 127)
+    raw = raw.astype(np.int8 if fits_int8 else np.int16)
+    np.save(os.path.join(out_dir, csi_name), raw)
+    return {"ts": ts_name, "csi": csi_name, "rows": int(len(ts)), "dtype": raw.dtype.name,
+            "t_start": float(ts[0]), "t_end": float(ts[-1])}
+
+
+def convert_csv(csv_path: str, out_dir: str, timestamp_col: str = "real_timestamp",
+                data_col: str = "data", chunk_rows: int = 250_000) -> dict:
+    """
+    Converts a recorded CSV into an archive directory and returns the index.
+    The CSV is read chunk by chunk; if the timestamps are not globally sorted the
+    chunks are merged and rewritten in timestamp order at the end.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    chunks = []
+    sorted_globally = True
+    usecols = (timestamp_col, data_col, PACKED_TIMESTAMP_FIELD)
+    for i, df in enumerate(pd.read_csv(csv_path, usecols=lambda c: c in usecols, chunksize=chunk_rows)):
+        normalize_timestamp_column(df, timestamp_col)
+        df = df[df[timestamp_col].notna()]
+        if df.empty:
+            continue
+        df = df.sort_values(by=timestamp_col, kind="stable")
+        raw, _ = parse_csi_matrix(df, data_col)
+        ts = df[timestamp_col].to_numpy(dtype=np.float64)
+        if chunks and ts[0] < chunks[-1]["t_end"]:
+            sorted_globally = False
+        chunks.append(_write_chunk(out_dir, len(chunks), ts, raw))
+        print(f"  chunk {i}: {len(ts)} rows")
+
+    if not sorted_globally:
+        print("  timestamps are not sorted across chunks, rewriting in order...")
+        ts = np.concatenate([np.load(os.path.join(out_dir, c["ts"])) for c in chunks])
+        raw = np.concatenate([np.load(os.path.join(out_dir, c["csi"])) for c in chunks])
+        order = np.argsort(ts, kind="stable")
+        for c in chunks:
+            os.remove(os.path.join(out_dir, c["ts"]))
+            os.remove(os.path.join(out_dir, c["csi"]))
+        chunks = [_write_chunk(out_dir, j, ts[order[k:k + chunk_rows]], raw[order[k:k + chunk_rows]])
+                  for j, k in enumerate(range(0, len(order), chunk_rows))]
+
+    index = {
+        "format": ARCHIVE_FORMAT,
+        "version": ARCHIVE_VERSION,
+        "source": os.path.basename(csv_path),
+        "timestamp_col": timestamp_col,
+        "rows": int(sum(c["rows"] for c in chunks)),
+        "t_start": chunks[0]["t_start"] if chunks else None,
+        "t_end": chunks[-1]["t_end"] if chunks else None,
+        "csi": {"values_per_row": NUM_CSI_VALUES, "layout": "interleaved Im/Re"},
+        "chunks": chunks,
+    }
+    # index.json is written last so an interrupted conversion is never mistaken for an archive
+    with open(os.path.join(out_dir, INDEX_FILE), "w", encoding="utf-8") as f:
+        json.dump(index, f, indent=2)
+    return index
+
+
+def read_timestamps(path: str, timestamp_col: str = "real_timestamp") -> pd.Series:
+    """Timestamps of a CSV file or an archive, without loading the CSI data."""
+    if is_archive(path):
+        return pd.Series(SessionArchive(path).timestamps, name=timestamp_col)
+    df = pd.read_csv(path, usecols=lambda c: c in (timestamp_col, PACKED_TIMESTAMP_FIELD))
+    return normalize_timestamp_column(df, timestamp_col)[timestamp_col]
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Convert a recorded CSI CSV into a memory-mappable session archive")
+    ap.add_argument("csv", help="recorded CSV (columns real_timestamp, data)")
+    ap.add_argument("-o", "--out", help="output directory (default: <csv name>.csiarc)")
+    ap.add_argument("--timestamp-col", default="real_timestamp")
+    ap.add_argument("--data-col", default="data")
+    ap.add_argument("--chunk-rows", type=int, default=250_000)
+    args = ap.parse_args()
+
+    out_dir = args.out or os.path.splitext(args.csv)[0] + ".csiarc"
+    print(f"Converting {args.csv} -> {out_dir}")
+    t0 = time.time()
+    index = convert_csv(args.csv, out_dir, args.timestamp_col, args.data_col, args.chunk_rows)
+    size_mb = sum(os.path.getsize(os.path.join(out_dir, name)) for name in os.listdir(out_dir)) / 1e6
+    print(f"Done: {index['rows']} rows, {len(index['chunks'])} chunks, {size_mb:.1f} MB in {time.time() - t0:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
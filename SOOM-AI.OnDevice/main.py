@@ -7,6 +7,31 @@ from pipeline.inference_pipeline import InferencePipeline
 from result_sink.influx_writer import InfluxWriter
 from logic.sleep_state_manager import SleepStateManager
 
+def handle_result(result, current_data_timestamp, sleep_manager, writer):
+    """Updates the sleep state, logs the result and writes it to InfluxDB."""
+    if result:
+        # 데이터의 타임스탬프를 SleepStateManager에 전달합니다.
+        current_sleep_state = sleep_manager.update_status(result, current_timestamp=current_data_timestamp)
+
+        # 4-2. 콘솔에 결과 출력
+        current_time_str = time.strftime('%Y-%m-%d %H:%M:%S')
+        print(
+            f"[{current_time_str}] Status: {result.get('status', 'N/A')}, "
+            f"Movement: {result.get('movement', 'N/A')} (Conf: {result.get('movement_conf', 0.0):.2f}), "
+            f"SleepState: {current_sleep_state}, "
+            f"BPM: {result.get('bpm', 0.0):.2f} (Conf: {result.get('bpm_conf', 0.0):.2f})"
+        )
+
+        # 4-3. AI 추론 결과를 InfluxDB에 저장
+        writer.write_result(
+            result=result
+        )
+    else:
+        # 추론 결과가 없을 때 로그를 남깁니다.
+        current_time_str = time.strftime('%Y-%m-%d %H:%M:%S')
+        print(f"[{current_time_str}] Data chunk processed, but no valid result was generated (e.g., insufficient data).")
+
+
 def main():
     """
     Main execution function.
@@ -17,12 +42,24 @@ def main():
     print("=" * 50)
 
     writer = None # Pre-declare for use in the finally block
+    connector = None
+    mqtt_source = None
     try:
         # --- 1. Initialize all components ---
-        print("[1/4] Connecting to Data Source (InfluxDB Reader)...")
-        connector = InfluxConnector(
-            url=config.INFLUX_READ_URL, token=config.INFLUX_TOKEN, org=config.INFLUX_READ_ORG
-        )
+        if config.DATA_SOURCE == "mqtt":
+            print("[1/4] Connecting to Data Source (MQTT direct)...")
+            # paho-mqtt는 MQTT 모드에서만 필요하므로 여기서 import
+            from data_source.mqtt_source import MqttCSISource
+            mqtt_source = MqttCSISource(
+                broker=config.MQTT_BROKER, port=config.MQTT_PORT, topic=config.MQTT_TOPIC,
+                window_size=config.WINDOW_SIZE, step_size=config.STEP_SIZE
+            )
+            mqtt_source.start()
+        else:
+            print("[1/4] Connecting to Data Source (InfluxDB Reader)...")
+            connector = InfluxConnector(
+                url=config.INFLUX_READ_URL, token=config.INFLUX_TOKEN, org=config.INFLUX_READ_ORG
+            )
 
         print("[2/4] Initializing Inference Pipeline...")
         pipeline = InferencePipeline(config)
@@ -51,14 +88,38 @@ def main():
         while True:
             loop_start_time = time.time()
 
+            if mqtt_source is not None:
+                # --- 2. Wait for the next window ---
+                # 새 프레임이 config.STEP_SIZE개 들어올 때마다 최신 config.WINDOW_SIZE개 윈도우가 나옵니다.
+                window = mqtt_source.get_window(timeout=config.WINDOW_SECONDS + config.STEP_SECONDS)
+                if window is None:
+                    print(f"[{time.strftime('%Y-%m-%d %H:%M:%S')}] No new data from MQTT. Waiting...")
+                    continue
+
+                # --- 3. Execute pipeline ---
+                timestamps, raw = window
+                result = pipeline.process_raw(timestamps, raw)
+                handle_result(result, float(timestamps[0]), sleep_manager, writer)
+                # 루프 주기는 데이터 도착 속도가 정하므로 별도로 쉬지 않습니다.
+                continue
+
             # --- 2. Fetch data ---
             # config.WINDOW_SECONDS (예: 4초) 만큼의 데이터를 가져옵니다.
             # 루프는 config.STEP_SECONDS (예: 2초) 마다 돌므로, 2초만큼 겹치는 슬라이딩 윈도우가 구현됩니다.
-            csi_df = connector.get_data(
-                bucket=config.INFLUX_READ_BUCKET,
-                measurement=config.INFLUX_READ_MEASUREMENT,
-                interval_sec=int(config.WINDOW_SECONDS)
-            )
+            if config.INFLUX_INCREMENTAL_FETCH:
+                # 새로 들어온 행만 조회하고, 커넥터의 버퍼에서 최신 윈도우를 자릅니다.
+                csi_df = connector.get_window(
+                    bucket=config.INFLUX_READ_BUCKET,
+                    measurement=config.INFLUX_READ_MEASUREMENT,
+                    interval_sec=config.WINDOW_SECONDS,
+                    overlap_sec=config.INFLUX_FETCH_OVERLAP_SEC
+                )
+            else:
+                csi_df = connector.get_data(
+                    bucket=config.INFLUX_READ_BUCKET,
+                    measurement=config.INFLUX_READ_MEASUREMENT,
+                    interval_sec=int(config.WINDOW_SECONDS)
+                )
 
             if csi_df is None or csi_df.empty:
                 print(f"[{time.strftime('%Y-%m-%d %H:%M:%S')}] No new data from InfluxDB. Waiting...")
@@ -69,30 +130,8 @@ def main():
             result = pipeline.process(csi_df)
 
             # --- 4. Process results ---
-            if result:
-                # 데이터의 타임스탬프를 SleepStateManager에 전달합니다.
-                # InfluxDB에서 온 데이터의 인덱스는 DatetimeIndex입니다.
-                current_data_timestamp = csi_df.index.min().timestamp()
-                current_sleep_state = sleep_manager.update_status(result, current_timestamp=current_data_timestamp)
-
-                # 4-2. 콘솔에 결과 출력
-                current_time_str = time.strftime('%Y-%m-%d %H:%M:%S')
-                print(
-                    f"[{current_time_str}] Status: {result.get('status', 'N/A')}, "
-                    f"Movement: {result.get('movement', 'N/A')} (Conf: {result.get('movement_conf', 0.0):.2f}), "
-                    f"SleepState: {current_sleep_state}, "
-                    f"BPM: {result.get('bpm', 0.0):.2f} (Conf: {result.get('bpm_conf', 0.0):.2f})"
-                )
-
-                # 4-3. AI 추론 결과를 InfluxDB에 저장
-                writer.write_result(
-                    result=result
-                )
-            else:
-                # 추론 결과가 없을 때 로그를 남깁니다.
-                current_time_str = time.strftime('%Y-%m-%d %H:%M:%S')
-                print(f"[{current_time_str}] Data chunk processed, but no valid result was generated (e.g., insufficient data).")
-
+            # InfluxDB에서 온 데이터의 인덱스는 DatetimeIndex입니다.
+            handle_result(result, csi_df.index.min().timestamp(), sleep_manager, writer)
 
             # --- 5. 루프 주기 조절 ---
             elapsed_time = time.time() - loop_start_time
@@ -106,8 +145,10 @@ def main():
     finally:
         if writer:
             writer.close()
-        if 'connector' in locals() and connector:
+        if connector:
             connector.close()
+        if mqtt_source:
+            mqtt_source.close()
         print("Shutting down the system.")
 
 
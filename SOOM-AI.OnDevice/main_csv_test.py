@@ -2,7 +2,6 @@
 
 import time
 import config
-import pandas as pd
 from tqdm import tqdm
 from data_source.csv_reader import CSVReader
 from pipeline.inference_pipeline import InferencePipeline
@@ -75,29 +74,30 @@ def main_test(csv_file_path: str):
                 )
 
                 timestamp_col = 'real_timestamp'
-                print(f"[3/4] Pre-calculating total chunks for progress bar...")
-                timestamps = pd.read_csv(csv_file_path, usecols=[timestamp_col])[timestamp_col]
-                total_duration_sec = timestamps.iloc[-1] - timestamps.iloc[0]
-                
+                # CSV 파일과 세션 아카이브(.csiarc 폴더) 모두 지원
+                print(f"[3/4] Initializing CSV Reader for file: {csv_file_path}...")
+                csv_reader = CSVReader(
+                    file_path=csv_file_path,
+                    window_sec=config.WINDOW_SECONDS,
+                    step_sec=config.STEP_SECONDS,
+                    timestamp_col=timestamp_col,
+                    chunk_rows=config.CSV_CHUNK_ROWS
+                )
+
+                # 윈도우 경계는 CSVReader가 미리 계산하므로 파일을 다시 읽지 않고 개수를 얻습니다.
+                print(f"[4/4] Counting chunks for progress bar...")
+                total_duration_sec = csv_reader.end_time - csv_reader.start_time
+
                 print("-" * 20)
-                print(f"🕒 First Timestamp: {timestamps.iloc[0]}")
-                print(f"🕒 Last Timestamp:  {timestamps.iloc[-1]}")
+                print(f"🕒 First Timestamp: {csv_reader.start_time}")
+                print(f"🕒 Last Timestamp:  {csv_reader.end_time}")
                 print(f"⏱️ Total Duration of CSV: {total_duration_sec:.2f} seconds")
                 print(f"✂️ Window Size (from config): {config.WINDOW_SECONDS} seconds")
                 print("-" * 20)
 
-                total_chunks = int((total_duration_sec - config.WINDOW_SECONDS) / config.STEP_SECONDS) + 1
-                if total_chunks < 0: total_chunks = 0
+                total_chunks = len(csv_reader)
                 print(f"Total chunks to process: {total_chunks}")
 
-                print(f"[4/4] Initializing CSV Reader for file: {csv_file_path}...")
-                csv_reader = CSVReader(
-                    file_path=csv_file_path,
-                    window_sec=config.WINDOW_SECONDS,
-                    step_sec=config.STEP_SECONDS,
-                    timestamp_col=timestamp_col
-                )
-
                 print("\n✅ All components initialized successfully.")
 
             except Exception as e:
@@ -132,6 +132,8 @@ def main_test(csv_file_path: str):
             print("\n" + "=" * 50)
             print(f"✅ CSV processing finished.")
             print(f"Processed {total_chunks} chunks in {end_time - start_time:.2f} seconds.")
+            if pipeline.amp_cache is not None:
+                print(f"Amplitude cache: {pipeline.amp_cache.stats()}")
             print("=" * 50)
             
             # --- [기존 main_test 로직 끝] ---
@@ -5,19 +5,48 @@ import pandas as pd
 from models.pytorch_handler import PyTorchModel
 # from models.tflite_handler import TFLiteModel
 from utils.rt_preprocess import RealtimePreprocessor
-from utils.signal_processing import calculate_bpm_from_signal
-from utils.extract import amp_phase_from_csi
+from utils.signal_processing import calculate_bpm_from_signal, calculate_bpm_zoom
+from utils.extract import parse_csi_matrix, amplitude_from_raw
+from utils.frame_cache import FrameAmplitudeCache
+from utils.breathing import StreamingBreathingEstimator
 
 class InferencePipeline:
     def __init__(self, config):
         print("Initializing pipeline...")
         self.config = config
+        # 진폭부터 모델 입력까지의 계산 정밀도 (타임스탬프는 항상 float64)
+        self.dtype = np.dtype(config.PRECISION)
         
         # Initialize utility classes
         self.preprocessor = RealtimePreprocessor(
             pca_components=config.PCA_COMPONENTS, 
-            filter_ratio=config.FILTER_RATIO
+            filter_ratio=config.FILTER_RATIO,
+            pca_method=config.PCA_METHOD,
+            pca_align_sign=config.PCA_ALIGN_SIGN,
+            dtype=self.dtype,
+            denoise=config.DENOISE_METHOD,
+            kalman_mode=config.KALMAN_MODE,
+            kalman_q_factor=config.KALMAN_Q_FACTOR
         )
+
+        # 겹치는 윈도우의 프레임을 다시 파싱하지 않도록 타임스탬프별 진폭 캐시 (0이면 사용 안 함)
+        self.amp_cache = (FrameAmplitudeCache(config.AMP_CACHE_FRAMES, dtype=self.dtype)
+                          if config.AMP_CACHE_FRAMES else None)
+
+        # 최근 BREATH_AGG_SECONDS 구간의 호흡수 추정기 (윈도우마다 새로 들어온 행만 추가)
+        self.breathing = None
+        if config.BREATH_STREAMING:
+            self.breathing = StreamingBreathingEstimator(
+                fs=config.SAMPLING_RATE,
+                agg_sec=config.BREATH_AGG_SECONDS,
+                welch_sec=config.BREATH_WELCH_SECONDS,
+                bpm_lo=config.BREATH_BPM_MIN,
+                bpm_hi=config.BREATH_BPM_MAX,
+                quality_min=config.BREATH_QUALITY_MIN,
+                gap_reset_sec=2 * config.WINDOW_SECONDS,
+                pca_method=config.PCA_METHOD,
+                dtype=self.dtype
+            )
         
         # self.movement_model = TFLiteModel(
         #     model_path=config.MOVEMENT_MODEL_PATH, 
@@ -34,13 +63,30 @@ class InferencePipeline:
         print("Pipeline initialization complete.")
 
     def _calculate_bpm(self, signal_1d: np.ndarray) -> dict:
-        """Calculates BPM from the resampled 1D signal."""
-        return calculate_bpm_from_signal(
-            signal_1d,
-            sampling_rate=self.config.SAMPLING_RATE,
-            min_freq=self.config.BPM_MIN_FREQ,
-            max_freq=self.config.BPM_MAX_FREQ
-        )
+        """
+        Calculates BPM from the streaming estimator when it has enough history,
+        otherwise from the resampled 1D signal of the current window.
+        """
+        if self.breathing is not None:
+            est = self.breathing.estimate()
+            if "bpm" in est:
+                return {"bpm": est["bpm"], "bpm_conf": est["bpm_conf"], "ok": est["ok"], "source": "stream"}
+        if self.config.BPM_ESTIMATOR == "zoom":
+            result = calculate_bpm_zoom(
+                signal_1d,
+                sampling_rate=self.config.SAMPLING_RATE,
+                min_freq=self.config.BREATH_BPM_MIN / 60.0,
+                max_freq=self.config.BREATH_BPM_MAX / 60.0
+            )
+        else:
+            result = calculate_bpm_from_signal(
+                signal_1d,
+                sampling_rate=self.config.SAMPLING_RATE,
+                min_freq=self.config.BPM_MIN_FREQ,
+                max_freq=self.config.BPM_MAX_FREQ
+            )
+        result["source"] = "window"
+        return result
 
     def process(self, raw_csi_df: pd.DataFrame) -> dict | None:
         """
@@ -49,33 +95,66 @@ class InferencePipeline:
         """
         try:
             # 1. CSI 데이터 파싱 (52개 서브캐리어 진폭 추출)
-            amp_matrix, _ = amp_phase_from_csi(raw_csi_df, column=self.config.RAW_CSI_COLUMN)
+            if self.amp_cache is not None:
+                # 이전 윈도우에서 이미 디코딩한 프레임은 캐시에서 가져옴 (위상은 쓰지 않으므로 계산하지 않음)
+                amp_matrix = self.amp_cache.amplitudes(raw_csi_df.index, raw_csi_df[self.config.RAW_CSI_COLUMN])
+            else:
+                raw, _ = parse_csi_matrix(raw_csi_df, column=self.config.RAW_CSI_COLUMN)
+                amp_matrix = amplitude_from_raw(raw, self.dtype)
 
             if amp_matrix.shape[0] == 0:
                 return None
 
-            # 평균을 내지 않고, 52개 채널 데이터를 리스트 형태로 변환합니다.
-            # 전처리기는 각 행에 배열이 들어있는 형태를 기대합니다.
-            amplitude_list = [row for row in amp_matrix]
-            
-            # 52개 채널 데이터를 그대로 담는 DataFrame을 생성합니다.
-            csi_df = pd.DataFrame({
-                'timestamp': raw_csi_df.index,
-                'amplitude': amplitude_list
-            })
-            
-            csi_df.dropna(inplace=True)
-            
-            if csi_df.empty:
-                return None
+            # 타임스탬프를 datetime에서 숫자(Unix timestamp)로 변환합니다. (NaT -> NaN)
+            index = raw_csi_df.index
+            if isinstance(index, pd.DatetimeIndex):
+                timestamps = np.where(index.isna(), np.nan, index.asi8 / 1e9)
+            else:
+                timestamps = np.asarray(index, dtype=np.float64)
+
+        except Exception as e:
+            print(f"Error: Data processing or parsing failed - {e}")
+            import traceback
+            traceback.print_exc() # 더 자세한 에러 로그를 보기 위해 추가
+            return None
 
-            # 타임스탬프를 datetime에서 숫자(Unix timestamp)로 변환합니다.
-            if pd.api.types.is_datetime64_any_dtype(csi_df['timestamp']):
-                csi_df['timestamp'] = csi_df['timestamp'].astype(np.int64) / 1e9
+        return self.process_arrays(timestamps, amp_matrix)
+
+    def process_raw(self, timestamps: np.ndarray, raw: np.ndarray) -> dict | None:
+        """
+        Runs the pipeline on already decoded frames (e.g. from data_source/mqtt_source.py).
+
+        Args:
+            timestamps (np.ndarray): (N,) Unix timestamps in seconds.
+            raw (np.ndarray): (N, 128) interleaved Im/Re CSI values.
+        """
+        if len(raw) == 0:
+            return None
+        return self.process_arrays(timestamps, amplitude_from_raw(raw, self.dtype))
+
+    def process_arrays(self, timestamps: np.ndarray, amp_matrix: np.ndarray) -> dict | None:
+        """
+        Preprocessing, presence check, movement and BPM without going through pandas.
+
+        Args:
+            timestamps (np.ndarray): (N,) Unix timestamps in seconds. Rows with NaN timestamps are dropped.
+            amp_matrix (np.ndarray): (N, 52) subcarrier amplitudes.
+        """
+        try:
+            timestamps = np.asarray(timestamps, dtype=np.float64)
+            valid = ~np.isnan(timestamps)
+            if not valid.all():
+                timestamps, amp_matrix = timestamps[valid], amp_matrix[valid]
+            if len(timestamps) == 0:
+                return None
 
             # 2. 전처리 (리샘플링, DWT, 정규화, PCA, 필터링)
-            # 이제 전처리기는 52개 채널 데이터를 받아 정상적으로 처리합니다.
-            preprocessed_signal = self.preprocessor.run(csi_df, self.config.MODEL_INPUT_SIZE)
+            preprocessed_signal = self.preprocessor.run_arrays(timestamps, amp_matrix, self.config.MODEL_INPUT_SIZE)
+
+            # 리샘플링 격자 위의 잡음제거된 진폭을 호흡수 추정기에 추가 (이전 윈도우와 겹치는 행은 무시됨)
+            if self.breathing is not None:
+                grid = np.linspace(timestamps.min(), timestamps.max(), self.config.MODEL_INPUT_SIZE)
+                self.breathing.push(grid, self.preprocessor.last_denoised)
         
         except Exception as e:
             print(f"Error: Data processing or parsing failed - {e}")
@@ -110,7 +189,8 @@ class InferencePipeline:
             "movement": movement_label,
             "movement_conf": float(confidence_score),
             "bpm": bpm_result.get("bpm"),
-            "bpm_conf": bpm_result.get("bpm_conf"),
-            "ok": bpm_result.get("ok")
+            "bpm_conf": float(bpm_result.get("bpm_conf", 0.0)),
+            "ok": bpm_result.get("ok"),
+            "bpm_source": bpm_result.get("source")
         }
         return final_result
\ No newline at end of file
@@ -0,0 +1,107 @@
+# bpm_zoom_compare.py
+# 윈도우 BPM 추정: calculate_bpm_from_signal(rfft 피크) vs calculate_bpm_zoom(zoom FFT + 포물선 보간)의
+# 정확도와 지연 시간을 비교합니다.
+#   - 녹화 CSV: 4초/3초 윈도우를 RealtimePreprocessor로 전처리한 신호. 정답 BPM이 없으므로 전체 녹화 구간을
+#     한 번에 본 장기 추정(StreamingBreathingEstimator, utils/breathing.py)을 기준으로 삼습니다.
+#   - 합성 신호: 알려진 BPM의 사인파 + 잡음, 여러 윈도우 길이.
+#
+# 사용 예시 (SOOM-AI.OnDevice 폴더에서 실행):
+#   python test/bpm_zoom_compare.py
+#   python test/bpm_zoom_compare.py --csv ../SOOM-AI/data/bpm/1005bpm.csv --runs 500
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+from data_source.csv_reader import CSVReader
+from utils.breathing import StreamingBreathingEstimator
+from utils.extract import parse_csi_matrix, amplitude_from_raw
+from utils.rt_preprocess import RealtimePreprocessor
+from utils.signal_processing import calculate_bpm_from_signal, calculate_bpm_zoom
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+F_LO, F_HI = config.BREATH_BPM_MIN / 60.0, config.BREATH_BPM_MAX / 60.0
+
+
+def rfft_bpm(x):
+    return calculate_bpm_from_signal(x, config.SAMPLING_RATE, F_LO, F_HI)["bpm"]
+
+
+def zoom_bpm(X):
+    return calculate_bpm_zoom(X, config.SAMPLING_RATE, F_LO, F_HI)["bpm"]
+
+
+def timeit(fn, runs: int) -> float:
+    fn()
+    start = time.perf_counter()
+    for _ in range(runs):
+        fn()
+    return (time.perf_counter() - start) / runs * 1000
+
+
+def recorded(csv_path: str, runs: int):
+    pre = RealtimePreprocessor(pca_components=config.PCA_COMPONENTS, filter_ratio=config.FILTER_RATIO,
+                               dtype=config.PRECISION)
+    est = StreamingBreathingEstimator(fs=config.SAMPLING_RATE, agg_sec=config.BREATH_AGG_SECONDS,
+                                      welch_sec=config.BREATH_WELCH_SECONDS, bpm_lo=config.BREATH_BPM_MIN,
+                                      bpm_hi=config.BREATH_BPM_MAX, dtype=config.PRECISION)
+    signals = []
+    for chunk in CSVReader(csv_path, window_sec=config.WINDOW_SECONDS, step_sec=config.STEP_SECONDS):
+        if len(chunk) < 2:
+            continue
+        ts = chunk.index.asi8 / 1e9
+        raw, _ = parse_csi_matrix(chunk, column=config.RAW_CSI_COLUMN)
+        signals.append(pre.run_arrays(ts, amplitude_from_raw(raw), config.MODEL_INPUT_SIZE).astype(np.float64))
+        est.push(np.linspace(ts.min(), ts.max(), config.MODEL_INPUT_SIZE), pre.last_denoised)
+    X = np.stack(signals)
+    ref = est.estimate()
+
+    old = np.array([rfft_bpm(x) for x in X])
+    new = zoom_bpm(X)
+    print(f"{csv_path}: {len(X)} windows of {X.shape[1]} samples")
+    if "bpm" in ref:
+        print(f"reference (long-horizon, {ref['n_segments']} Welch segments): {ref['bpm']:.2f} BPM\n")
+    print(f"{'win':>3} | {'rfft':>6} | {'zoom':>6}")
+    for i, (a, b) in enumerate(zip(old, new)):
+        print(f"{i:>3} | {a:6.2f} | {b:6.2f}")
+    if "bpm" in ref:
+        print(f"MAE vs reference: rfft {np.mean(np.abs(old - ref['bpm'])):.2f} | zoom {np.mean(np.abs(new - ref['bpm'])):.2f} BPM"
+              f" (mean rfft {old.mean():.2f}, zoom {new.mean():.2f})")
+
+    rfft_ms = timeit(lambda: [rfft_bpm(x) for x in X], runs) / len(X)
+    zoom_ms = timeit(lambda: [zoom_bpm(x) for x in X], runs) / len(X)
+    batch_ms = timeit(lambda: zoom_bpm(X), runs) / len(X)
+    print(f"latency per window: rfft {rfft_ms:.3f} ms | zoom {zoom_ms:.3f} ms | zoom batched ({len(X)}) {batch_ms:.3f} ms\n")
+
+
+def synthetic(n_windows: int = 200, noise: float = 0.3):
+    rng = np.random.default_rng(0)
+    print(f"synthetic sine + noise (std {noise}), {n_windows} windows per length, true BPM uniform 8~30")
+    for sec in (4, 8, 16, 30):
+        t = np.arange(int(sec * config.SAMPLING_RATE)) / config.SAMPLING_RATE
+        bpm = rng.uniform(8, 30, n_windows)
+        phase = rng.uniform(0, 2 * np.pi, n_windows)
+        X = np.sin(2 * np.pi * bpm[:, None] / 60 * t + phase[:, None]) + rng.normal(0, noise, (n_windows, len(t)))
+        old = np.array([rfft_bpm(x) for x in X])
+        new = zoom_bpm(X)
+        print(f"  {sec:>2} s window: MAE rfft {np.mean(np.abs(old - bpm)):5.2f} | zoom {np.mean(np.abs(new - bpm)):5.2f} BPM")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Compare rfft-peak and zoom-FFT BPM estimation")
+    ap.add_argument("--csv", default=os.path.join(ROOT, "..", "SOOM-AI", "data", "bpm", "1005bpm.csv"))
+    ap.add_argument("--runs", type=int, default=200)
+    args = ap.parse_args()
+
+    recorded(args.csv, args.runs)
+    synthetic()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+# breathing_stream_compare.py
+# 스트리밍 호흡수 추정기(utils/breathing.py)를, 매 스텝 버퍼 전체를 이어 붙여 PCA + scipy welch를 다시 계산하는
+# 기준 구현(SOOM-AI utils/breathing.BreathingRateEstimator의 PCA 경로)과 비교합니다.
+# 4초 윈도우 FFT(calculate_bpm_from_signal)의 BPM도 함께 출력합니다.
+#
+# 사용 예시 (SOOM-AI.OnDevice 폴더에서 실행):
+#   python test/breathing_stream_compare.py                       # 합성 데이터 (14 BPM, 120초)
+#   python test/breathing_stream_compare.py --bpm 17 --seconds 300
+#   python test/breathing_stream_compare.py --csv ../SOOM-AI/data/bpm/1005bpm.csv --agg 20
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+from scipy.signal import welch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+from utils.breathing import StreamingBreathingEstimator, _quality_from_psd
+from utils.extract import parse_csi_matrix, amplitude_from_raw
+from utils.rt_preprocess import RealtimePreprocessor
+from utils.signal_processing import calculate_bpm_from_signal, standardize_matrix
+from utils.pca import PCAEngine
+
+
+def csv_windows(path: str):
+    from data_source.csv_reader import CSVReader
+    for chunk in CSVReader(path, window_sec=config.WINDOW_SECONDS, step_sec=config.STEP_SECONDS):
+        if len(chunk) < 2:
+            continue
+        raw, _ = parse_csi_matrix(chunk, column=config.RAW_CSI_COLUMN)
+        yield chunk.index.asi8 / 1e9, amplitude_from_raw(raw)
+
+
+def synthetic_windows(bpm: float, seconds: float, seed: int = 0):
+    """수신 지터가 있는 60 Hz 진폭 스트림 (호흡 성분 + 잡음)을 4초/3초 윈도우로 자릅니다."""
+    rng = np.random.default_rng(seed)
+    n = int(seconds * config.SAMPLING_RATE)
+    t = 1.7e9 + np.sort(np.arange(n) + rng.uniform(-0.3, 0.3, n)) / config.SAMPLING_RATE
+    breath = np.sin(2 * np.pi * bpm / 60.0 * t)[:, None] * rng.uniform(0.2, 1.0, 52)
+    amp = 10 + breath + rng.normal(0, 0.6, (n, 52))
+    for s in range(0, n - config.WINDOW_SIZE + 1, config.STEP_SIZE):
+        yield t[s:s + config.WINDOW_SIZE], amp[s:s + config.WINDOW_SIZE]
+
+
+class BatchReference:
+    """매 스텝 np.concatenate + 전체 PCA + scipy welch (SOOM-AI 방식, 대역통과 제외)."""
+    def __init__(self, est: StreamingBreathingEstimator):
+        self.est = est
+        self.ts = np.empty(0)
+        self.rows = np.empty((0, 52))
+
+    def update(self, ts, rows) -> dict:
+        new = ts > self.ts[-1] if len(self.ts) else np.ones(len(ts), bool)
+        self.ts = np.concatenate([self.ts, ts[new]])[-self.est.max_rows:]
+        self.rows = np.concatenate([self.rows, rows[new]])[-self.est.max_rows:]
+        span = self.ts[-1] - self.ts[0]
+        if span < self.est.min_history_sec:
+            return {"ok": False, "reason": "insufficient_history"}
+        fs = (len(self.ts) - 1) / span
+        s = PCAEngine(n_components=1).fit_transform(standardize_matrix(self.rows))[:, 0]
+        f, Pxx = welch(s, fs=fs, nperseg=self.est.nperseg, noverlap=self.est.nperseg // 2, nfft=self.est.nfft)
+        q, f_peak, _ = _quality_from_psd(f, Pxx, self.est.f_lo, self.est.f_hi)
+        return {"ok": q >= self.est.quality_min, "bpm": f_peak * 60.0, "conf": q}
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Compare the streaming breathing estimator with a batch recompute")
+    ap.add_argument("--csv", help="recorded CSV (columns real_timestamp, data); synthetic stream if omitted")
+    ap.add_argument("--bpm", type=float, default=14.0, help="breathing rate of the synthetic stream")
+    ap.add_argument("--seconds", type=float, default=120.0, help="length of the synthetic stream")
+    ap.add_argument("--agg", type=float, default=config.BREATH_AGG_SECONDS)
+    ap.add_argument("--welch", type=float, default=min(config.BREATH_WELCH_SECONDS, 10.0))
+    args = ap.parse_args()
+
+    windows = csv_windows(args.csv) if args.csv else synthetic_windows(args.bpm, args.seconds)
+    pre = RealtimePreprocessor(pca_components=config.PCA_COMPONENTS, filter_ratio=config.FILTER_RATIO,
+                               dtype=config.PRECISION)
+    est = StreamingBreathingEstimator(fs=config.SAMPLING_RATE, agg_sec=args.agg, welch_sec=args.welch,
+                                      bpm_lo=config.BREATH_BPM_MIN, bpm_hi=config.BREATH_BPM_MAX,
+                                      quality_min=config.BREATH_QUALITY_MIN, dtype=config.PRECISION)
+    ref = BatchReference(est)
+
+    stream_ms, ref_ms, n = 0.0, 0.0, 0
+    print(f"{'step':>4} | {'window':>6} | {'stream':>14} | {'batch':>14}")
+    for i, (ts, amp) in enumerate(windows):
+        signal = pre.run_arrays(ts, amp, config.MODEL_INPUT_SIZE)
+        grid = np.linspace(ts.min(), ts.max(), config.MODEL_INPUT_SIZE)
+        rows = pre.last_denoised
+
+        t0 = time.perf_counter()
+        r_stream = est.update(grid, rows)
+        t1 = time.perf_counter()
+        r_ref = ref.update(grid, rows.astype(np.float64))
+        t2 = time.perf_counter()
+        stream_ms += (t1 - t0) * 1000
+        ref_ms += (t2 - t1) * 1000
+        n += 1
+
+        bpm_win = calculate_bpm_from_signal(signal, config.SAMPLING_RATE, config.BPM_MIN_FREQ, config.BPM_MAX_FREQ)["bpm"]
+        fmt = lambda r: f"{r['bpm']:6.2f} (q {r['conf']:5.1f})" if "bpm" in r else f"{r['reason'][:14]:>14}"
+        print(f"{i:>4} | {bpm_win:6.2f} | {fmt(r_stream)} | {fmt(r_ref)}")
+
+    if n:
+        print(f"\n{n} steps, stream {stream_ms / n:.3f} ms | batch {ref_ms / n:.3f} ms per update")
+        if not args.csv:
+            print(f"synthetic stream: true rate {args.bpm:.2f} BPM")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+# frame_cache_order.py
+# FrameAmplitudeCache(utils/frame_cache.py)에 타임스탬프가 정렬되지 않은 윈도우를 넣어도
+# 다시 조회할 때 모두 적중하고, 결과가 캐시 없는 디코딩과 같으며, 가장 오래된 프레임부터 제거되는지 확인합니다.
+# 실패하면 종료 코드 1.
+#
+# 사용 예시 (SOOM-AI.OnDevice 폴더에서 실행):
+#   python test/frame_cache_order.py
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.extract import parse_csi_matrix, amplitude_from_raw
+from utils.frame_cache import FrameAmplitudeCache
+
+
+def make_data(n: int, seed: int = 0) -> pd.Series:
+    """n개의 CSI 문자열 ("[i,r,...]", 128개 값)."""
+    rng = np.random.default_rng(seed)
+    vals = rng.integers(-60, 60, size=(n, 128))
+    return pd.Series(["[" + ",".join(map(str, row)) + "]" for row in vals])
+
+
+def main() -> int:
+    failures = []
+    keys = np.array([5, 3, 1, 4, 2, 6], dtype=np.float64)
+    data = make_data(len(keys))
+    expected = amplitude_from_raw(parse_csi_matrix(data)[0], np.float64)
+
+    cache = FrameAmplitudeCache(capacity=100)
+    first = cache.amplitudes(keys, data)
+    if np.any(np.diff(cache._keys) < 0):
+        failures.append(f"정렬되지 않은 키가 저장됨: {cache._keys}")
+    second = cache.amplitudes(keys, data)
+    if cache.hits != len(keys):
+        failures.append(f"두 번째 조회 적중 {cache.hits}/{len(keys)}")
+    if len(cache) != len(keys):
+        failures.append(f"캐시 크기 {len(cache)} (중복 삽입)")
+    if not (np.array_equal(first, expected) and np.array_equal(second, expected)):
+        failures.append("캐시 결과가 캐시 없는 디코딩과 다름")
+
+    # 이미 캐시가 있는 상태에서 섞인 배치를 넣고, 용량 초과 시 가장 작은 키부터 제거되는지 확인
+    cache = FrameAmplitudeCache(capacity=6)
+    cache.amplitudes(keys, data)
+    cache.amplitudes(np.array([9.0, 7.0, 8.0]), make_data(3, seed=1))
+    if not np.array_equal(cache._keys, [4, 5, 6, 7, 8, 9]):
+        failures.append(f"제거 순서가 틀림: {cache._keys}")
+
+    for f in failures:
+        print(f"❌ {f}")
+    if not failures:
+        print("✅ 정렬되지 않은 키 삽입/조회/제거 정상")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
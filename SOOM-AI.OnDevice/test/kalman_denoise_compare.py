@@ -0,0 +1,103 @@
+# kalman_denoise_compare.py
+# 채널별 칼만 잡음제거: 채널마다 파이썬 루프를 도는 기존 방식(SOOM-AI utils/kalman_filter.kalman_denoise_1d)과
+# 모든 채널을 한 번에 처리하는 utils/signal_processing.kalman_denoise_matrix(exact / steady)를 비교합니다.
+#   - 일치: exact는 기존 방식과 반올림 오차 수준, steady는 초기 과도 구간 이후 일치
+#   - 비용: 4초 윈도우(240 x 52)와 긴 구간(학습 전처리 크기) 처리 시간. DWT(dwt_denoise_matrix)도 함께 출력
+#
+# 사용 예시 (SOOM-AI.OnDevice 폴더에서 실행):
+#   python test/kalman_denoise_compare.py
+#   python test/kalman_denoise_compare.py --csv ../SOOM-AI/data/bpm/1005bpm.csv --q-factor 0.05
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+from utils.extract import parse_csi_matrix, amplitude_from_raw
+from utils.signal_processing import dwt_denoise_matrix, kalman_denoise_matrix, resample_linear
+
+
+def kalman_loop(X: np.ndarray, q_factor: float) -> np.ndarray:
+    """기존 방식: 열마다 1D 칼만 필터 (r = var(diff)/2, q = q_factor * r, x0 = z[0], P0 = r)."""
+    X = np.asarray(X, dtype=float)
+    Y = np.empty_like(X)
+    for j in range(X.shape[1]):
+        z = X[:, j]
+        r = max(np.var(np.diff(z), ddof=1) / 2.0, 1e-12) if len(z) >= 2 else 1.0
+        q = max(q_factor * r, 1e-12)
+        x, P = z[0], r
+        for t in range(len(z)):
+            P_pred = P + q
+            K = P_pred / (P_pred + r)
+            x = x + K * (z[t] - x)
+            P = (1.0 - K) * P_pred
+            Y[t, j] = x
+    return Y
+
+
+def timeit(fn, runs: int) -> float:
+    fn()
+    start = time.perf_counter()
+    for _ in range(runs):
+        fn()
+    return (time.perf_counter() - start) / runs * 1000
+
+
+def load_amplitudes(csv_path: str | None, seconds: float) -> np.ndarray:
+    """녹화 CSV 전체를 SAMPLING_RATE로 리샘플링한 (T, 52) 진폭. 없으면 합성 진폭 (호흡 + 잡음)."""
+    if csv_path:
+        from data_source.csv_reader import CSVReader
+        ts, amps = [], []
+        for chunk in CSVReader(csv_path, window_sec=config.WINDOW_SECONDS, step_sec=config.WINDOW_SECONDS):
+            if len(chunk) < 2:
+                continue
+            raw, _ = parse_csi_matrix(chunk, column=config.RAW_CSI_COLUMN)
+            ts.append(chunk.index.asi8 / 1e9)
+            amps.append(amplitude_from_raw(raw))
+        ts, amps = np.concatenate(ts), np.concatenate(amps)
+        return resample_linear(ts, amps, int((ts[-1] - ts[0]) * config.SAMPLING_RATE))
+    rng = np.random.default_rng(0)
+    n = int(seconds * config.SAMPLING_RATE)
+    t = np.arange(n) / config.SAMPLING_RATE
+    return 10 + np.sin(2 * np.pi * 0.25 * t)[:, None] * rng.uniform(0.2, 1.0, 52) + rng.normal(0, 0.6, (n, 52))
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Compare per-channel loop and vectorized Kalman denoising")
+    ap.add_argument("--csv", help="recorded CSV (columns real_timestamp, data); synthetic amplitudes if omitted")
+    ap.add_argument("--seconds", type=float, default=600.0, help="length of the synthetic stream")
+    ap.add_argument("--q-factor", type=float, default=0.01)
+    ap.add_argument("--runs", type=int, default=200)
+    args = ap.parse_args()
+
+    X = load_amplitudes(args.csv, args.seconds)
+    win = X[:config.WINDOW_SIZE]
+    print(f"amplitudes {X.shape}, window {win.shape}, q_factor {args.q_factor}\n")
+
+    for name, data, runs in (("window", win, args.runs), ("full", X, max(1, args.runs // 100))):
+        ref = kalman_loop(data, args.q_factor)
+        exact = kalman_denoise_matrix(data, q_factor=args.q_factor, mode="exact")
+        steady = kalman_denoise_matrix(data, q_factor=args.q_factor, mode="steady")
+        scale = np.max(np.abs(ref))
+        tail = int(2 * config.SAMPLING_RATE)  # 정상상태 이득과의 차이는 약 2초 안에 사라짐
+        print(f"[{name}] max rel |diff| vs loop: exact {np.max(np.abs(exact - ref)) / scale:.2e} | "
+              f"steady {np.max(np.abs(steady - ref)) / scale:.2e} (after {tail} samples "
+              f"{np.max(np.abs(steady - ref)[tail:]) / scale:.2e})")
+
+        loop_ms = timeit(lambda: kalman_loop(data, args.q_factor), 1)
+        data32 = data.astype(np.float32)
+        line = [f"loop {loop_ms:8.2f}"]
+        for mode in ("exact", "steady"):
+            ms = timeit(lambda: kalman_denoise_matrix(data32, q_factor=args.q_factor, mode=mode), runs)
+            line.append(f"{mode} {ms:7.3f}")
+        line.append(f"dwt {timeit(lambda: dwt_denoise_matrix(data32), runs):7.3f}")
+        print(f"[{name}] ms: " + " | ".join(line) + "  (vectorized/dwt in float32)\n")
+
+
+if __name__ == "__main__":
+    main()
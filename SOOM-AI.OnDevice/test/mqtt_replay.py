@@ -0,0 +1,71 @@
+# mqtt_replay.py
+# 녹화된 CSI CSV를 ESP32처럼 MQTT로 발행합니다. config.DATA_SOURCE = "mqtt" 모드를 실제 기기 없이 시험할 때 사용합니다.
+#
+# 사용 예시 (SOOM-AI.OnDevice 폴더에서 실행, 로컬 브로커 예: mosquitto -p 1883):
+#   python test/mqtt_replay.py --csv ../SOOM-AI/data/bpm/1005bpm.csv --broker localhost --rate 60
+#   # 다른 터미널에서 config.py의 DATA_SOURCE="mqtt", MQTT_BROKER="localhost"로 바꾸고
+#   python main.py
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import pandas as pd
+from paho.mqtt.client import Client
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+
+try:
+    from paho.mqtt.enums import CallbackAPIVersion
+except ImportError:  # paho-mqtt 1.x
+    CallbackAPIVersion = None
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Publish a recorded CSI CSV to MQTT like the ESP32 does")
+    ap.add_argument("--csv", required=True, help="recorded CSV (columns real_timestamp, data)")
+    ap.add_argument("--broker", default="localhost")
+    ap.add_argument("--port", type=int, default=config.MQTT_PORT)
+    ap.add_argument("--topic", default=config.MQTT_TOPIC)
+    ap.add_argument("--rate", type=float, default=config.SAMPLING_RATE, help="frames per second (<= 0: as fast as possible)")
+    ap.add_argument("--loops", type=int, default=1, help="how many times to replay the file")
+    args = ap.parse_args()
+
+    df = pd.read_csv(args.csv)
+    payloads = [json.dumps({"real_timestamp": str(ts), "data": data})
+                for ts, data in zip(df["real_timestamp"], df["data"])]
+
+    if CallbackAPIVersion is not None:
+        client = Client(CallbackAPIVersion.VERSION2, client_id="csi_mqtt_replay")
+    else:
+        client = Client(client_id="csi_mqtt_replay")
+    client.connect(args.broker, args.port)
+    client.loop_start()
+
+    print(f"[Replay] Publishing {len(payloads)} frames x {args.loops} to {args.broker}:{args.port} '{args.topic}' at {args.rate} Hz")
+    t0 = time.perf_counter()
+    sent = 0
+    try:
+        for _ in range(args.loops):
+            for payload in payloads:
+                client.publish(args.topic, payload)
+                sent += 1
+                if args.rate > 0:
+                    delay = t0 + sent / args.rate - time.perf_counter()
+                    if delay > 0:
+                        time.sleep(delay)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        elapsed = time.perf_counter() - t0
+        print(f"[Replay] {sent} frames in {elapsed:.1f}s ({sent / max(elapsed, 1e-9):.0f} frames/s)")
+        client.loop_stop()
+        client.disconnect()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+# precision_parity.py
+# 실시간 전처리를 float64(기준)와 float32(config.PRECISION)로 각각 돌려, 모델 입력 신호 / 움직임 확률 / BPM의
+# 차이가 허용 범위 안인지 확인합니다. 범위를 넘으면 종료 코드 1.
+# torch가 없거나 모델을 불러올 수 없으면 움직임 확률 비교는 건너뜁니다.
+#
+# 사용 예시 (SOOM-AI.OnDevice 폴더에서 실행):
+#   python test/precision_parity.py
+#   python test/precision_parity.py --csv ../SOOM-AI/data/bpm/1005bpm.csv --model test/best_traced.pt --prob-tol 1e-3
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+from data_source.csv_reader import CSVReader
+from utils.extract import parse_csi_matrix, amplitude_from_raw
+from utils.rt_preprocess import RealtimePreprocessor
+from utils.signal_processing import calculate_bpm_from_signal
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def load_model(path: str):
+    """TorchScript 모델을 불러옵니다. torch가 없거나 실패하면 None."""
+    try:
+        import torch
+        model = torch.jit.load(path, map_location="cpu")
+        model.eval()
+    except Exception as e:
+        print(f"움직임 확률 비교를 건너뜁니다 ({type(e).__name__}: {e})")
+        return None
+
+    def predict(signal: np.ndarray) -> np.ndarray:
+        # PyTorchModel.predict와 같은 입력 형태 [1, 1, T]
+        with torch.no_grad():
+            x = torch.from_numpy(np.ascontiguousarray(signal)).float().unsqueeze(0).unsqueeze(0)
+            return torch.softmax(model(x), dim=1).cpu().numpy()[0]
+    return predict
+
+
+def make_preprocessor(dtype) -> RealtimePreprocessor:
+    return RealtimePreprocessor(pca_components=config.PCA_COMPONENTS, filter_ratio=config.FILTER_RATIO,
+                                pca_method=config.PCA_METHOD, pca_align_sign=config.PCA_ALIGN_SIGN, dtype=dtype)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Check float32 vs float64 drift of the realtime pipeline")
+    ap.add_argument("--csv", default=os.path.join(ROOT, "..", "SOOM-AI", "data", "bpm", "1005bpm.csv"))
+    ap.add_argument("--model", default=os.path.join(ROOT, "test", "best_traced.pt"), help="TorchScript movement model")
+    ap.add_argument("--dtype", default=config.PRECISION, help="precision under test (default: config.PRECISION)")
+    ap.add_argument("--signal-tol", type=float, default=1e-3, help="max |diff| of the model input, relative to its peak")
+    ap.add_argument("--prob-tol", type=float, default=1e-3, help="max |diff| of movement probabilities")
+    ap.add_argument("--bpm-tol", type=float, default=0.0, help="max |diff| of BPM")
+    args = ap.parse_args()
+
+    reader = CSVReader(args.csv, window_sec=config.WINDOW_SECONDS, step_sec=config.STEP_SECONDS)
+    ref_pre, test_pre = make_preprocessor(np.float64), make_preprocessor(args.dtype)
+    predict = load_model(args.model)
+
+    worst = {"signal": 0.0, "prob": 0.0, "bpm": 0.0}
+    label_flips = n = 0
+    ref_ms = test_ms = 0.0
+    for chunk in reader:
+        if len(chunk) < 2:
+            continue  # 리샘플링에 샘플 2개 이상 필요
+        ts = chunk.index.asi8 / 1e9
+        raw, _ = parse_csi_matrix(chunk, column=config.RAW_CSI_COLUMN)
+
+        t0 = time.perf_counter()
+        ref = ref_pre.run_arrays(ts, amplitude_from_raw(raw, np.float64), config.MODEL_INPUT_SIZE)
+        t1 = time.perf_counter()
+        out = test_pre.run_arrays(ts, amplitude_from_raw(raw, args.dtype), config.MODEL_INPUT_SIZE)
+        t2 = time.perf_counter()
+        ref_ms += (t1 - t0) * 1000
+        test_ms += (t2 - t1) * 1000
+        n += 1
+
+        worst["signal"] = max(worst["signal"], float(np.max(np.abs(ref - out)) / (np.max(np.abs(ref)) + 1e-12)))
+        bpm_ref = calculate_bpm_from_signal(ref, config.SAMPLING_RATE)["bpm"]
+        bpm_out = calculate_bpm_from_signal(out, config.SAMPLING_RATE)["bpm"]
+        worst["bpm"] = max(worst["bpm"], abs(float(bpm_ref) - float(bpm_out)))
+        if predict is not None:
+            p_ref, p_out = predict(ref), predict(out)
+            worst["prob"] = max(worst["prob"], float(np.max(np.abs(p_ref - p_out))))
+            label_flips += int(np.argmax(p_ref) != np.argmax(p_out))
+
+    if n == 0:
+        print("비교할 윈도우가 없습니다.")
+        sys.exit(1)
+
+    print(f"{n} windows, float64 {ref_ms / n:.3f} ms | {args.dtype} {test_ms / n:.3f} ms per window")
+    print(f"  model input  max rel |diff| {worst['signal']:.2e} (tol {args.signal_tol:.0e})")
+    print(f"  bpm          max |diff|     {worst['bpm']:.2f} (tol {args.bpm_tol})")
+    if predict is not None:
+        print(f"  movement     max |diff|     {worst['prob']:.2e} (tol {args.prob_tol:.0e}), label flips {label_flips}")
+
+    failed = worst["signal"] > args.signal_tol or worst["bpm"] > args.bpm_tol
+    if predict is not None:
+        failed |= worst["prob"] > args.prob_tol
+    print("FAIL" if failed else "OK")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
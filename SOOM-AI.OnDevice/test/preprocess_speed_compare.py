@@ -0,0 +1,179 @@
+# preprocess_speed_compare.py
+# 전처리 단계별로 기존(참조) 구현과 현재 utils 구현의 결과 차이와 평균 실행 시간을 비교합니다.
+#
+# 사용 예시 (SOOM-AI.OnDevice 폴더에서 실행):
+#   python test/preprocess_speed_compare.py
+#   python test/preprocess_speed_compare.py --csv ../SOOM-AI/data/bpm/1005bpm.csv --runs 200
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+import pywt
+from scipy.interpolate import interp1d
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+from utils import signal_processing as sp
+from utils.pca import PCAEngine
+from utils.sliding_window import SlidingWindow
+from utils.extract import parse_csi_matrix, amp_phase_from_raw
+
+
+# --- 참조 구현 (변경 전 코드) ---
+def resample_interp1d_loop(timestamps, amplitudes, target_size):
+    """서브캐리어마다 interp1d를 만들던 기존 RealtimePreprocessor._resample_multichannel_signal."""
+    t = timestamps - timestamps[0]
+    new_t = np.linspace(t.min(), t.max(), target_size)
+    out = np.zeros((target_size, amplitudes.shape[1]))
+    for i in range(amplitudes.shape[1]):
+        out[:, i] = interp1d(t, amplitudes[:, i], kind='linear', fill_value="extrapolate")(new_t)
+    return out
+
+
+def dwt_denoise_matrix_loop(X, wavelet="db4", level=None, mode="symmetric", per_level_scale=0.85):
+    """서브캐리어(열)마다 wavedec/waverec를 반복하던 기존 구현."""
+    X = np.asarray(X, dtype=float)
+    T, Ns = X.shape
+    out = np.empty_like(X)
+    for k in range(Ns):
+        x = X[:, k]
+        w = pywt.Wavelet(wavelet)
+        lv = level if level is not None else max(1, pywt.dwt_max_level(T, w.dec_len))
+        coeffs = pywt.wavedec(x, wavelet=w, mode=mode, level=lv)
+        A, Ds = coeffs[0], coeffs[1:]
+        sigma = np.median(np.abs(Ds[-1] - np.median(Ds[-1]))) / 0.6745
+        base_tau = sigma * np.sqrt(2 * np.log(T))
+        new_Ds = []
+        for i, D in enumerate(Ds):
+            tau = base_tau * (per_level_scale ** ((len(Ds) - 1) - i))
+            new_Ds.append(np.sign(D) * np.maximum(np.abs(D) - tau, 0.0))
+        out[:, k] = pywt.waverec([A] + new_Ds, wavelet=w, mode=mode)[:T]
+    return out
+
+
+def fft_lowpass_filter_full(data_1d, cutoff_freq_ratio=0.05):
+    """복소 fft/ifft와 bool 마스크를 매번 만들던 기존 fft_lowpass_filter."""
+    T = data_1d.shape[0]
+    data_fft = np.fft.fft(data_1d)
+    cutoff_index = int(T * cutoff_freq_ratio)
+    mask = np.zeros(T, dtype=bool)
+    mask[:cutoff_index] = True
+    mask[T - cutoff_index:] = True
+    return np.real(np.fft.ifft(data_fft * mask))
+
+
+def load_windows(csv_path: str | None, window_size: int, n_windows: int) -> list[np.ndarray]:
+    """(window_size, 52) 진폭 윈도우 목록. CSV가 없으면 재현 가능한 합성 데이터를 사용합니다."""
+    if csv_path:
+        raw, valid = parse_csi_matrix(pd.read_csv(csv_path))
+        amp, _ = amp_phase_from_raw(raw[valid])
+        starts = range(0, max(len(amp) - window_size, 0) + 1, config.STEP_SIZE)
+        windows = [amp[s:s + window_size] for s in starts if s + window_size <= len(amp)]
+        if windows:
+            return windows[:n_windows]
+        print(f"{csv_path}에 윈도우를 만들 데이터가 부족해 합성 데이터를 사용합니다.")
+    rng = np.random.default_rng(0)
+    t = np.arange(window_size) / config.SAMPLING_RATE
+    breath = np.sin(2 * np.pi * 0.25 * t)[:, None]
+    return [10 + breath * rng.uniform(0.5, 2, 52) + rng.normal(0, 0.5, (window_size, 52))
+            for _ in range(n_windows)]
+
+
+def bench(fn, windows, runs: int) -> float:
+    """윈도우들을 돌아가며 runs번 호출한 평균 시간(ms)."""
+    for w in windows[:3]:
+        fn(w)  # 예열
+    start = time.perf_counter()
+    for i in range(runs):
+        fn(windows[i % len(windows)])
+    return (time.perf_counter() - start) / runs * 1000
+
+
+def compare(name, ref_fn, new_fn, windows, runs):
+    max_diff = max(float(np.max(np.abs(ref_fn(w) - new_fn(w)))) for w in windows)
+    ref_ms = bench(ref_fn, windows, runs)
+    new_ms = bench(new_fn, windows, runs)
+    print(f"{name:<12} ref {ref_ms:8.3f} ms | new {new_ms:8.3f} ms | x{ref_ms / new_ms:5.1f} | max|diff| {max_diff:.2e}")
+
+
+def compare_window_stats(stream: np.ndarray, window_size: int, step_size: int):
+    """겹치는 윈도우의 평균/표준편차/공분산: 매번 전체 재계산 vs SlidingWindow(track_stats=True) 누적 갱신."""
+    starts = range(0, len(stream) - window_size + 1, step_size)
+    if len(starts) < 2:
+        print("window_stats 스트림이 짧아 건너뜁니다.")
+        return
+
+    t0 = time.perf_counter()
+    ref = []
+    for s in starts:
+        W = stream[s:s + window_size]
+        ref.append((W.mean(axis=0), W.std(axis=0), np.cov(W.T)))
+    ref_ms = (time.perf_counter() - t0) / len(starts) * 1000
+
+    sw = SlidingWindow(window_size, step_size, n_features=stream.shape[1], dtype=np.float64, track_stats=True)
+    t0 = time.perf_counter()
+    new, pos = [], 0
+    for s in starts:
+        sw.extend(stream[pos:s + window_size])
+        pos = s + window_size
+        new.append((sw.stats.mean, sw.stats.std(), sw.stats.covariance()))
+        sw.get_window(copy=False)
+    new_ms = (time.perf_counter() - t0) / len(starts) * 1000
+
+    max_diff = max(float(np.max(np.abs(a - b))) for r, n in zip(ref, new) for a, b in zip(r, n))
+    name = f"stats_{window_size}"
+    print(f"{name:<12} ref {ref_ms:8.3f} ms | new {new_ms:8.3f} ms | x{ref_ms / new_ms:5.1f} | max|diff| {max_diff:.2e}")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Compare reference vs current preprocessing stages")
+    ap.add_argument("--csv", help="recorded CSV (columns real_timestamp, data); synthetic data if omitted")
+    ap.add_argument("--window-size", type=int, default=config.WINDOW_SIZE)
+    ap.add_argument("--windows", type=int, default=20)
+    ap.add_argument("--runs", type=int, default=100)
+    ap.add_argument("--stats-window", type=int, default=int(30 * config.SAMPLING_RATE),
+                    help="window length for the window_stats stage (longer BPM windows overlap more)")
+    args = ap.parse_args()
+
+    windows = load_windows(args.csv, args.window_size, args.windows)
+    print(f"{len(windows)} windows of shape {windows[0].shape}, {args.runs} runs per stage\n")
+
+    # 리샘플링: 수신 지터가 있는 타임스탬프(평균 SAMPLING_RATE)로 윈도우 길이 그대로 보간
+    rng = np.random.default_rng(1)
+    n = args.window_size
+    jittered = 1.7e9 + np.sort(np.arange(n) + rng.uniform(-0.4, 0.4, n)) / config.SAMPLING_RATE
+    compare("resample",
+            lambda w: resample_interp1d_loop(jittered, w, n),
+            lambda w: sp.resample_linear(jittered, w, n), windows, args.runs)
+    compare("dwt_denoise", dwt_denoise_matrix_loop, sp.dwt_denoise_matrix, windows, args.runs)
+
+    # PCA: 참조는 윈도우마다 만드는 sklearn PCA (비교를 위해 부호는 sklearn 규칙으로 맞춤)
+    from sklearn.decomposition import PCA
+    standardized = [sp.standardize_matrix(sp.dwt_denoise_matrix(w)) for w in windows]
+    for method in ("eigh", "power"):
+        engine = PCAEngine(n_components=1, method=method, align_sign=False)
+        compare(f"pca_{method}", lambda w: PCA(n_components=1).fit_transform(w), engine.fit_transform,
+                standardized, args.runs)
+
+    # 저역 통과 필터: 윈도우별 1차원 PCA 신호, 그리고 모든 윈도우를 (B, T) 한 번에
+    signals = [PCAEngine(n_components=1).fit_transform(w)[:, 0] for w in standardized]
+    lowpass = sp.FFTLowpassFilter(config.FILTER_RATIO)
+    compare("lowpass", lambda x: fft_lowpass_filter_full(x, config.FILTER_RATIO), lowpass, signals, args.runs)
+    batch = [np.stack(signals)]
+    compare("lowpass_bat", lambda X: np.stack([fft_lowpass_filter_full(x, config.FILTER_RATIO) for x in X]),
+            lambda X: lowpass(X, axis=1), batch, max(args.runs // len(signals), 1))
+
+    # 윈도우 통계: 윈도우들을 이어 붙인 스트림 위에서 STEP_SIZE씩 이동.
+    # 누적 갱신은 step*2개 행을 다루므로 window가 step에 비해 길수록 이득이 큼 (4초/3초 윈도우에서는 비슷함)
+    stream = np.concatenate(windows)
+    compare_window_stats(stream, args.window_size, config.STEP_SIZE)
+    compare_window_stats(stream, args.stats_window, config.STEP_SIZE)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+# serial_replay.py
+# 녹화된 CSI CSV를 가상 시리얼(pty) 또는 TCP 소켓으로 일정한 속도로 재생합니다.
+# ESP32 없이 data_source/serial_reader.py, csi_saver.py, visualize/realtime_visualization.py를 시험할 때 사용합니다.
+#
+# 사용 예시 (SOOM-AI.OnDevice 폴더에서 실행):
+#   # pty로 재생 -> 출력되는 /dev/pts/N 을 SERIAL_PORT / --port 로 지정
+#   python test/serial_replay.py --csv ../SOOM-AI/data/bpm/1005bpm.csv --rate 60
+#
+#   # TCP로 재생 -> serial.serial_for_url("socket://localhost:5555") 로 접속
+#   python test/serial_replay.py --csv ../SOOM-AI/data/bpm/1005bpm.csv --mode tcp --tcp-port 5555
+#
+#   # 재생 + SerialCSIReader로 다시 읽어서 parse_csi_matrix 결과와 비교, 처리량 측정
+#   python test/serial_replay.py --csv ../SOOM-AI/data/bpm/1005bpm.csv --rate 0 --self-test
+#
+# --line-format
+#   saver    : 140.017,"[0,0,-18,...]"      (csi_recv 펌웨어 출력, csi_saver.py 입력)
+#   csi_data : CSV 원본 줄 그대로            (esp32-csi-tool CSI_DATA, 시각화 스크립트 입력)
+
+import argparse
+import os
+import socket
+import sys
+import threading
+import time
+import tty
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data_source.serial_reader import SerialCSIReader
+from utils.extract import parse_csi_matrix
+
+
+def load_lines(csv_path: str, line_format: str) -> tuple[list[bytes], pd.DataFrame]:
+    """CSV를 읽어 재생할 줄 목록과 원본 데이터프레임을 반환합니다."""
+    df = pd.read_csv(csv_path)
+    if line_format == "saver":
+        lines = [f'{ts},"{data}"\n'.encode() for ts, data in zip(df["real_timestamp"], df["data"])]
+    else:
+        with open(csv_path, "rb") as f:
+            lines = [line.rstrip(b"\r\n") + b"\n" for line in f.readlines()[1:] if line.strip()]
+    return lines, df
+
+
+def replay(write, lines: list[bytes], rate: float, loops: int, burst: int = 8):
+    """
+    rate(Hz) 속도로 줄을 씁니다. rate <= 0 이면 가능한 한 빠르게 씁니다.
+    시간 오차가 쌓이지 않도록 절대 시각 기준으로 burst 줄씩 보냅니다.
+    """
+    t0 = time.perf_counter()
+    sent = 0
+    for _ in range(loops):
+        for start in range(0, len(lines), burst):
+            write(b"".join(lines[start:start + burst]))
+            sent += len(lines[start:start + burst])
+            if rate > 0:
+                delay = t0 + sent / rate - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+    elapsed = time.perf_counter() - t0
+    print(f"[Replay] {sent} lines in {elapsed:.2f}s ({sent / max(elapsed, 1e-9):.0f} lines/s)")
+
+
+def open_pty() -> tuple[int, int, str]:
+    master, slave = os.openpty()
+    tty.setraw(slave)
+    return master, slave, os.ttyname(slave)
+
+
+def write_all_fd(fd: int):
+    def _write(data: bytes):
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+    return _write
+
+
+def self_test(args, lines: list[bytes], df: pd.DataFrame):
+    """pty로 재생한 데이터를 SerialCSIReader로 읽어 CSV 직접 파싱 결과와 비교합니다."""
+    master, slave, name = open_pty()
+    print(f"[Self-test] Replaying {len(lines)} lines x {args.loops} through {name}")
+
+    if args.line_format == "saver":
+        reader_kwargs = dict(timestamp_field=0)
+    else:
+        reader_kwargs = dict(timestamp_field=df.columns.get_loc("real_timestamp"), line_prefix=b"CSI_DATA")
+
+    port = open(name, "rb", buffering=0)
+    reader = SerialCSIReader(port, batch_size=args.batch_size, **reader_kwargs)
+    got_ts, got_raw = [], []
+
+    def collect(ts, raw):
+        got_ts.append(ts)
+        got_raw.append(raw)
+        if sum(len(r) for r in got_raw) >= expected_frames:
+            reader.stop()
+
+    expected_raw, valid = parse_csi_matrix(df)
+    expected_ts = df["real_timestamp"].to_numpy(dtype=np.float64)[valid]
+    expected_raw = expected_raw[valid]
+    expected_frames = len(expected_raw) * args.loops
+
+    consumer = threading.Thread(target=reader.run, args=(collect,), daemon=True)
+    consumer.start()
+    t0 = time.perf_counter()
+    replay(write_all_fd(master), lines, args.rate, args.loops)
+    consumer.join(timeout=10)
+    elapsed = time.perf_counter() - t0
+    os.close(master)
+    port.close()
+    os.close(slave)
+
+    ts = np.concatenate(got_ts) if got_ts else np.empty(0)
+    raw = np.concatenate(got_raw) if got_raw else np.empty((0, 128), dtype=np.int8)
+    ok = (len(raw) == expected_frames
+          and np.array_equal(raw.astype(np.int16), np.tile(expected_raw, (args.loops, 1)))
+          and np.allclose(ts, np.tile(expected_ts, args.loops)))
+    print(f"[Self-test] frames={reader.frames} (expected {expected_frames}) batches={reader.batches} "
+          f"skipped_lines={reader.skipped_lines} bytes={reader.bytes_read}")
+    print(f"[Self-test] {reader.frames / max(elapsed, 1e-9):.0f} frames/s end-to-end")
+    print("[Self-test] ✅ parsed frames match parse_csi_matrix" if ok else "[Self-test] ❌ mismatch")
+    return ok
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Replay a recorded CSI CSV over a pty or TCP socket")
+    ap.add_argument("--csv", required=True, help="recorded CSV (columns real_timestamp, data)")
+    ap.add_argument("--rate", type=float, default=60.0, help="lines per second (<= 0: as fast as possible)")
+    ap.add_argument("--loops", type=int, default=1, help="how many times to replay the file")
+    ap.add_argument("--mode", choices=["pty", "tcp"], default="pty")
+    ap.add_argument("--tcp-port", type=int, default=5555)
+    ap.add_argument("--line-format", choices=["saver", "csi_data"], default="saver")
+    ap.add_argument("--batch-size", type=int, default=256, help="reader batch size for --self-test")
+    ap.add_argument("--self-test", action="store_true", help="read the replay back with SerialCSIReader and compare")
+    args = ap.parse_args()
+
+    lines, df = load_lines(args.csv, args.line_format)
+
+    if args.self_test:
+        sys.exit(0 if self_test(args, lines, df) else 1)
+
+    if args.mode == "pty":
+        master, slave, name = open_pty()
+        print(f"[Replay] Serial stand-in ready: {name}")
+        input("[Replay] Open the port on the reader side, then press Enter to start...")
+        try:
+            replay(write_all_fd(master), lines, args.rate, args.loops)
+        finally:
+            os.close(master)
+            os.close(slave)
+    else:
+        with socket.create_server(("0.0.0.0", args.tcp_port)) as server:
+            print(f"[Replay] Waiting for a client on tcp://0.0.0.0:{args.tcp_port} ...")
+            conn, addr = server.accept()
+            print(f"[Replay] Client connected: {addr}")
+            with conn:
+                replay(conn.sendall, lines, args.rate, args.loops)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+# spectral_tracker_compare.py
+# utils/spectral_tracker.SlidingDFTTracker(호흡 대역 빈만 샘플마다 갱신)를
+# 스텝마다 윈도우 전체 rfft를 하는 calculate_bpm_from_signal과 비교합니다.
+#   - 정확도: 합성 호흡 신호(알려진 BPM)에서의 추정값
+#   - 일치: 추적 중인 빈 vs 같은 구간을 직접 계산한 DFT
+#   - 비용: 샘플 블록(STEP_SIZE)당 갱신 시간
+#
+# 사용 예시 (SOOM-AI.OnDevice 폴더에서 실행):
+#   python test/spectral_tracker_compare.py
+#   python test/spectral_tracker_compare.py --bpm 13.7 --window 40 --seconds 600
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+from utils.signal_processing import calculate_bpm_from_signal
+from utils.spectral_tracker import SlidingDFTTracker
+
+
+def direct_spectrum(tracker: SlidingDFTTracker, history: np.ndarray) -> np.ndarray:
+    """tracker와 같은 정의(가장 최근 샘플 기준 위상, 평균 제거, hann)로 최근 N개 샘플의 DFT를 직접 계산."""
+    x = history[-tracker.N:][::-1]
+    x = np.r_[x, np.zeros(tracker.N - len(x))]
+    if tracker.detrend:
+        x = x - x.mean()
+    m = np.arange(tracker.N)
+    if tracker.window == "hann":
+        x = x * (0.5 - 0.5 * np.cos(2 * np.pi * m / tracker.N))
+    return np.exp(-2j * np.pi * tracker.freqs[:, None] / tracker.fs * m[None, :]) @ x
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Compare the sliding-DFT breathing tracker with per-window rfft")
+    ap.add_argument("--bpm", type=float, default=14.6, help="breathing rate of the synthetic signal")
+    ap.add_argument("--seconds", type=float, default=300.0)
+    ap.add_argument("--window", type=float, default=30.0, help="tracker window length (s)")
+    ap.add_argument("--noise", type=float, default=1.0, help="noise std (signal amplitude is 1)")
+    args = ap.parse_args()
+
+    fs, step = config.SAMPLING_RATE, config.STEP_SIZE
+    rng = np.random.default_rng(0)
+    n = int(args.seconds * fs)
+    t = np.arange(n) / fs
+    x = np.sin(2 * np.pi * args.bpm / 60.0 * t + 0.3 * np.sin(2 * np.pi * 0.01 * t)) + rng.normal(0, args.noise, n)
+
+    tracker = SlidingDFTTracker(fs, window_sec=args.window, bpm_lo=config.BREATH_BPM_MIN, bpm_hi=config.BREATH_BPM_MAX)
+    N = tracker.N
+    print(f"tracker: N={N} ({args.window:.0f} s), {len(tracker.freqs)} bins, "
+          f"grid {tracker.freqs[1] - tracker.freqs[0]:.4f} Hz ({60 * (tracker.freqs[1] - tracker.freqs[0]):.2f} BPM)\n")
+
+    res = {"tracker": [], "rfft_4s": [], f"rfft_{args.window:.0f}s": []}
+    cost = {k: 0.0 for k in res}
+    max_rel = 0.0
+    steps = 0
+    for s in range(0, n - step + 1, step):
+        end = s + step
+        t0 = time.perf_counter()
+        tracker.push(x[s:end])
+        r = tracker.estimate()
+        t1 = time.perf_counter()
+        win4 = calculate_bpm_from_signal(x[max(0, end - config.WINDOW_SIZE):end], fs, config.BREATH_BPM_MIN / 60,
+                                         config.BREATH_BPM_MAX / 60)
+        t2 = time.perf_counter()
+        winN = calculate_bpm_from_signal(x[max(0, end - N):end], fs, config.BREATH_BPM_MIN / 60,
+                                         config.BREATH_BPM_MAX / 60)
+        t3 = time.perf_counter()
+        for k, dt in zip(cost, (t1 - t0, t2 - t1, t3 - t2)):
+            cost[k] += dt * 1000
+        steps += 1
+        if end >= N:
+            res["tracker"].append(r["bpm"])
+            res["rfft_4s"].append(win4["bpm"])
+            res[f"rfft_{args.window:.0f}s"].append(winN["bpm"])
+        if steps % 20 == 0:
+            ref = direct_spectrum(tracker, x[:end])
+            max_rel = max(max_rel, float(np.max(np.abs(ref - tracker.spectrum())) / np.max(np.abs(ref))))
+
+    print(f"true rate {args.bpm:.2f} BPM, {steps} steps of {step} samples")
+    for k, v in res.items():
+        v = np.asarray(v, dtype=float)
+        print(f"  {k:<10} mean {v.mean():6.2f} | MAE {np.mean(np.abs(v - args.bpm)):5.2f} BPM | "
+              f"{cost[k] / steps:7.3f} ms per step ({cost[k] / steps / step * 1000:6.2f} us per sample)")
+    print(f"  tracker vs direct DFT max rel |diff| {max_rel:.2e}")
+
+
+if __name__ == "__main__":
+    main()
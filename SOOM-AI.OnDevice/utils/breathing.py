@@ -0,0 +1,173 @@
+# utils/breathing.py
+# 최근 20~40초 구간으로 호흡수를 추정하는 스트리밍 추정기.
+# SOOM-AI utils/breathing.BreathingRateEstimator(누적 -> PCA -> Welch PSD 피크)와 같은 방식이지만,
+# 매 스텝마다 버퍼를 이어 붙이고 전체를 다시 계산하지 않고 스텝당 O(step)으로 갱신합니다.
+from collections import deque
+
+import numpy as np
+from scipy.signal import get_window
+
+from .pca import PCAEngine
+from .sliding_window import SlidingWindow
+
+
+def _quality_from_psd(f: np.ndarray, Pxx: np.ndarray, f_lo: float, f_hi: float,
+                      lobe: int = 0) -> tuple[float, float, float]:
+    """
+    피크 품질(SNR 유사치), 피크 주파수, 대역 안 에너지 중 피크 비율.
+    lobe: 피크 비율에 포함할 피크 양옆 빈 수 (zero-padding한 PSD에서 원래 해상도 1빈 폭).
+    """
+    m = (f >= f_lo) & (f <= f_hi)
+    if not np.any(m):
+        return 0.0, np.nan, 0.0
+    fz, pz = f[m], Pxx[m]
+    i = int(np.argmax(pz))
+    base = np.median(np.delete(pz, i)) if len(pz) > 10 else np.mean(pz)
+    total = float(np.sum(pz))
+    peak = float(np.sum(pz[max(i - lobe, 0):i + lobe + 1]))
+    return float(pz[i] / (base + 1e-12)), float(fz[i]), peak / total if total > 0 else 0.0
+
+
+class StreamingBreathingEstimator:
+    """
+    (N, 52) 진폭 행을 시간 순서로 받아 최근 agg_sec 구간의 호흡수를 추정합니다.
+
+    - 버퍼: SlidingWindow(track_stats=True) 링 버퍼. 새 행은 더하고 agg_sec 밖으로 밀려난 행은 빼서
+      평균/표준편차/공분산을 O(step)으로 유지합니다. 표준화된 공분산의 1주성분을 PCAEngine으로 구합니다.
+    - Welch 캐시: 세그먼트(welch_sec, 50% 겹침)가 완성될 때마다 52개 채널 각각의 호흡 대역 근처 DFT 빈만
+      한 번 계산해 보관합니다. 주성분 투영과 FFT는 모두 선형이므로
+      PSD = mean_seg |S_seg @ v|^2 (v = 주성분 / 표준편차)이고, 매 갱신마다 새 세그먼트만 FFT하면 됩니다.
+
+    SOOM-AI 버전과 달리 PSD 앞의 butterworth 대역통과(filtfilt)는 버퍼 전체를 다시 거르므로 생략하고,
+    피크는 대역 [bpm_lo, bpm_hi] 안의 빈에서만 찾습니다. 세그먼트는 버퍼 시작이 아니라 스트림 기준
+    hop 간격으로 잘리므로 같은 구간의 scipy.signal.welch와 세그먼트 경계가 다를 수 있습니다.
+    """
+    def __init__(self, fs: float, agg_sec: float = 30.0, welch_sec: float = 10.0, zero_pad: int = 8,
+                 bpm_lo: float = 6.0, bpm_hi: float = 36.0, quality_min: float = 4.0,
+                 min_history_sec: float | None = None, gap_reset_sec: float = 6.0,
+                 n_features: int = 52, pca_method: str = "eigh", dtype=np.float32):
+        """
+        Args:
+            fs (float): 입력 행의 공칭 샘플링 속도 (Hz). 실제 값은 타임스탬프로 추정합니다.
+            agg_sec (float): 추정에 쓰는 최근 구간 길이 (권장 20~40초).
+            welch_sec (float): Welch 세그먼트 길이 (초). 겹침은 50%.
+            zero_pad (int): 세그먼트 FFT 길이 = welch_sec 샘플 수 * zero_pad (주파수 격자를 촘촘하게).
+            bpm_lo, bpm_hi (float): 호흡수 탐색 범위 (BPM).
+            quality_min (float): ok로 판단할 최소 피크 품질 (피크 / 대역 중앙값).
+            min_history_sec (float | None): 추정을 시작할 최소 누적 길이. 기본 max(agg_sec / 2, welch_sec).
+            gap_reset_sec (float): 행 사이 간격이 이보다 크면 스트림이 끊긴 것으로 보고 버퍼를 비웁니다.
+            n_features (int): 행당 값 개수 (서브캐리어 수).
+            pca_method (str): PCAEngine method ("eigh" 또는 "power").
+            dtype: 버퍼/FFT dtype.
+        """
+        self.fs = fs
+        self.agg_sec = agg_sec
+        self.f_lo, self.f_hi = bpm_lo / 60.0, bpm_hi / 60.0
+        self.quality_min = quality_min
+        self.min_history_sec = max(agg_sec / 2, welch_sec) if min_history_sec is None else min_history_sec
+        self.gap_reset_sec = gap_reset_sec
+        self.dtype = np.dtype(dtype)
+
+        self.max_rows = int(round(agg_sec * fs))
+        self.nperseg = int(round(welch_sec * fs))
+        if self.nperseg > self.max_rows:
+            raise ValueError("welch_sec는 agg_sec보다 길 수 없습니다.")
+        self.hop = self.nperseg - self.nperseg // 2
+        self.nfft = self.nperseg * max(1, int(zero_pad))
+        self._win = get_window("hann", self.nperseg)
+        # fs가 공칭값보다 조금 달라도 대역이 들어오도록 여유를 두고 보관할 빈 수
+        self.n_bins = min(self.nfft // 2 + 1, int(np.ceil(self.f_hi * 1.5 * self.nfft / fs)) + 1)
+        # 필요한 저주파 빈만 계산하는 (n_bins, nperseg) DFT 행렬 (hann 창 포함).
+        # 길이 nfft로 zero-padding한 rfft의 앞 n_bins개와 같고, 전체 FFT보다 계산량이 작습니다.
+        k = np.arange(self.n_bins)[:, None]
+        n = np.arange(self.nperseg)[None, :]
+        ctype = np.complex64 if self.dtype == np.float32 else np.complex128
+        self._dft = (np.exp(-2j * np.pi * k * n / self.nfft) * self._win).astype(ctype)
+
+        self.buffer = SlidingWindow(self.max_rows, 1, n_features=n_features, capacity=self.max_rows,
+                                    dtype=self.dtype, track_stats=True)
+        self.pca = PCAEngine(n_components=1, method=pca_method, align_sign=True)
+        self.updates = 0
+        self.clear()
+
+    def clear(self):
+        self.buffer.clear()
+        self.pca.reset()
+        self._segments = deque()  # (스트림 기준 시작 행 번호, (n_bins, F) 복소 스펙트럼)
+        self._rows_seen = 0
+        self._next_seg = 0
+        self._last_ts = None
+
+    def push(self, timestamps: np.ndarray, rows: np.ndarray):
+        """
+        새 행들을 추가합니다. 이미 받은 시각 이전의 행은 무시하고(겹치는 윈도우), 간격이 gap_reset_sec보다 크면 초기화합니다.
+
+        Args:
+            timestamps (np.ndarray): (N,) 타임스탬프(초), 증가 순서.
+            rows (np.ndarray): (N, F) 진폭 (리샘플링/잡음제거된 행).
+        """
+        ts = np.asarray(timestamps, dtype=np.float64)
+        if self._last_ts is not None:
+            new = ts > self._last_ts
+            ts, rows = ts[new], rows[new]
+        if len(ts) == 0:
+            return
+        if self._last_ts is not None and ts[0] - self._last_ts > self.gap_reset_sec:
+            self.clear()
+
+        self.buffer.extend(rows, ts)
+        self._rows_seen += len(ts)
+        self._last_ts = float(ts[-1])
+
+        # 완성된 세그먼트만 FFT (각 세그먼트는 한 번만 계산)
+        while self._next_seg + self.nperseg <= self._rows_seen:
+            back = self._rows_seen - self._next_seg
+            if back <= self.buffer.current_size:
+                seg = self.buffer.latest(back)[:self.nperseg]
+                spec = self._dft @ (seg - seg.mean(axis=0))  # detrend="constant"
+                self._segments.append((self._next_seg, spec))
+            self._next_seg += self.hop
+        oldest = self._rows_seen - self.buffer.current_size
+        while self._segments and self._segments[0][0] < oldest:
+            self._segments.popleft()
+        self.updates += 1
+
+    def estimate(self) -> dict:
+        """
+        현재 버퍼로 호흡수를 추정합니다.
+
+        Returns:
+            dict: {'ok', 'bpm', 'conf'(피크 품질), 'bpm_conf'(대역 에너지 중 피크 비율), 'f_hz', 'reason', 'n_segments'}
+        """
+        span = self.buffer.span()
+        if not self._segments or not np.isfinite(span) or span < self.min_history_sec:
+            return {"ok": False, "reason": "insufficient_history"}
+
+        stats = self.buffer.stats
+        self.pca.fit_covariance(stats.standardized_covariance(), stats.mean)
+        v = (self.pca.components_[0] / (stats.std() + 1e-8)).astype(self.dtype)  # 표준화 + 투영
+
+        S = np.stack([spec for _, spec in self._segments])            # (n_seg, n_bins, F)
+        fs = (self.buffer.current_size - 1) / span                     # 실제 샘플링 속도
+        Pxx = np.mean(np.abs(S @ v) ** 2, axis=0) / (fs * np.sum(self._win ** 2))
+        Pxx[1:] *= 2.0                                                 # 단측 PSD (scaling="density")
+        f = np.arange(self.n_bins) * fs / self.nfft
+
+        q, f_peak, peak_ratio = _quality_from_psd(f, Pxx, self.f_lo, self.f_hi, lobe=self.nfft // self.nperseg)
+        if not np.isfinite(f_peak):
+            return {"ok": False, "reason": "no_peak"}
+        ok = bool(q >= self.quality_min)
+        return {
+            "ok": ok,
+            "bpm": float(f_peak * 60.0),
+            "conf": q,
+            "bpm_conf": peak_ratio,
+            "f_hz": f_peak,
+            "reason": "ok" if ok else "low_quality",
+            "n_segments": len(S),
+        }
+
+    def update(self, timestamps: np.ndarray, rows: np.ndarray) -> dict:
+        """push 후 estimate."""
+        self.push(timestamps, rows)
+        return self.estimate()
@@ -0,0 +1,106 @@
+# utils/csi_codec.py
+# InfluxDB `csi_measurement` 페이로드 인코딩/디코딩
+#
+#   v1 (text)  : data="[i,r,i,r,...]" 문자열, real_timestamp 문자열 필드 (기존 형식, 태그 없음)
+#   v2 (packed): data=base64(int8 x 128) 문자열, real_ts float 필드, 태그 csi_fmt="2"
+#
+# 쓰기 쪽(SOOM-EM.devices/csi_saver/csi_codec.py, SOOM-BE.platform/Mqtt/csi_codec.py)에는
+# numpy 없이 인코딩만 하는 같은 이름의 모듈이 있습니다. 형식을 바꿀 때는 세 곳을 함께 맞춰야 합니다.
+
+import base64
+import binascii
+import numpy as np
+import pandas as pd
+
+CSI_FORMAT_TEXT = 1
+CSI_FORMAT_PACKED = 2
+
+CSI_FORMAT_TAG = "csi_fmt"
+DATA_FIELD = "data"
+TEXT_TIMESTAMP_FIELD = "real_timestamp"
+# v2는 float 필드라서 기존 문자열 필드(real_timestamp)와 타입이 충돌하지 않도록 이름을 분리
+PACKED_TIMESTAMP_FIELD = "real_ts"
+
+NUM_CSI_VALUES = 128
+
+# base64 문자열 (text 형식은 항상 '['로 시작하므로 겹치지 않음)
+PACKED_PATTERN = r"\s*[A-Za-z0-9+/]+={0,2}\s*"
+
+
+def to_int8_values(data) -> np.ndarray:
+    """list / ndarray / "[...]" 문자열을 int8 배열로 변환합니다."""
+    if isinstance(data, str):
+        data = np.fromstring(data.strip().strip("[]"), dtype=np.int16, sep=",")
+    return np.asarray(data).astype(np.int8)
+
+
+def encode_packed(data) -> str:
+    """CSI 값을 int8로 묶어 base64 문자열로 인코딩합니다."""
+    return base64.b64encode(to_int8_values(data).tobytes()).decode("ascii")
+
+
+def decode_packed(payload: str) -> np.ndarray:
+    """encode_packed의 역변환. int8 배열을 반환합니다."""
+    return np.frombuffer(base64.b64decode(payload), dtype=np.int8)
+
+
+def apply_csi_fields(point, real_timestamp, data, fmt: int = CSI_FORMAT_TEXT):
+    """
+    influxdb_client Point에 선택한 형식의 CSI 필드(및 버전 태그)를 채워 반환합니다.
+
+    Args:
+        point: influxdb_client.Point
+        real_timestamp: ESP32 타임스탬프 (문자열 또는 숫자)
+        data: CSI 값 (list / ndarray / "[...]" 문자열)
+        fmt (int): CSI_FORMAT_TEXT 또는 CSI_FORMAT_PACKED
+    """
+    if fmt == CSI_FORMAT_PACKED:
+        return point \
+            .tag(CSI_FORMAT_TAG, str(CSI_FORMAT_PACKED)) \
+            .field(PACKED_TIMESTAMP_FIELD, float(real_timestamp)) \
+            .field(DATA_FIELD, encode_packed(data))
+    return point \
+        .field(TEXT_TIMESTAMP_FIELD, str(real_timestamp)) \
+        .field(DATA_FIELD, str(data))
+
+
+def decode_packed_rows(payloads) -> tuple[np.ndarray, np.ndarray]:
+    """
+    v2 페이로드 여러 개를 한 번에 (N, 128) 행렬로 디코딩합니다.
+
+    Returns:
+        tuple: raw (N, 128) int16, valid (N,) bool. 디코딩 실패/128바이트 미만 행은 0, valid=False.
+    """
+    N = len(payloads)
+    raw = np.zeros((N, NUM_CSI_VALUES), dtype=np.int16)
+    valid = np.zeros(N, dtype=bool)
+
+    blobs = []
+    for i, payload in enumerate(payloads):
+        try:
+            blob = base64.b64decode(payload.strip(), validate=True)
+        except (binascii.Error, ValueError, AttributeError):
+            continue
+        if len(blob) >= NUM_CSI_VALUES:
+            blobs.append(blob[:NUM_CSI_VALUES])
+            valid[i] = True
+
+    if blobs:
+        raw[valid] = np.frombuffer(b"".join(blobs), dtype=np.int8).reshape(-1, NUM_CSI_VALUES)
+    return raw, valid
+
+
+def normalize_timestamp_column(df: pd.DataFrame, column: str = TEXT_TIMESTAMP_FIELD) -> pd.DataFrame:
+    """
+    v1(real_timestamp 문자열)과 v2(real_ts float)가 섞인 데이터프레임의 타임스탬프를
+    `column` 하나의 숫자 컬럼으로 합칩니다. (in-place, 같은 df 반환)
+    """
+    if PACKED_TIMESTAMP_FIELD in df.columns:
+        packed_ts = pd.to_numeric(df[PACKED_TIMESTAMP_FIELD])
+        if column in df.columns:
+            packed_ts = packed_ts.fillna(pd.to_numeric(df[column]))
+        df[column] = packed_ts
+        df.drop(columns=[PACKED_TIMESTAMP_FIELD], inplace=True)
+    elif column in df.columns:
+        df[column] = pd.to_numeric(df[column])
+    return df
@@ -4,63 +4,152 @@ import numpy as np
 import pandas as pd
 import ast
 
-def amp_phase_from_csi(data, column='data'):
+from .csi_codec import PACKED_PATTERN, decode_packed_rows
+
+# Number of raw values per frame: 64 subcarriers x (Imaginary, Real)
+NUM_CSI_VALUES = 2 * 64
+
+# Select subcarriers: 0-based indices 6..31 and 33..58
+SUBCARRIER_IDXS = np.r_[6:32, 33:59]
+# Positions of the selected subcarriers in the interleaved [Im, Re, Im, Re, ...] row
+_IM_IDXS = 2 * SUBCARRIER_IDXS
+_RE_IDXS = 2 * SUBCARRIER_IDXS + 1
+
+# A well-formed CSI string such as "[0,0,-18,12,...]" (integers only, no trailing comma)
+_CSI_TEXT_PATTERN = r"\s*\[\s*-?\d+(?:\s*,\s*-?\d+)*\s*\]\s*"
+
+
+def _as_series(data, column: str) -> pd.Series:
+    # --- Ensure we have a Series ---
+    if isinstance(data, pd.DataFrame):
+        return data[column]
+    return data  # Already a Series
+
+
+def _match_mask(s: pd.Series, pattern: str) -> np.ndarray:
+    """Marks the string rows that fully match `pattern`."""
+    try:
+        matched = s.str.fullmatch(pattern)
+    except AttributeError:
+        # No string values at all (e.g. an all-NaN float column)
+        return np.zeros(len(s), dtype=bool)
+    return matched.to_numpy(dtype=bool, na_value=False)
+
+
+def _literal_values(item):
+    """Legacy per-row parsing for values the bulk parser does not recognize."""
+    if isinstance(item, str):
+        try:
+            values = ast.literal_eval(item.strip())
+        except (ValueError, SyntaxError):
+            return None
+        return values if isinstance(values, (list, tuple)) else None
+    try:
+        return list(item)
+    except TypeError:
+        return None
+
+
+def parse_csi_matrix(data, column='data'):
     """
-    Extracts amplitude and phase from CSI data string.
+    Parses a whole column of CSI strings ("[i,r,i,r,...]") into an integer matrix in one pass.
+
+    Well-formed strings are validated with a single vectorized regex, joined and converted
+    with one numpy call. Packed (base64, see utils/csi_codec.py) payloads are decoded in bulk.
+    A column of equally sized numpy rows is stacked directly. Anything else (lists,
+    unusual literals) falls back to the per-row `ast.literal_eval` path, so the accepted
+    inputs are the same as before.
 
     Args:
         data (pd.DataFrame or pd.Series): The input data.
         column (str): The column name containing the CSI string if data is a DataFrame.
 
     Returns:
-        tuple: A tuple containing Amp (N, 52) and Pha (N, 52) numpy arrays.
+        tuple: raw (N, 128) int16 matrix of interleaved Im/Re values and a (N,) bool mask of
+               the rows that were parsed. Missing, malformed or short rows are left as zeros.
     """
-    # --- Ensure we have a Series ---
-    if isinstance(data, pd.DataFrame):
-        s = data[column]
-    else:
-        s = data  # Already a Series
-
+    s = _as_series(data, column)
     N = len(s)
-    AmpCSI = np.zeros((N, 64), dtype=np.float64)
-    PhaseCSI = np.zeros((N, 64), dtype=np.float64)
+    raw = np.zeros((N, NUM_CSI_VALUES), dtype=np.int16)
+    valid = np.zeros(N, dtype=bool)
+    if N == 0:
+        return raw, valid
 
-    for i in range(N):
-        item = s.iat[i]  # Use integer-location based indexing
-        if pd.isna(item):
-            # If data is missing, leave as zeros and continue
-            continue
+    # Already decoded rows (e.g. from data_source/session_archive.py): one np.stack, no parsing
+    if isinstance(s.iat[0], np.ndarray):
+        try:
+            stacked = np.stack(s.to_numpy())
+        except ValueError:
+            stacked = None
+        if stacked is not None and stacked.ndim == 2 and stacked.shape[1] >= NUM_CSI_VALUES:
+            return stacked[:, :NUM_CSI_VALUES].astype(np.int16), np.ones(N, dtype=bool)
+
+    fast = _match_mask(s, _CSI_TEXT_PATTERN)
+    if fast.any():
+        rows = s[fast].str.strip().str[1:-1]
+        counts = rows.str.count(",").to_numpy() + 1
+        flat = np.fromstring(",".join(rows), dtype=np.int16, sep=",")  # ESP32 값은 int8 범위
+
+        # Keep only the first 128 values of each row, like values[:2 * 64]
+        long_enough = counts >= NUM_CSI_VALUES
+        starts = (np.cumsum(counts) - counts)[long_enough]
+        rows_idx = np.flatnonzero(fast)[long_enough]
+        raw[rows_idx] = flat[starts[:, None] + np.arange(NUM_CSI_VALUES)]
+        valid[rows_idx] = True
+
+    packed = ~fast & _match_mask(s, PACKED_PATTERN)
+    if packed.any():
+        raw[packed], valid[packed] = decode_packed_rows(s[packed].to_numpy())
 
-        # Safely parse the string into a list
-        if isinstance(item, str):
-            try:
-                values = ast.literal_eval(item.strip())
-            except (ValueError, SyntaxError):
-                # If parsing fails, skip this row
-                continue
-        else:
-            # If it's already a list/array, convert to list
-            values = list(item)
-
-        # Ensure the sequence of real/imaginary parts has the correct length
-        if len(values) < 2 * 64:
-            # For now, we will raise an error if the data is too short.
-            # A padding policy could be implemented here if needed.
-            # e.g., values = (values + [0]*(2*64 - len(values)))[:2*64]
-            # print(f"Warning: [row {i}] Data has fewer than 128 values: len={len(values)}. Skipping.")
+    slow = ~fast & ~packed & s.notna().to_numpy(dtype=bool)
+    for i in np.flatnonzero(slow):
+        values = _literal_values(s.iat[i])
+        if values is None or len(values) < NUM_CSI_VALUES:
             continue
-        values = values[:2 * 64]
+        raw[i] = np.asarray(values[:NUM_CSI_VALUES], dtype=np.int64)
+        valid[i] = True
 
-        # Even indices = Imaginary, Odd indices = Real
-        ImCSI = np.asarray(values[::2], dtype=np.int64)   # Shape: (64,)
-        ReCSI = np.asarray(values[1::2], dtype=np.int64)  # Shape: (64,)
+    return raw, valid
 
-        # Calculate Amplitude and Phase
-        AmpCSI[i, :] = np.hypot(ImCSI, ReCSI)      # = sqrt(Im^2 + Re^2)
-        PhaseCSI[i, :] = np.arctan2(ImCSI, ReCSI)  # arctan2(y=Im, x=Re)
 
-    # Select subcarriers: 0-based indices 6..31 and 33..58
-    # This corresponds to slices 6:32 and 33:59
-    Amp = np.concatenate([AmpCSI[:, 6:32], AmpCSI[:, 33:59]], axis=1)  # Shape: (N, 52)
-    Pha = np.concatenate([PhaseCSI[:, 6:32], PhaseCSI[:, 33:59]], axis=1)  # Shape: (N, 52)
+def amp_phase_from_raw(raw: np.ndarray, dtype=np.float64):
+    """
+    Computes amplitude and phase of the 52 selected subcarriers from a raw CSI matrix.
+
+    Args:
+        raw (np.ndarray): (N, 128) interleaved Im/Re values as returned by parse_csi_matrix.
+        dtype: float dtype of the outputs (float32 for the realtime precision mode).
+
+    Returns:
+        tuple: A tuple containing Amp (N, 52) and Pha (N, 52) numpy arrays.
+    """
+    # Even indices = Imaginary, Odd indices = Real
+    ImCSI = raw[:, _IM_IDXS].astype(dtype)
+    ReCSI = raw[:, _RE_IDXS].astype(dtype)
+
+    Amp = np.hypot(ImCSI, ReCSI)    # = sqrt(Im^2 + Re^2)
+    Pha = np.arctan2(ImCSI, ReCSI)  # arctan2(y=Im, x=Re)
     return Amp, Pha
+
+
+def amplitude_from_raw(raw: np.ndarray, dtype=np.float64) -> np.ndarray:
+    """Amplitude only (N, 52), same values as amp_phase_from_raw(raw, dtype)[0] without computing the phase."""
+    return np.hypot(raw[:, _IM_IDXS].astype(dtype), raw[:, _RE_IDXS].astype(dtype))
+
+
+def amp_phase_from_csi(data, column='data'):
+    """
+    Extracts amplitude and phase from CSI data string.
+
+    Rows that are missing, malformed or have fewer than 128 values are skipped
+    and stay as zeros in the output.
+
+    Args:
+        data (pd.DataFrame or pd.Series): The input data.
+        column (str): The column name containing the CSI string if data is a DataFrame.
+
+    Returns:
+        tuple: A tuple containing Amp (N, 52) and Pha (N, 52) numpy arrays.
+    """
+    raw, _ = parse_csi_matrix(data, column)
+    return amp_phase_from_raw(raw)
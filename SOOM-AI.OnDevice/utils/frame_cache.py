@@ -0,0 +1,113 @@
+# utils/frame_cache.py
+# 겹치는 윈도우에서 같은 CSI 프레임을 다시 파싱하지 않도록, 타임스탬프를 키로 진폭(52)을 캐시합니다.
+# 4초 윈도우가 3초마다 이동하면 매 윈도우의 1/4이 이전 윈도우와 겹치고, 더 긴 윈도우일수록 겹침이 커집니다.
+import numpy as np
+import pandas as pd
+
+from .extract import parse_csi_matrix, amplitude_from_raw
+
+
+def frame_keys(index) -> np.ndarray:
+    """DataFrame 인덱스(또는 타임스탬프 배열)를 캐시 키로 변환합니다. DatetimeIndex는 int64 ns."""
+    if isinstance(index, pd.DatetimeIndex):
+        return index.asi8
+    return np.asarray(index, dtype=np.float64)
+
+
+class FrameAmplitudeCache:
+    """
+    프레임 타임스탬프 -> 52개 서브캐리어 진폭.
+
+    키는 정렬된 배열로 보관하고 윈도우 단위로 searchsorted 한 번에 조회하므로, 적중한 행은
+    복사만 하고 처음 보는 행만 parse_csi_matrix로 디코딩합니다. 크기는 capacity 프레임으로 제한되며,
+    윈도우가 시간 순서로 이동하므로 가장 오래된(타임스탬프가 작은) 프레임부터 제거합니다.
+    한 윈도우 안에서 타임스탬프가 겹치는 행은 구분할 수 없으므로 캐시하지 않고 매번 디코딩합니다.
+    """
+    def __init__(self, capacity: int, n_features: int = 52, dtype=np.float64):
+        """
+        Args:
+            capacity (int): 보관할 최대 프레임 수 (예: config.WINDOW_SIZE * 4).
+            dtype: 진폭 dtype (config.PRECISION).
+        """
+        self.capacity = capacity
+        self.n_features = n_features
+        self.dtype = np.dtype(dtype)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.clear()
+
+    def clear(self):
+        self._keys = np.empty(0)
+        self._amps = np.empty((0, self.n_features), dtype=self.dtype)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def amplitudes(self, keys, data: pd.Series) -> np.ndarray:
+        """
+        윈도우의 진폭 행렬을 반환합니다. amp_phase_from_csi(data)[0]과 같은 값입니다.
+
+        Args:
+            keys: 행별 타임스탬프 (frame_keys 결과 또는 DatetimeIndex).
+            data (pd.Series): 같은 순서의 CSI 원본 컬럼.
+
+        Returns:
+            np.ndarray: (N, 52) 진폭.
+        """
+        keys = frame_keys(keys)
+        if len(keys) != len(data):
+            raise ValueError("keys와 data의 길이가 다릅니다.")
+        if len(self._keys) and self._keys.dtype != keys.dtype:
+            self.clear()  # 키 종류(ns/초)가 바뀌면 비교할 수 없음
+
+        out = np.empty((len(keys), self.n_features), dtype=self.dtype)
+        hit = np.zeros(len(keys), dtype=bool)
+        if len(self._keys):
+            pos = np.searchsorted(self._keys, keys).clip(0, len(self._keys) - 1)
+            hit = self._keys[pos] == keys
+
+        # 윈도우 안에서 중복된 타임스탬프는 캐시 대상에서 제외
+        order = np.argsort(keys, kind="stable")
+        same = keys[order][1:] == keys[order][:-1]
+        dup = np.zeros(len(keys), dtype=bool)
+        dup[order[1:][same]] = True
+        dup[order[:-1][same]] = True
+        hit &= ~dup
+
+        out[hit] = self._amps[pos[hit]] if hit.any() else 0.0
+        miss = np.flatnonzero(~hit)
+        if miss.size:
+            raw, _ = parse_csi_matrix(data.iloc[miss])
+            out[miss] = amplitude_from_raw(raw, self.dtype)
+            new = ~dup[miss]
+            self._insert(keys[miss[new]], out[miss[new]])
+
+        self.hits += int(hit.sum())
+        self.misses += int(miss.size)
+        return out
+
+    def _insert(self, keys: np.ndarray, amps: np.ndarray):
+        if not len(keys):
+            return
+        all_keys = np.concatenate([self._keys, keys]) if len(self._keys) else keys
+        all_amps = np.concatenate([self._amps, amps])
+        # 첫 삽입이든 새 배치 자체가 섞여 있든, 정렬이 깨졌으면 정렬 (searchsorted 조회와 오래된 순 제거의 전제)
+        if np.any(np.diff(all_keys) < 0):
+            order = np.argsort(all_keys, kind="stable")
+            all_keys, all_amps = all_keys[order], all_amps[order]
+        excess = len(all_keys) - self.capacity
+        if excess > 0:
+            all_keys, all_amps = all_keys[excess:], all_amps[excess:]
+            self.evictions += excess
+        self._keys, self._amps = all_keys.copy(), all_amps.copy()
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self._keys),
+            "hit_rate": self.hits / total if total else 0.0,
+        }
@@ -0,0 +1,142 @@
+# utils/pca.py
+# sklearn 없이 동작하는 실시간용 PCA.
+# (T, 52) 윈도우의 주성분은 52x52 공분산 행렬의 고유벡터이므로, 매 윈도우마다 sklearn PCA 객체를
+# 만드는 대신 공분산을 구해 eigh(또는 이전 윈도우 벡터에서 시작하는 power iteration)로 계산합니다.
+import numpy as np
+
+
+def _covariance(X: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """평균과 공분산 (ddof=1, np.cov와 같음)."""
+    mean = X.mean(axis=0)
+    Xc = X - mean
+    return mean, (Xc.T @ Xc) / max(len(X) - 1, 1)
+
+
+def _eigh_components(cov: np.ndarray, n_components: int) -> tuple[np.ndarray, np.ndarray]:
+    """고유값이 큰 순서로 (n_components,) 고유값과 (F, n_components) 고유벡터."""
+    w, V = np.linalg.eigh(cov)
+    return w[::-1][:n_components], V[:, ::-1][:, :n_components]
+
+
+def _sklearn_sign(V: np.ndarray) -> np.ndarray:
+    """sklearn(svd_flip, 1.5+)과 같은 부호 규칙: 각 성분에서 절댓값이 가장 큰 계수가 양수가 되도록."""
+    idx = np.argmax(np.abs(V), axis=0)
+    signs = np.sign(V[idx, np.arange(V.shape[1])])
+    signs[signs == 0] = 1.0
+    return V * signs
+
+
+class PCAEngine:
+    """
+    윈도우마다 호출되는 상태 유지형 PCA.
+
+    - method="eigh": 공분산의 고유분해 (정확, 기본값)
+    - method="power": 이전 윈도우의 주성분에서 시작하는 subspace(power) iteration.
+      연속된 윈도우는 주성분이 거의 같아 몇 번의 반복으로 수렴하며, max_iter 안에
+      수렴하지 않으면(예: 빈 방처럼 고유값 차이가 작은 경우) eigh로 계산합니다.
+
+    부호: 고유벡터의 부호는 임의이므로 첫 윈도우는 sklearn 규칙을 따르고,
+    align_sign=True면 이후 윈도우는 이전 윈도우 성분과 내적이 양수가 되도록 맞춰
+    윈도우 사이에 신호가 뒤집히지 않게 합니다. (False면 항상 sklearn과 같은 부호)
+    """
+    def __init__(self, n_components: int = 1, method: str = "eigh", align_sign: bool = True,
+                 max_iter: int = 30, tol: float = 1e-10):
+        if method not in ("eigh", "power"):
+            raise ValueError("method는 'eigh' 또는 'power'여야 합니다.")
+        self.n_components = n_components
+        self.method = method
+        self.align_sign = align_sign
+        self.max_iter = max_iter
+        self.tol = tol
+
+        # sklearn과 같은 이름의 결과 속성
+        self.mean_ = None
+        self.components_ = None          # (n_components, F)
+        self.explained_variance_ = None  # (n_components,)
+        self.n_iter_ = 0                 # 마지막 power iteration 반복 수 (eigh면 0)
+
+    def reset(self):
+        """이전 윈도우 정보(워밍 스타트, 부호 기준)를 버립니다."""
+        self.components_ = None
+
+    def _power_components(self, cov: np.ndarray, V: np.ndarray):
+        for it in range(1, self.max_iter + 1):
+            Q, _ = np.linalg.qr(cov @ V)
+            # 열마다 |cos(이전, 현재)|가 1에 충분히 가까우면 수렴
+            converged = np.max(1.0 - np.abs(np.sum(Q * V, axis=0))) < self.tol
+            V = Q
+            if converged:
+                self.n_iter_ = it
+                return np.sum(V * (cov @ V), axis=0), V
+        return None
+
+    def fit_covariance(self, cov: np.ndarray, mean: np.ndarray | None = None) -> "PCAEngine":
+        """
+        공분산 (F, F)만으로 주성분을 구합니다. 데이터를 투영하지 않는 경우(예: utils/breathing.py)에 사용합니다.
+        결과는 components_, explained_variance_에 저장되며 워밍 스타트/부호 규칙은 fit_transform과 같습니다.
+        """
+        F = cov.shape[0]
+        if not 1 <= self.n_components <= F:
+            raise ValueError(f"n_components는 1에서 {F} 사이여야 합니다. 현재: {self.n_components}")
+        prev = self.components_
+        if prev is not None and prev.shape != (self.n_components, F):
+            prev = None
+
+        result = None
+        self.n_iter_ = 0
+        if self.method == "power" and prev is not None:
+            result = self._power_components(cov, prev.T.astype(cov.dtype))
+        if result is None:
+            result = _eigh_components(cov, self.n_components)
+        w, V = result
+
+        if self.align_sign and prev is not None:
+            signs = np.sign(np.sum(V * prev.T, axis=0))
+            signs[signs == 0] = 1.0
+            V = V * signs
+        else:
+            V = _sklearn_sign(V)
+
+        self.mean_ = mean
+        self.components_ = V.T
+        self.explained_variance_ = w
+        return self
+
+    def fit_transform(self, X: np.ndarray, mean: np.ndarray | None = None,
+                      cov: np.ndarray | None = None) -> np.ndarray:
+        """
+        Args:
+            X (np.ndarray): (T, F) 데이터.
+            mean, cov (np.ndarray | None): X의 평균 (F,)과 공분산 (F, F, ddof=1)을 이미 알고 있으면
+                전달합니다 (utils/streaming_stats.py). 이때 X는 투영에만 쓰이므로 O(T*F*F) 계산이 빠집니다.
+
+        Returns:
+            np.ndarray: (T, n_components) 주성분 점수 (sklearn PCA.fit_transform과 같은 값).
+        """
+        X = np.asarray(X)
+        n, F = X.shape
+        if not 1 <= self.n_components <= min(n, F):
+            raise ValueError(f"n_components는 1에서 {min(n, F)} 사이여야 합니다. 현재: {self.n_components}")
+
+        if mean is None or cov is None:
+            mean, cov = _covariance(X)
+        self.fit_covariance(cov, mean)
+        return (X - mean) @ self.components_.T
+
+def pca_52_subcarriers(data: np.ndarray, n_components: int = 1) -> np.ndarray:
+    """
+    52개의 서브캐리어(특징)에 대해 PCA를 적용하여 차원을 축소합니다. (상태 없음, sklearn과 같은 부호)
+
+    Args:
+        data: (T, 52) 또는 (B, T, 52). 3차원이면 (B*T, 52)로 합쳐서 한 번에 PCA를 구합니다.
+        n_components: 축소할 주성분 개수.
+
+    Returns:
+        (T, n_components) 또는 (B, T, n_components)
+    """
+    if data.shape[-1] != 52: raise ValueError(f"마지막 차원은 52여야 합니다. 현재: {data.shape[-1]}")
+    if data.ndim not in (2, 3):
+        raise ValueError(f"입력 데이터는 2차원 (T, F) 또는 3차원 (B, T, F) 형태여야 합니다. Got shape {data.shape}")
+    engine = PCAEngine(n_components=n_components, align_sign=False)
+    out = engine.fit_transform(data.reshape(-1, 52))
+    return out.reshape(*data.shape[:-1], n_components)
@@ -1,9 +1,9 @@
 import pandas as pd
 import numpy as np
-from scipy.interpolate import interp1d
 
 # 같은 utils 폴더에 있는 signal_processing 모듈에서 함수들을 가져옴
 from . import signal_processing as sp
+from .pca import PCAEngine
 
 class RealtimePreprocessor:
     """
@@ -11,51 +11,82 @@ class RealtimePreprocessor:
     타임스탬프 기반 리샘플링을 포함한 모든 단계를 순서대로 실행하여
     모델 입력에 맞는 최종 1D 신호를 생성합니다.
     """
-    def __init__(self, pca_components: int = 1, filter_ratio: float = 0.05):
+    def __init__(self, pca_components: int = 1, filter_ratio: float = 0.05,
+                 pca_method: str = "eigh", pca_align_sign: bool = True, dtype=np.float32,
+                 denoise: str = "dwt", kalman_mode: str = "steady", kalman_q_factor: float = 0.01):
         """
         Args:
             pca_components (int): PCA로 축소할 주성분 개수.
             filter_ratio (float): FFT 저역 통과 필터의 컷오프 비율.
+            pca_method (str): "eigh" 또는 "power" (이전 윈도우 주성분에서 시작하는 power iteration).
+            pca_align_sign (bool): 주성분 부호를 이전 윈도우에 맞춰 윈도우 간 신호 뒤집힘을 막습니다.
+            dtype: 전처리 계산 dtype (기본 float32).
+            denoise (str): 노이즈 제거 방식. "dwt"(기본) 또는 "kalman".
+            kalman_mode (str): denoise="kalman"일 때 "steady"(정상상태 이득) 또는 "exact"(시간 가변 이득).
+            kalman_q_factor (float): 칼만 프로세스 잡음 q = kalman_q_factor * r.
         """
+        if denoise not in ("dwt", "kalman"):
+            raise ValueError("denoise는 'dwt' 또는 'kalman'이어야 합니다.")
         self.pca_components = pca_components
         self.filter_ratio = filter_ratio
+        self.dtype = np.dtype(dtype)
+        # 윈도우 사이에 주성분(워밍 스타트, 부호 기준)을 유지하므로 스트림마다 하나의 전처리기를 사용
+        self.pca = PCAEngine(n_components=pca_components, method=pca_method, align_sign=pca_align_sign)
+        self.lowpass = sp.FFTLowpassFilter(filter_ratio)
+        self.denoise = denoise
+        self.kalman_mode = kalman_mode
+        self.kalman_q_factor = kalman_q_factor
 
-    def _resample_multichannel_signal(self, df: pd.DataFrame, target_size: int) -> np.ndarray:
+        # 윈도우마다 재사용하는 작업 버퍼 (이름 -> 배열). 모양이 바뀔 때만 다시 할당
+        self._scratch = {}
+        # 마지막 윈도우의 잡음제거 결과 (target_size, 52). 시각화/디버깅용이며 다음 run에서 바뀝니다.
+        self.last_denoised = None
+
+    def _buffer(self, name: str, shape: tuple) -> np.ndarray:
+        buf = self._scratch.get(name)
+        if buf is None or buf.shape != shape:
+            buf = self._scratch[name] = np.empty(shape, dtype=self.dtype)
+        return buf
+
+    def run_arrays(self, timestamps: np.ndarray, amplitudes: np.ndarray, model_input_size: int) -> np.ndarray:
         """
-        타임스탬프를 기반으로 다채널 CSI 신호를 고정된 크기로 리샘플링합니다.
+        pandas 없이 배열로 전체 전처리를 실행합니다.
+        리샘플링/정규화 결과는 재사용 버퍼에 쓰고, 모든 단계를 self.dtype으로 계산합니다.
 
         Args:
-            df (pd.DataFrame): 'timestamp'와 'amplitude' 컬럼을 가진 데이터프레임
-            target_size (int): 리샘플링 후의 목표 샘플 개수 (예: 240)
+            timestamps (np.ndarray): (N,) 타임스탬프(초).
+            amplitudes (np.ndarray): (N, 52) 진폭.
+            model_input_size (int): 모델이 요구하는 최종 입력 크기 (예: 240)
 
         Returns:
-            np.ndarray: (target_size, num_subcarriers) 형태의 리샘플링된 신호
+            np.ndarray: 모든 전처리가 완료된 1차원 신호 데이터.
         """
-        # (N, num_subcarriers) 형태의 2D 배열로 변환
-        amplitudes = np.vstack(df['amplitude'].to_numpy())
-        
-        # 원본 시간 축 (초 단위)
-        original_timestamps = df['timestamp'].to_numpy()
-        original_time_axis = original_timestamps - original_timestamps[0]
+        amplitudes = np.ascontiguousarray(amplitudes, dtype=self.dtype)
+        shape = (model_input_size, amplitudes.shape[1])
 
-        # 새로운 균일한 시간 축 생성 (0초부터 마지막 시간까지 target_size개)
-        new_time_axis = np.linspace(original_time_axis.min(), original_time_axis.max(), target_size)
+        # 1. 리샘플링 (가변 길이 -> 고정 길이)
+        resampled = sp.resample_linear(timestamps, amplitudes, model_input_size,
+                                       out=self._buffer("resampled", shape))
+
+        # 2. 노이즈 제거 (DWT 또는 칼만)
+        if self.denoise == "kalman":
+            denoised_amp = sp.kalman_denoise_matrix(resampled, q_factor=self.kalman_q_factor, mode=self.kalman_mode)
+        else:
+            denoised_amp = sp.dwt_denoise_matrix(resampled)
+        self.last_denoised = denoised_amp
 
-        # 각 서브캐리어 채널별로 보간(interpolation) 수행
-        num_subcarriers = amplitudes.shape[1]
-        resampled_amplitudes = np.zeros((target_size, num_subcarriers))
+        # 3. 정규화 (Standardization)
+        standardized_amp = sp.standardize_matrix(denoised_amp, out=self._buffer("standardized", shape))
 
-        for i in range(num_subcarriers):
-            # 1D 보간 함수 생성
-            interp_func = interp1d(original_time_axis, amplitudes[:, i], kind='linear', fill_value="extrapolate")
-            # 새로운 시간 축에 맞춰 값 계산
-            resampled_amplitudes[:, i] = interp_func(new_time_axis)
-            
-        return resampled_amplitudes
+        # 4. 차원 축소 (PCA)
+        pca_result = self.pca.fit_transform(standardized_amp)
+
+        # 5. 저역 통과 필터 (FFT Filter)
+        return self.lowpass(pca_result.ravel())
 
     def run(self, csi_df: pd.DataFrame, model_input_size: int) -> np.ndarray:
         """
-        전체 전처리 파이프라인을 실행합니다.
+        전체 전처리 파이프라인을 실행합니다. (DataFrame 입력용 래퍼, run_arrays 참고)
 
         Args:
             csi_df (pd.DataFrame): InfluxConnector로부터 받은 'timestamp'와 'amplitude' 컬럼을 가진 DF.
@@ -64,21 +95,5 @@ class RealtimePreprocessor:
         Returns:
             np.ndarray: 모든 전처리가 완료된 1차원 신호 데이터.
         """
-        # 1. 리샘플링 (가변 길이 -> 고정 길이)
-        # 타임스탬프를 이용해 가변적인 개수의 데이터를 모델 입력 크기(240)에 맞게 변환
-        resampled_data = self._resample_multichannel_signal(csi_df, model_input_size)
-        
-        # 2. 노이즈 제거 (DWT)
-        denoised_amp = sp.dwt_denoise_matrix(resampled_data)
-        
-        # 3. 정규화 (Standardization)
-        standardized_amp = sp.standardize_matrix(denoised_amp)
-        
-        # 4. 차원 축소 (PCA)
-        pca_result = sp.pca_52_subcarriers(standardized_amp, n_components=self.pca_components)
-        
-        # 5. 저역 통과 필터 (FFT Filter)
-        final_signal = sp.fft_lowpass_filter(pca_result, cutoff_freq_ratio=self.filter_ratio)
-        
-        return final_signal
-
+        amplitudes = np.vstack(csi_df['amplitude'].to_numpy())
+        return self.run_arrays(csi_df['timestamp'].to_numpy(dtype=np.float64), amplitudes, model_input_size)
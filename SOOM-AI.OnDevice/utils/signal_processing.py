@@ -1,90 +1,238 @@
 # utils/signal_processing.py
+from functools import lru_cache
+
 import numpy as np
 import pandas as pd
-import ast
 import pywt
-from sklearn.decomposition import PCA
 from scipy.fft import rfft, rfftfreq
+from scipy.signal import ZoomFFT, lfilter
+
+from .extract import parse_csi_matrix, amp_phase_from_raw
+# 하위 호환용 재노출: pca_52_subcarriers는 원래 이 모듈에 있었고 utils/pca.py로 옮겨짐 (sklearn 없는 PCA)
+from .pca import pca_52_subcarriers  # noqa: F401
 
 # --- 1. 진폭/위상 추출 (from extract.py) ---
 def amp_phase_from_csi(data, column='data'):
-    if isinstance(data, pd.DataFrame):
-        s = data[column]
-    else:
-        s = data
-    N = len(s)
-    AmpCSI = np.zeros((N, 64), dtype=np.float64)
-    PhaseCSI = np.zeros((N, 64), dtype=np.float64)
-    for i in range(N):
-        item = s.iat[i]
-        if pd.isna(item): continue
-        if isinstance(item, str): values = ast.literal_eval(item.strip())
-        else: values = list(item)
-        if len(values) < 128: raise ValueError(f"[row {i}] 값이 128개 미만")
-        values = values[:128]
-        ImCSI = np.asarray(values[::2], dtype=np.int64)
-        ReCSI = np.asarray(values[1::2], dtype=np.int64)
-        AmpCSI[i, :] = np.hypot(ImCSI, ReCSI)
-        PhaseCSI[i, :] = np.arctan2(ImCSI, ReCSI)
-    Amp = np.concatenate([AmpCSI[:, 6:32], AmpCSI[:, 33:59]], axis=1)
-    Pha = np.concatenate([PhaseCSI[:, 6:32], PhaseCSI[:, 33:59]], axis=1)
-    return Amp, Pha
+    s = data[column] if isinstance(data, pd.DataFrame) else data
+    raw, valid = parse_csi_matrix(s)
+    bad = np.flatnonzero(~valid & s.notna().to_numpy(dtype=bool))
+    if bad.size: raise ValueError(f"[row {bad[0]}] 값이 128개 미만이거나 파싱할 수 없음")
+    return amp_phase_from_raw(raw)
 
-# --- 2. 노이즈 제거 (from noise_filtering.py) ---
-def dwt_denoise_matrix(X, wavelet="db4", level=None, **kwargs):
-    X = np.asarray(X, dtype=float)
-    T, Ns = X.shape
-    out = np.empty_like(X)
-    for k in range(Ns):
-        out[:, k] = _dwt_denoise_1d(X[:, k], wavelet=wavelet, level=level, **kwargs)
+# --- 1-1. 리샘플링 (from rt_preprocess.py) ---
+def resample_linear(timestamps, values, target_size, uniform_tol=1e-3, out=None):
+    """
+    불균일한 타임스탬프의 (N, C) 신호를 [t0, t_max] 구간의 균일한 target_size개 샘플로 선형 보간합니다.
+    채널마다 interp1d를 만들지 않고, 보간 위치(lo/hi 인덱스)와 가중치를 타임스탬프로부터 한 번만 계산해
+    모든 채널에 한 번의 gather + blend로 적용합니다.
+    interp1d(kind='linear', fill_value='extrapolate')와 같은 식/순서로 계산하므로 float64 결과는 비트 단위로 같습니다.
+
+    Args:
+        timestamps (np.ndarray): (N,) 타임스탬프(초). 정렬되지 않았으면 안정 정렬합니다 (interp1d와 동일).
+        values (np.ndarray): (N, C) 신호. float32면 float32로 계산하고, 정수 등 그 외는 float64로 계산합니다.
+        target_size (int): 출력 샘플 개수.
+        uniform_tol (float): 타임스탬프가 이미 출력 격자 위에 있다고 볼 허용 오차 (샘플 간격 대비 비율).
+            N == target_size이고 모든 타임스탬프가 이 안에 있으면 보간 없이 값을 그대로 반환합니다.
+        out (np.ndarray | None): 결과를 쓸 (target_size, C) 버퍼 (계산 dtype과 같아야 함). 없으면 새로 할당.
+
+    Returns:
+        np.ndarray: (target_size, C) 리샘플링된 신호.
+    """
+    t = np.asarray(timestamps, dtype=np.float64)
+    Y = np.asarray(values)
+    dtype = Y.dtype if Y.dtype == np.float32 else np.float64
+    Y = Y.astype(dtype, copy=False)
+    if t.size < 2:
+        raise ValueError("리샘플링에는 최소 2개의 샘플이 필요합니다.")
+
+    t = t - t[0]
+    if np.any(t[1:] < t[:-1]):
+        order = np.argsort(t, kind="mergesort")
+        t, Y = t[order], Y[order]
+    new_t = np.linspace(t[0], t[-1], target_size)
+
+    # 빠른 경로: 이미 SAMPLING_RATE 간격으로 균일하게 target_size개가 들어온 경우
+    if t.size == target_size and target_size > 1:
+        step = (new_t[-1] - new_t[0]) / (target_size - 1)
+        if step > 0 and np.max(np.abs(t - new_t)) <= uniform_tol * step:
+            if out is None:
+                return Y.copy()
+            out[...] = Y
+            return out
+
+    # 보간 위치와 가중치 (interp1d._call_linear와 동일)
+    hi = np.searchsorted(t, new_t).clip(1, t.size - 1)
+    lo = hi - 1
+    dx = (t[hi] - t[lo]).astype(dtype, copy=False)[:, None]
+    dt = (new_t - t[lo]).astype(dtype, copy=False)[:, None]
+    Y_lo = Y[lo]
+    if out is None:
+        return (Y[hi] - Y_lo) / dx * dt + Y_lo
+    # 같은 식을 결과 버퍼 안에서 계산 (임시 배열은 Y_lo 하나)
+    np.take(Y, hi, axis=0, out=out)
+    out -= Y_lo
+    out /= dx
+    out *= dt
+    out += Y_lo
     return out
 
-def _dwt_denoise_1d(x, wavelet, level, **kwargs):
-    x, n = np.asarray(x, dtype=float), x.size
-    w = pywt.Wavelet(wavelet)
+# --- 2. 노이즈 제거 (from noise_filtering.py) ---
+@lru_cache(maxsize=8)
+def _wavelet(name):
+    return pywt.Wavelet(name)
+
+def dwt_denoise_matrix(X, wavelet="db4", level=None, **kwargs):
+    """
+    (T, Ns) 행렬의 열(서브캐리어)별 DWT 잡음제거.
+    열마다 반복하지 않고 시간축(axis=0)으로 한 번에 분해/재구성하며,
+    임계치(채널별 universal threshold)와 레벨별 수축도 모든 채널에 대해 벡터 연산으로 처리합니다.
+    결과는 열별로 처리하던 기존 방식과 같습니다. float32 입력은 float32로 계산합니다.
+    """
+    X = np.asarray(X)
+    if X.dtype != np.float32:
+        X = X.astype(float, copy=False)
+    n = X.shape[0]
+    w = _wavelet(wavelet)
+    mode = kwargs.get("mode", "symmetric")
     if level is None: level = max(1, pywt.dwt_max_level(n, w.dec_len))
-    coeffs = pywt.wavedec(x, wavelet=w, mode=kwargs.get("mode", "symmetric"), level=level)
+    coeffs = pywt.wavedec(X, wavelet=w, mode=mode, level=level, axis=0)
     A, Ds = coeffs[0], coeffs[1:]
-    base_tau = _universal_threshold(Ds[-1], n)
+    base_tau = _universal_threshold(Ds[-1], n).astype(X.dtype, copy=False)  # (Ns,) 채널별 임계치
+    per_level_scale = kwargs.get("per_level_scale", 0.85)
     new_Ds = []
     for i, D in enumerate(Ds):
-        scale_power = (len(Ds) - 1) - i
-        tau = base_tau * (kwargs.get("per_level_scale", 0.85) ** scale_power)
-        D_shrunk = np.sign(D) * np.maximum(np.abs(D) - tau, 0.0)
-        new_Ds.append(D_shrunk)
-    new_coeffs = [A] + new_Ds
-    x_denoised = pywt.waverec(new_coeffs, wavelet=w, mode=kwargs.get("mode", "symmetric"))
+        tau = base_tau * X.dtype.type(per_level_scale ** ((len(Ds) - 1) - i))
+        new_Ds.append(np.sign(D) * np.maximum(np.abs(D) - tau, 0.0))
+    x_denoised = pywt.waverec([A] + new_Ds, wavelet=w, mode=mode, axis=0)
     return x_denoised[:n]
 
 def _universal_threshold(detail_coeffs, n):
-    sigma = np.median(np.abs(detail_coeffs - np.median(detail_coeffs))) / 0.6745
+    # axis=0: 채널(열)마다 MAD 기반 sigma
+    sigma = np.median(np.abs(detail_coeffs - np.median(detail_coeffs, axis=0)), axis=0) / 0.6745
     return sigma * np.sqrt(2 * np.log(n))
 
+# --- 2-1. 노이즈 제거: 칼만 필터 (from kalman_filter.py) ---
+def _kalman_steady_gain(q, r):
+    """random walk 모델의 정상상태 칼만 이득. 예측 공분산 P = (q + sqrt(q^2 + 4qr)) / 2."""
+    P_pred = (q + np.sqrt(q * q + 4.0 * q * r)) / 2.0
+    return P_pred / (P_pred + r)
+
+def kalman_denoise_matrix(X, q=None, r=None, q_factor=0.01, mode="steady", tol=1e-12):
+    """
+    (T, Ns) 행렬의 열(서브캐리어)별 칼만 필터(random walk 모델) 잡음제거. SOOM-AI utils/kalman_filter.py와 같은 결과.
+    이득은 데이터와 무관하게 정상상태로 수렴하므로 x_t = (1-K) x_{t-1} + K z_t 1차 IIR을 lfilter로 시간축에 적용합니다.
+    - mode="steady": 처음부터 정상상태 이득 (윈도우마다 lfilter 한 번 수준)
+    - mode="exact": 이득이 수렴할 때까지는 시간 가변 이득으로 (채널 벡터 단위) 반복 → 채널별 1D 루프와 같은 결과
+    r이 None이면 채널별 var(diff)/2, q가 None이면 q_factor * r. float32 입력은 float32로 계산합니다.
+    """
+    if mode not in ("exact", "steady"):
+        raise ValueError("mode는 'exact' 또는 'steady'여야 합니다.")
+    X = np.asarray(X)
+    if X.dtype != np.float32:
+        X = X.astype(float, copy=False)
+    T, Ns = X.shape
+    if T == 0:
+        return X.copy()
+    if r is None:
+        r = np.maximum(np.var(np.diff(X, axis=0), axis=0, ddof=1) / 2.0, 1e-12) if T >= 2 else np.ones(Ns)
+    r = np.broadcast_to(np.asarray(r, dtype=float), (Ns,))
+    q = np.maximum(q_factor * r, 1e-12) if q is None else np.broadcast_to(np.asarray(q, dtype=float), (Ns,))
+    K_ss = _kalman_steady_gain(q, r)
+
+    Y = np.empty_like(X)
+    x = X[0].astype(float)
+    t0 = 0
+    if mode == "exact":
+        P = r.copy()
+        while t0 < T:
+            P_pred = P + q
+            K = P_pred / (P_pred + r)
+            x = x + K * (X[t0] - x)
+            P = (1.0 - K) * P_pred
+            Y[t0] = x
+            t0 += 1
+            if np.all(np.abs(K - K_ss) <= tol * K_ss):
+                break
+    # 이득이 같은 채널끼리 묶어 lfilter 한 번 (초기 상태 zi = (1-K) x_{t0-1})
+    if t0 < T:
+        for k in np.unique(K_ss):
+            cols = np.flatnonzero(K_ss == k)
+            b_, a_ = np.array([k], dtype=X.dtype), np.array([1.0, k - 1.0], dtype=X.dtype)
+            zi = ((1.0 - k) * x[cols])[None, :].astype(X.dtype)
+            Y[t0:, cols], _ = lfilter(b_, a_, X[t0:, cols], axis=0, zi=zi)
+    return Y
+
 # --- 3. 정규화 (Standardization) ---
-def standardize_matrix(data: np.ndarray) -> np.ndarray:
-    """(T, F) 형태의 데이터에 대해 각 특징(F)별로 표준화를 수행합니다."""
-    mean = np.mean(data, axis=0)
-    std = np.std(data, axis=0)
+def standardize_matrix(data: np.ndarray, mean: np.ndarray | None = None, std: np.ndarray | None = None,
+                       out: np.ndarray | None = None) -> np.ndarray:
+    """
+    (T, F) 형태의 데이터에 대해 각 특징(F)별로 표준화를 수행합니다.
+    mean/std(ddof=0)를 이미 알고 있으면(예: StreamingCovariance) 전달해 다시 계산하지 않습니다.
+    out을 주면 결과를 그 버퍼에 씁니다 (data와 같은 버퍼도 가능).
+    """
+    if mean is None:
+        mean = np.mean(data, axis=0)
+    if std is None:
+        std = np.std(data, axis=0)
+    if out is not None:
+        np.subtract(data, mean, out=out)
+        out /= (std + 1e-8)
+        return out
     # 표준편차가 0인 경우를 대비하여 1e-8 더하기
     return (data - mean) / (std + 1e-8)
 
-# --- 4. 차원 축소 (from pca.py) ---
-def pca_52_subcarriers(data, n_components=1):
-    if data.shape[-1] != 52: raise ValueError(f"마지막 차원은 52여야 합니다. 현재: {data.shape[-1]}")
-    pca = PCA(n_components=n_components)
-    return pca.fit_transform(data)
+# --- 4. 차원 축소: utils/pca.py (pca_52_subcarriers, PCAEngine) ---
 
 # --- 5. 저역 통과 필터 (from fft_filter.py) ---
+@lru_cache(maxsize=16)
+def _lowpass_weights(T, cutoff_freq_ratio, dtype):
+    """
+    길이 T의 rfft 빈별 가중치 (읽기 전용).
+    기존 복소 fft 마스크 m([:c], [T-c:])을 곱한 뒤 실수부를 취한 결과는 irfft(rfft(x) * (m[k] + m[-k]) / 2)와 같습니다.
+    (+c 빈은 음의 주파수 쪽에만 남아 가중치가 0.5)
+    """
+    cutoff_index = int(T * cutoff_freq_ratio)
+    mask = np.zeros(T)
+    mask[:cutoff_index] = 1.0
+    mask[T - cutoff_index:] = 1.0
+    w = ((mask + mask[-np.arange(T) % T]) / 2)[:T // 2 + 1].astype(dtype)
+    w.flags.writeable = False
+    return w
+
+class FFTLowpassFilter:
+    """
+    rfft/irfft 기반 저역 통과 필터.
+    길이별 가중치를 캐시해 같은 길이(예: 240)의 윈도우마다 마스크를 다시 만들지 않고,
+    axis 방향으로 여러 성분/윈도우를 한 번에 거릅니다. 결과는 기존 fft_lowpass_filter와 같습니다.
+    """
+    def __init__(self, cutoff_freq_ratio: float = 0.05):
+        self.cutoff_freq_ratio = cutoff_freq_ratio
+
+    def weights(self, T: int, dtype=np.float64) -> np.ndarray:
+        return _lowpass_weights(T, float(self.cutoff_freq_ratio), np.dtype(dtype).str)
+
+    def __call__(self, data: np.ndarray, axis: int = 0) -> np.ndarray:
+        """
+        Args:
+            data: 실수 배열. (T,), (T, C), (B, T) 등 axis 방향이 시간축.
+            axis: 시간축.
+
+        Returns:
+            같은 모양의 필터링 결과. float32 입력은 float32로 계산합니다.
+        """
+        x = np.asarray(data)
+        if x.dtype != np.float32:
+            x = x.astype(float, copy=False)
+        T = x.shape[axis]
+        shape = [1] * x.ndim
+        shape[axis] = -1
+        spec = np.fft.rfft(x, axis=axis)
+        spec *= self.weights(T, x.dtype).reshape(shape)
+        return np.fft.irfft(spec, n=T, axis=axis)
+
 def fft_lowpass_filter(data_1d, cutoff_freq_ratio=0.05):
     if data_1d.ndim != 1: data_1d = data_1d.flatten()
-    T = data_1d.shape[0]
-    data_fft = np.fft.fft(data_1d)
-    cutoff_index = int(T * cutoff_freq_ratio)
-    mask = np.zeros(T, dtype=bool)
-    mask[:cutoff_index] = True
-    mask[T - cutoff_index:] = True
-    data_fft_filtered = data_fft * mask
-    return np.real(np.fft.ifft(data_fft_filtered))
+    return FFTLowpassFilter(cutoff_freq_ratio)(data_1d)
 
 # --- BPM 계산 ---
 def calculate_bpm_from_signal(
@@ -141,4 +289,74 @@ def calculate_bpm_from_signal(
     total_energy_in_range = np.sum(masked_magnitudes)
     confidence = peak_energy / total_energy_in_range if total_energy_in_range > 0 else 0
     
-    return {"bpm": bpm, "bpm_conf": confidence, "ok": True}
\ No newline at end of file
+    return {"bpm": bpm, "bpm_conf": confidence, "ok": True}
+
+
+@lru_cache(maxsize=8)
+def _zoom_fft(n, f_lo, f_hi, n_points, fs):
+    # 길이/대역/샘플링 속도가 같으면 chirp 계수를 다시 만들지 않음
+    return ZoomFFT(n, [f_lo, f_hi], m=n_points, fs=fs, endpoint=True)
+
+def calculate_bpm_zoom(
+    signals: np.ndarray,
+    sampling_rate: float,
+    min_freq: float = 0.1, # 6 BPM
+    max_freq: float = 0.6, # 36 BPM
+    n_points: int = 301,
+    detrend: bool = True,
+    axis: int = -1,
+) -> dict:
+    """
+    호흡 대역만 촘촘하게 계산하는 BPM 추정 (zoom FFT / chirp-z + 포물선 보간).
+
+    rfft는 빈 간격이 fs/N(4초 윈도우에서 0.25 Hz = 15 BPM)이지만, ZoomFFT로 [min_freq, max_freq]를
+    n_points개 격자에서 계산하고 피크 주변 3점에 포물선을 맞춰 격자 사이의 주파수까지 추정합니다.
+    여러 윈도우를 (B, T) 형태로 한 번에 넣을 수 있습니다 (axis가 시간축).
+
+    Args:
+        signals (np.ndarray): (T,) 또는 (..., T) 전처리가 완료된 신호.
+        sampling_rate (float): 신호의 샘플링 속도 (Hz).
+        min_freq, max_freq (float): 탐색할 주파수 범위 (Hz).
+        n_points (int): 대역 안 격자 점 수 (기본 301 -> 6~36 BPM에서 0.1 BPM 간격).
+        detrend (bool): 평균을 빼서 DC 누설을 줄입니다.
+        axis (int): 시간축.
+
+    Returns:
+        dict: calculate_bpm_from_signal과 같은 키 (bpm, bpm_conf, ok). 1차원 입력이면 스칼라,
+        여러 윈도우면 (...) 배열입니다. bpm_conf는 피크 주변 원래 해상도 1빈(fs/N) 폭의 크기 합 / 대역 전체 크기 합.
+    """
+    x = np.moveaxis(np.asarray(signals), axis, -1)
+    if x.dtype != np.float32:
+        x = x.astype(float, copy=False)
+    n = x.shape[-1]
+    if n < 3 or n_points < 3:
+        return {"bpm": 0, "bpm_conf": 0, "ok": False}
+    if detrend:
+        x = x - x.mean(axis=-1, keepdims=True)
+
+    mag = np.abs(_zoom_fft(n, float(min_freq), float(max_freq), n_points, float(sampling_rate))(x, axis=-1))
+    df = (max_freq - min_freq) / (n_points - 1)
+
+    # 피크 + 포물선 보간 (양 끝 점이면 보간하지 않음)
+    i = np.argmax(mag, axis=-1)[..., None]
+    ic = np.clip(i, 1, n_points - 2)
+    a, b, c = (np.take_along_axis(mag, ic + d, axis=-1)[..., 0] for d in (-1, 0, 1))
+    denom = a - 2 * b + c
+    with np.errstate(divide="ignore", invalid="ignore"):
+        delta = np.where((i[..., 0] == ic[..., 0]) & (denom < 0), 0.5 * (a - c) / denom, 0.0)
+    delta = np.clip(delta, -0.5, 0.5)
+    freq = min_freq + (i[..., 0] + delta) * df
+
+    # 신뢰도: 원래 해상도 1빈 폭 안의 크기 / 대역 전체 크기
+    lobe = max(int(round(sampling_rate / n / df / 2)), 0)
+    k = np.arange(n_points)
+    near = np.abs(k - i) <= lobe
+    total = mag.sum(axis=-1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        conf = np.where(total > 0, (mag * near).sum(axis=-1) / total, 0.0)
+    bpm = freq * 60
+    ok = total > 0
+
+    if np.ndim(bpm) == 0:
+        return {"bpm": float(bpm), "bpm_conf": float(conf), "ok": bool(ok)}
+    return {"bpm": bpm, "bpm_conf": conf, "ok": ok}
@@ -1,70 +1,205 @@
 # utils/sliding_window.py
 import numpy as np
-from collections import deque
+
+from .streaming_stats import StreamingCovariance
+
 
 class SlidingWindow:
     """
     실시간 데이터 스트림을 위한 슬라이딩 윈도우.
     데이터 청크를 받아 윈도우를 채우고, 윈도우가 가득 차면 데이터를 제공한 뒤
     일정 스텝만큼 슬라이드합니다.
+
+    내부는 크기가 고정된 (capacity, F) numpy 링 버퍼이며, 각 행을 [i]와 [i + capacity]에
+    두 번 써 둡니다. 그래서 최근 n개 행(n <= capacity)은 항상 연속된 구간이 되어
+    복사 없이 뷰로 꺼낼 수 있습니다. 행마다 타임스탬프(float64, 없으면 NaN)를 함께 보관하므로
+    샘플 개수 기준(get_window)과 시간 기준(time_window) 윈도우를 모두 지원합니다.
+
+    track_stats=True면 최근 min(current_size, window_size)개 행(= 다음 get_window가 반환할 윈도우)의
+    평균/표준편차/공분산을 self.stats(StreamingCovariance)로 유지합니다. 새 행은 더하고 윈도우에서
+    밀려나는 행은 빼므로 갱신 비용이 O(step)입니다. get_window()는 슬라이드하므로 통계는 그 전에 읽어야 합니다.
     """
-    def __init__(self, window_size: int, step_size: int):
+    def __init__(self, window_size: int, step_size: int, n_features: int = 52,
+                 capacity: int | None = None, dtype=np.float32,
+                 track_stats: bool = False, resync_every: int = 64):
         """
         Args:
             window_size (int): 추론에 사용할 데이터 포인트의 수.
             step_size (int): 윈도우를 이동시킬 데이터 포인트의 수.
+            n_features (int): 행당 값의 개수 (진폭 52 서브캐리어, 원본 CSI면 128).
+            capacity (int | None): 보관할 최대 행 수. 기본값은 window_size의 2배 (기존 deque 버퍼와 동일).
+            dtype: 저장 dtype. 기본 float32.
+            track_stats (bool): 윈도우 통계를 누적 갱신할지 여부.
+            resync_every (int): 누적 오차를 없애기 위해 이 횟수만큼 갱신할 때마다 통계를 버퍼에서 다시 계산.
         """
         if window_size < step_size:
             raise ValueError("window_size는 step_size보다 크거나 같아야 합니다.")
-        
+        capacity = capacity or window_size * 2
+        if capacity < window_size:
+            raise ValueError("capacity는 window_size보다 크거나 같아야 합니다.")
+
         self.window_size = window_size
         self.step_size = step_size
-        
-        # 데이터를 효율적으로 추가하고 제거하기 위해 deque 사용
-        self.buffer = deque()
-        self.current_size = 0
+        self.n_features = n_features
+        self.capacity = capacity
+        self.dtype = np.dtype(dtype)
+
+        self._data = np.zeros((2 * capacity, n_features), dtype=self.dtype)
+        self._ts = np.full(2 * capacity, np.nan)
+        self._head = 0          # 다음 행을 쓸 위치 [0, capacity)
+        self.current_size = 0   # 유효한 행 수 (<= capacity)
+
+        self.stats = StreamingCovariance(n_features) if track_stats else None
+        self.resync_every = resync_every
+        self._tracked = 0       # stats에 반영된 최근 행 수 (= min(current_size, window_size))
+
+    def _write(self, rows: np.ndarray, ts: np.ndarray):
+        cap, head = self.capacity, self._head
+        first = min(len(rows), cap - head)
+        rest = len(rows) - first
+        for buf, src in ((self._data, rows), (self._ts, ts)):
+            buf[head:head + first] = src[:first]
+            buf[head + cap:head + cap + first] = src[:first]
+            buf[:rest] = src[first:]
+            buf[cap:cap + rest] = src[first:]
+        self._head = (head + len(rows)) % cap
+
+    def extend(self, data_chunk: np.ndarray, timestamps: np.ndarray | None = None):
+        """
+        (T, F) 청크를 한 번에 추가합니다. capacity를 넘는 오래된 행은 덮어씁니다.
+
+        Args:
+            data_chunk (np.ndarray): (T, F) 또는 (F,) 배열.
+            timestamps (np.ndarray | None): (T,) 타임스탬프(초). 없으면 NaN.
+        """
+        rows = np.asarray(data_chunk)
+        if rows.ndim == 1:
+            rows = rows[None, :]
+        if rows.shape[1] != self.n_features:
+            raise ValueError(f"행당 값 개수가 {self.n_features}이어야 합니다. (입력: {rows.shape[1]})")
+
+        ts = np.full(len(rows), np.nan) if timestamps is None else np.asarray(timestamps, dtype=np.float64)
+        if len(ts) != len(rows):
+            raise ValueError("timestamps 길이가 data_chunk 행 수와 다릅니다.")
+
+        # 한 번에 capacity보다 많이 들어오면 마지막 capacity개만 의미가 있음
+        if len(rows) > self.capacity:
+            rows, ts = rows[-self.capacity:], ts[-self.capacity:]
+
+        if self.stats is not None and len(rows) < self.window_size:
+            # 새 행이 들어오면 윈도우 밖으로 밀려날 가장 오래된 행들을 먼저 뺌 (덮어쓰기 전에)
+            self._stats_drop_oldest(self._tracked + len(rows) - self.window_size)
+
+        self._write(rows, ts)
+        self.current_size = min(self.current_size + len(rows), self.capacity)
+
+        if self.stats is not None:
+            if len(rows) >= self.window_size:
+                self._tracked = self.window_size
+                self.stats.reset(self.latest(self._tracked))
+            else:
+                self.stats.add(self.latest(len(rows)))  # 저장 dtype으로 변환된 값 기준
+                self._tracked += len(rows)
+                self._maybe_resync()
+
+    def _stats_drop_oldest(self, k: int):
+        if k <= 0:
+            return
+        # current_size가 이미 줄었을 수 있으므로 latest()가 아닌 버퍼 위치로 직접 읽음
+        start = self._head + self.capacity - self._tracked
+        self.stats.remove(self._data[start:start + k])
+        self._tracked -= k
 
-    def add_data(self, data_chunk: np.ndarray):
+    def _maybe_resync(self):
+        if self.stats.updates >= self.resync_every:
+            self.stats.reset(self.latest(self._tracked))
+
+    def _sync_stats(self):
+        """current_size가 줄어든 뒤 stats를 최근 min(current_size, window_size)개 행에 맞춥니다."""
+        if self.stats is None:
+            return
+        self._stats_drop_oldest(self._tracked - min(self.current_size, self.window_size))
+        self._maybe_resync()
+
+    def add_data(self, data_chunk: np.ndarray, timestamps: np.ndarray | None = None):
         """
         새로운 데이터 청크를 버퍼에 추가합니다.
         data_chunk는 (T, F) 형태의 2D 배열이어야 합니다.
         """
-        # deque는 1차원 데이터만 받으므로 각 row를 튜플이나 리스트로 추가
-        for row in data_chunk:
-            self.buffer.append(row)
-        
-        self.current_size += len(data_chunk)
-        
-        # 버퍼가 너무 커지는 것을 방지 (예: window_size의 2배 이상)
-        # 실제로는 get_window와 slide가 주기적으로 호출되므로 극단적인 경우는 적음
-        max_buffer_len = self.window_size * 2 
-        while self.current_size > max_buffer_len:
-            self.buffer.popleft()
-            self.current_size -= 1
-            
+        self.extend(data_chunk, timestamps)
+
     def is_ready(self) -> bool:
         """윈도우가 추론할 만큼 충분한 데이터를 가졌는지 확인합니다."""
         return self.current_size >= self.window_size
 
-    def get_window(self) -> np.ndarray:
+    def latest(self, n: int | None = None) -> np.ndarray:
+        """최근 n개 행(기본: 전체)의 뷰를 반환합니다. 이후 extend가 내용을 덮어쓸 수 있습니다."""
+        n = self.current_size if n is None else min(n, self.current_size)
+        end = self._head + self.capacity
+        return self._data[end - n:end]
+
+    def latest_timestamps(self, n: int | None = None) -> np.ndarray:
+        """latest(n)과 같은 구간의 타임스탬프 뷰."""
+        n = self.current_size if n is None else min(n, self.current_size)
+        end = self._head + self.capacity
+        return self._ts[end - n:end]
+
+    def get_window(self, copy: bool = True) -> np.ndarray:
         """
         현재 버퍼에서 추론에 사용할 윈도우를 반환하고 슬라이드합니다.
         is_ready()가 True일 때만 호출해야 합니다.
+
+        Args:
+            copy (bool): False면 복사 없이 버퍼 뷰를 반환합니다. 다음 extend 전까지만 유효합니다.
         """
         if not self.is_ready():
             raise RuntimeError("윈도우가 아직 준비되지 않았습니다. is_ready()를 먼저 확인하세요.")
-        
-        # 현재 버퍼를 NumPy 배열로 변환
-        full_buffer_np = np.array(self.buffer)
-        
+
         # 최신 데이터 window_size 만큼을 잘라냄
-        window_data = full_buffer_np[-self.window_size:]
-        
-        # 윈도우를 step_size 만큼 슬라이드
-        for _ in range(self.step_size):
-            if self.buffer:
-                self.buffer.popleft()
-        
+        window_data = self.latest(self.window_size)
+
+        # 윈도우를 step_size 만큼 슬라이드 (가장 오래된 행부터 버림)
         self.current_size -= self.step_size
-        
-        return window_data
\ No newline at end of file
+        self._sync_stats()
+
+        return window_data.copy() if copy else window_data
+
+    def span(self) -> float:
+        """버퍼에 있는 데이터의 시간 길이(초). 타임스탬프가 없으면 NaN."""
+        if self.current_size == 0:
+            return 0.0
+        ts = self.latest_timestamps()
+        return float(ts[-1] - ts[0])
+
+    def time_window(self, duration: float, end: float | None = None, copy: bool = False) -> tuple[np.ndarray, np.ndarray]:
+        """
+        시간 기준 윈도우: 타임스탬프가 (end - duration, end] 구간인 행을 반환합니다.
+        타임스탬프는 증가 순서로 들어온다고 가정합니다.
+
+        Args:
+            duration (float): 윈도우 길이(초).
+            end (float | None): 윈도우 끝 시각. 기본값은 가장 최근 타임스탬프.
+            copy (bool): True면 복사본을 반환합니다.
+
+        Returns:
+            tuple: timestamps (n,), rows (n, F)
+        """
+        ts = self.latest_timestamps()
+        rows = self.latest()
+        if end is None:
+            end = ts[-1] if len(ts) else 0.0
+        lo, hi = np.searchsorted(ts, [end - duration, end], side="right")
+        ts, rows = ts[lo:hi], rows[lo:hi]
+        return (ts.copy(), rows.copy()) if copy else (ts, rows)
+
+    def drop_before(self, t: float):
+        """타임스탬프가 t보다 이전인 행을 버립니다. (시간 기준 슬라이드)"""
+        ts = self.latest_timestamps()
+        self.current_size -= int(np.searchsorted(ts, t, side="left"))
+        self._sync_stats()
+
+    def clear(self):
+        self.current_size = 0
+        if self.stats is not None:
+            self.stats.reset()
+            self._tracked = 0
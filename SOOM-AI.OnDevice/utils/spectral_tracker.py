@@ -0,0 +1,139 @@
+# utils/spectral_tracker.py
+# 호흡 대역(0.1~0.6 Hz) 빈만 샘플마다 갱신하는 sliding DFT.
+# calculate_bpm_from_signal처럼 윈도우마다 전체 rfft를 하지 않고, 새 샘플이 들어올 때 대역 안의 수십 개 빈만
+# O(bins)로 갱신하므로 윈도우를 길게(예: 30초) 잡아 해상도를 높여도 샘플당 비용이 늘지 않습니다.
+from functools import lru_cache
+
+import numpy as np
+
+
+@lru_cache(maxsize=8)
+def _block_powers(omega_key: tuple, L: int) -> np.ndarray:
+    """(bins, L) 행렬 z^(L-1-i), z = exp(-j*omega). 같은 블록 길이가 반복되므로 캐시합니다 (읽기 전용)."""
+    omega = np.asarray(omega_key)
+    E = np.exp(-1j * omega[:, None] * np.arange(L - 1, -1, -1)[None, :])
+    E.flags.writeable = False
+    return E
+
+
+class SlidingDFTTracker:
+    """
+    실수 샘플 스트림의 최근 N개(window_sec)에 대한 DFT를 지정한 주파수 격자에서만 유지합니다.
+
+    X_f(n) = sum_{m=0}^{N-1} x(n-m) z^m,  z = exp(-j 2 pi f / fs)  (가장 최근 샘플 기준 위상)
+    L개 샘플 블록이 들어오면 X <- z^L X + E @ x_new - z^N (E @ x_old) 로 갱신합니다 (E: L열 거듭제곱 행렬).
+    주파수는 fs/N의 정수배일 필요가 없으며, 격자 간격은 fs / (N * zero_pad) 입니다.
+
+    - window="hann": 격자가 fs/N 간격의 이웃 빈을 포함하므로 주파수 영역에서 0.5 X(f) - 0.25 X(f -+ fs/N)로
+      hann 창을 적용합니다 (대역 양옆으로 zero_pad개 빈을 더 추적).
+    - detrend=True: 누적합으로 구한 윈도우 평균의 DFT를 빼서 DC 누설을 없앱니다.
+    - 더하고 빼기를 반복하며 생기는 반올림 오차는 resync_every 샘플마다 링 버퍼에서 직접 다시 계산해 없앱니다.
+    """
+    def __init__(self, fs: float, window_sec: float = 30.0, bpm_lo: float = 6.0, bpm_hi: float = 36.0,
+                 zero_pad: int = 4, window: str = "hann", detrend: bool = True, resync_every: int = 36000):
+        """
+        Args:
+            fs (float): 샘플링 속도 (Hz).
+            window_sec (float): DFT 윈도우 길이 (초). 길수록 해상도(fs/N)가 좋아집니다.
+            bpm_lo, bpm_hi (float): 추적할 호흡수 범위 (BPM).
+            zero_pad (int): 격자 간격을 fs/N보다 몇 배 촘촘하게 할지 (정수).
+            window (str): "hann" 또는 "boxcar".
+            detrend (bool): 윈도우 평균 제거 여부.
+            resync_every (int): 직접 재계산 주기 (샘플 수). |z|=1이라 오차가 커지지 않으므로 드물게 (60 Hz에서 10분).
+        """
+        if window not in ("hann", "boxcar"):
+            raise ValueError("window는 'hann' 또는 'boxcar'여야 합니다.")
+        self.fs = fs
+        self.N = int(round(window_sec * fs))
+        self.zero_pad = max(1, int(zero_pad))
+        self.window = window
+        self.detrend = detrend
+        self.resync_every = resync_every
+
+        # 대역 격자 (간격 fs / (N * zero_pad)). hann이면 양옆으로 zero_pad개 빈을 더 추적
+        df = fs / (self.N * self.zero_pad)
+        k_lo, k_hi = int(np.floor(bpm_lo / 60.0 / df)), int(np.ceil(bpm_hi / 60.0 / df))
+        pad = self.zero_pad if window == "hann" else 0
+        self._k = np.arange(k_lo - pad, k_hi + pad + 1)
+        self._band = slice(pad, len(self._k) - pad)
+        self.freqs = self._k[self._band] * df                      # (bins,) Hz
+        self._omega = 2 * np.pi * self._k * df / fs
+        self._omega_key = tuple(self._omega.tolist())
+        self._zN = np.exp(-1j * self._omega * self.N)
+        # 길이 N 상수 신호의 DFT: sum_{m<N} z^m (평균 제거용). omega가 0이면 N
+        z = np.exp(-1j * self._omega)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            self._ones = np.where(np.isclose(self._omega, 0.0), self.N, (1 - self._zN) / (1 - z))
+        self.clear()
+
+    def clear(self):
+        self._buf = np.zeros(self.N)     # 최근 N개 샘플 링 버퍼 (처음에는 0)
+        self._pos = 0                    # 다음에 쓸 위치 (= 가장 오래된 샘플)
+        self._X = np.zeros(len(self._k), dtype=complex)
+        self._sum = 0.0
+        self.n_samples = 0
+        self._since_sync = 0
+
+    def _ordered(self) -> np.ndarray:
+        """버퍼를 오래된 순서로."""
+        return np.roll(self._buf, -self._pos)
+
+    def resync(self):
+        """링 버퍼로 X를 직접 다시 계산합니다. O(N * bins)."""
+        x = self._ordered()[::-1]        # x(n-m), m = 0..N-1
+        self._X = np.exp(-1j * self._omega[:, None] * np.arange(self.N)[None, :]) @ x
+        self._sum = float(x.sum())
+        self._since_sync = 0
+
+    def push(self, samples: np.ndarray):
+        """새 샘플들(시간 순서)을 추가하고 추적 중인 빈을 갱신합니다."""
+        x = np.asarray(samples, dtype=np.float64).ravel()
+        for s in range(0, len(x), self.N):   # 블록은 N보다 길 수 없음
+            self._push_block(x[s:s + self.N])
+        if self._since_sync >= self.resync_every:
+            self.resync()
+
+    def _push_block(self, new: np.ndarray):
+        L = len(new)
+        idx = (self._pos + np.arange(L)) % self.N
+        old = self._buf[idx]              # 윈도우 밖으로 밀려나는 샘플 x(n+i-N)
+        E = _block_powers(self._omega_key, L)
+        zL = E[:, 0] * np.exp(-1j * self._omega)  # z^L
+        self._X = zL * self._X + E @ new - self._zN * (E @ old)
+        self._sum += float(new.sum() - old.sum())
+        self._buf[idx] = new
+        self._pos = (self._pos + L) % self.N
+        self.n_samples += L
+        self._since_sync += L
+
+    def spectrum(self) -> np.ndarray:
+        """대역 격자(self.freqs)의 복소 DFT 값 (창/평균 제거 적용)."""
+        X = self._X
+        if self.detrend:
+            X = X - (self._sum / self.N) * self._ones
+        if self.window == "hann":
+            p = self.zero_pad
+            X = 0.5 * X[p:-p] - 0.25 * (X[:-2 * p] + X[2 * p:])
+        return X
+
+    def power(self) -> np.ndarray:
+        return np.abs(self.spectrum()) ** 2
+
+    def estimate(self) -> dict:
+        """
+        대역 안 최대 피크의 BPM과 신뢰도(피크 양옆 1빈(fs/N) 에너지 / 대역 전체 에너지).
+
+        Returns:
+            dict: {'bpm', 'bpm_conf', 'f_hz', 'ok'}. 윈도우가 아직 다 차지 않았으면 ok=False.
+        """
+        P = self.power()
+        i = int(np.argmax(P))
+        total = float(P.sum())
+        lobe = self.zero_pad
+        peak = float(P[max(i - lobe, 0):i + lobe + 1].sum())
+        return {
+            "bpm": float(self.freqs[i] * 60.0),
+            "bpm_conf": peak / total if total > 0 else 0.0,
+            "f_hz": float(self.freqs[i]),
+            "ok": self.n_samples >= self.N and total > 0,
+        }
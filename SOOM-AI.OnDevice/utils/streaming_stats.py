@@ -0,0 +1,84 @@
+# utils/streaming_stats.py
+# 겹치는 윈도우용 누적 통계.
+# 윈도우가 step만큼 이동할 때 새 행은 더하고 빠지는 행은 빼서, 서브캐리어별 평균/표준편차와
+# 52x52 공분산을 O(window)가 아닌 O(step)으로 갱신합니다.
+import numpy as np
+
+
+class StreamingCovariance:
+    """
+    행 단위로 추가/제거되는 (n, F) 데이터의 합과 교차곱(52x52)을 유지합니다.
+
+    큰 값(예: 진폭 ~10^1)의 제곱합에서 평균을 빼면 자릿수 손실이 생기므로, 처음 들어온 행을
+    기준값(shift)으로 빼고 누적합니다. 더하고 빼기를 반복하면 오차가 쌓이므로 호출 측에서
+    updates가 일정 횟수를 넘으면 reset(현재 행들)으로 다시 맞춥니다. (SlidingWindow의 track_stats 참고)
+    """
+    def __init__(self, n_features: int = 52):
+        self.n_features = n_features
+        self.reset()
+
+    def reset(self, rows: np.ndarray | None = None):
+        """통계를 비우고, rows가 주어지면 그 행들로 새로 계산합니다."""
+        self.n = 0
+        self.updates = 0        # 마지막 reset 이후 add/remove 호출 수
+        self._shift = None
+        self._sum = np.zeros(self.n_features)
+        self._cross = np.zeros((self.n_features, self.n_features))
+        if rows is not None and len(rows):
+            self.add(rows)
+            self.updates = 0
+
+    def _centered(self, rows: np.ndarray) -> np.ndarray:
+        rows = np.asarray(rows, dtype=np.float64)
+        if rows.ndim == 1:
+            rows = rows[None, :]
+        if self._shift is None:
+            self._shift = rows[0].copy()
+        return rows - self._shift
+
+    def add(self, rows: np.ndarray):
+        """(k, F) 행들을 통계에 더합니다."""
+        d = self._centered(rows)
+        self.n += len(d)
+        self._sum += d.sum(axis=0)
+        self._cross += d.T @ d
+        self.updates += 1
+
+    def remove(self, rows: np.ndarray):
+        """이전에 add한 (k, F) 행들을 통계에서 뺍니다."""
+        d = self._centered(rows)
+        self.n -= len(d)
+        if self.n <= 0:
+            self.reset()
+            return
+        self._sum -= d.sum(axis=0)
+        self._cross -= d.T @ d
+        self.updates += 1
+
+    @property
+    def mean(self) -> np.ndarray:
+        if self.n == 0:
+            return np.zeros(self.n_features)
+        return self._shift + self._sum / self.n
+
+    def covariance(self, ddof: int = 1) -> np.ndarray:
+        """(F, F) 공분산. ddof=1은 np.cov, ddof=0은 모분산 기준."""
+        if self.n - ddof <= 0:
+            return np.zeros((self.n_features, self.n_features))
+        m = self._sum / self.n
+        return (self._cross - self.n * np.outer(m, m)) / (self.n - ddof)
+
+    def var(self, ddof: int = 0) -> np.ndarray:
+        return np.maximum(np.diag(self.covariance(ddof)), 0.0)
+
+    def std(self, ddof: int = 0) -> np.ndarray:
+        """서브캐리어별 표준편차 (기본 ddof=0, standardize_matrix의 np.std와 같음)."""
+        return np.sqrt(self.var(ddof))
+
+    def standardized_covariance(self, eps: float = 1e-8) -> np.ndarray:
+        """
+        standardize_matrix((x - mean) / (std + eps))를 적용한 데이터의 공분산(ddof=1).
+        표준화 후 PCA를 할 때 데이터를 다시 훑지 않고 주성분을 구할 수 있습니다.
+        """
+        scale = self.std() + eps
+        return self.covariance(ddof=1) / np.outer(scale, scale)
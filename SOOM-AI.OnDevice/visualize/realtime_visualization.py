@@ -3,8 +3,6 @@ from __future__ import annotations
 import argparse
 import threading
 import queue
-import re
-import ast
 import sys
 from collections import deque
 
@@ -18,6 +16,7 @@ from pyqtgraph.Qt import QtCore
 # utils 폴더에 전처리 파일들이 있어야 합니다.
 from utils.noise_filtering import dwt_denoise_matrix
 from utils.pca import pca_52_subcarriers
+from data_source.serial_reader import SerialCSIReader
 
 # -------------------- CLI 인자 설정 --------------------
 ap = argparse.ArgumentParser(description="Realtime ESP32 CSI Preprocessing and Visualization")
@@ -43,60 +42,34 @@ except SerialException as e:
     sys.exit(1)
 
 # -------------------- CSI 데이터 파서 --------------------
-BRACKET_RE = re.compile(r'\[(.*?)\]')
 # LLTF subcarriers (52 total), from esp32-csi-tool documentation
-SUBCARRIER_IDXS = list(range(6, 32)) + list(range(33, 59))
+SUBCARRIER_IDXS = np.r_[6:32, 33:59]
+# CSI는 I/Q 샘플이 번갈아 나옴 (imaginary, real, imaginary, real, ...)
+_IM_IDXS = 2 * SUBCARRIER_IDXS
+_RE_IDXS = 2 * SUBCARRIER_IDXS + 1
 
-def parse_csi_line(line: str) -> np.ndarray | None:
-    """한 줄의 CSI 문자열을 파싱하여 52개 서브캐리어의 진폭 배열을 반환합니다."""
-    if "CSI_DATA" not in line:
-        return None
+def csi_amplitudes(raw: np.ndarray) -> np.ndarray:
+    """(N,128) int8 CSI 행렬에서 52개 서브캐리어의 진폭 (N,52)을 계산합니다."""
+    return np.hypot(raw[:, _RE_IDXS].astype(np.float32), raw[:, _IM_IDXS].astype(np.float32))
 
-    match = BRACKET_RE.search(line)
-    if not match:
-        return None
+# -------------------- 시리얼 리더 스레드 --------------------
+# UI 멈춤을 방지하기 위해 별도 스레드에서 시리얼 데이터를 읽음.
+# 줄 단위 readline/파싱 대신 큰 덩어리로 읽어 배치 단위로 파싱 (data_source/serial_reader.py)
+q = queue.Queue(maxsize=500)
+csi_reader = SerialCSIReader(ser, batch_size=64, timestamp_field=None, line_prefix=b"CSI_DATA", flush_interval=0.05)
 
+def on_batch(_timestamps: np.ndarray, raw: np.ndarray):
     try:
-        # 문자열을 정수 리스트로 변환
-        values = ast.literal_eval("[" + match.group(1) + "]")
-        if len(values) < 128:
-            return None  # 데이터가 충분하지 않으면 무시
-
-        # CSI는 I/Q 샘플이 번갈아 나옴 (imaginary, real, imaginary, real, ...)
-        # esp32-csi-tool은 LLTF 필드의 64개 서브캐리어 값을 제공
-        csi_raw = np.array(values, dtype=np.int8)
-
-        # 복소수 형태로 변환: c = Q + i*I
-        csi_cmplx = csi_raw[1:129:2] + 1j * csi_raw[0:128:2]
-
-        # 진폭 계산
-        csi_amp = np.abs(csi_cmplx)
-
-        # 논문/연구에서 주로 사용하는 52개 서브캐리어만 선택
-        return csi_amp[SUBCARRIER_IDXS]
-
-    except (ValueError, SyntaxError):
-        return None
-
-# -------------------- 시리얼 리더 스레드 --------------------
-# UI 멈춤을 방지하기 위해 별도 스레드에서 시리얼 데이터를 읽음
-q = queue.Queue(maxsize=5000)
-stop_flag = False
+        q.put_nowait(csi_amplitudes(raw))
+    except queue.Full:
+        # 큐가 가득 차면 새 데이터를 버림
+        pass
 
 def reader_thread():
-    while not stop_flag:
-        try:
-            raw = ser.readline()
-            if not raw:
-                continue
-            line = raw.decode("utf-8", "ignore").strip()
-            if line:
-                q.put_nowait(line)
-        except queue.Full:
-            # 큐가 가득 차면 오래된 데이터를 버림
-            pass
-        except Exception:
-            break  # 스레드 종료
+    try:
+        csi_reader.run(on_batch)
+    except Exception:
+        pass  # 스레드 종료
     print("[Serial] Reader thread stopped.")
 
 threading.Thread(target=reader_thread, daemon=True).start()
@@ -157,13 +130,9 @@ def _lock_y_axis_once(ydata: np.ndarray):
 
 def update():
     """타이머에 의해 주기적으로 호출되어 데이터 처리 및 시각화를 수행합니다."""
-    processed_count = 0
-    while not q.empty() and processed_count < 100:  # 한 번에 너무 많은 프레임 처리 방지
-        line = q.get_nowait()
-        amps = parse_csi_line(line)
-        if amps is not None and amps.shape == (52,):
-            csi_amplitude_buffer.append(amps)
-            processed_count += 1
+    while not q.empty():
+        # 배치 단위 (N,52) 진폭. deque(maxlen)이므로 오래된 프레임은 자동으로 밀려남
+        csi_amplitude_buffer.extend(q.get_nowait())
 
     # 버퍼에 충분한 데이터가 쌓였는지 확인
     if len(csi_amplitude_buffer) < args.window_size:
@@ -200,7 +169,7 @@ if __name__ == "__main__":
     try:
         pg.exec()
     finally:
-        stop_flag = True
+        csi_reader.stop()
         try:
             ser.close()
             print("[Serial] Port closed.")
@@ -1,6 +1,8 @@
 # data_preprocessing.py
 # CSI 데이터 전처리 파이프라인
 
+import time
+
 from utils.extract import amp_phase_from_csi
 from utils.load import load_csi_data
 from utils.normalize import amplitude_normalization
@@ -14,27 +16,46 @@ from utils.fft_filter import fft_lowpass_filter
 import model.config as C
 
 
-def preprocess_csi_data(excel_file):
+def _lap(timings, stage, t0):
+    """timings(dict)가 있으면 stage에 t0 이후 경과 시간을 더하고, 다음 단계 시작 시각을 반환."""
+    t1 = time.perf_counter()
+    if timings is not None:
+        timings[stage] = timings.get(stage, 0.0) + (t1 - t0)
+    return t1
+
+
+def preprocess_csi_data(excel_file, timings=None):
+    """
+    timings: dict를 넘기면 단계별 소요 시간(초)을 누적합니다
+    (load / extract / normalize / denoise / pca / fft, save_preprocessed_to_disk가 실행 전체로 합산).
+    """
+    t = time.perf_counter()
     # CSI 데이터 로드
     data = load_csi_data(excel_file)
+    t = _lap(timings, "load", t)
     
     # 진폭 및 위상 추출
     amp, _ = amp_phase_from_csi(data)
+    t = _lap(timings, "extract", t)
 
     # 시간축 크롭
     # cropped_amp = crop_time(amp, window_size=C.INPUT_LENGTH)
     
     # 진폭 정규화
     normalized_amp = amplitude_normalization(amp)
+    t = _lap(timings, "normalize", t)
 
     # 노이즈 제거
     noise_filtered_amp = dwt_denoise_matrix(normalized_amp)
     # noise_filtered_amp = kalman_denoise_matrix(normalized_amp)
+    t = _lap(timings, "denoise", t)
 
     # pca
     pca_amp = pca_52_subcarriers(noise_filtered_amp, 1)
+    t = _lap(timings, "pca", t)
 
     # fft lowpass filter
     fft_filtered = fft_lowpass_filter(pca_amp)
+    _lap(timings, "fft", t)
 
     return fft_filtered
\ No newline at end of file
@@ -5,52 +5,112 @@ import numpy as np
 import pandas as pd
 import ast
 
-def amp_phase_from_csi(data, column='data'):
+# 프레임당 원본 값 개수: 64 서브캐리어 x (Im, Re)
+NUM_CSI_VALUES = 2 * 64
+
+# 서브캐리어 선택: 0-based로 6..31, 33..58
+SUBCARRIER_IDXS = np.r_[6:32, 33:59]
+# [Im, Re, Im, Re, ...] 교차 배열에서 선택된 서브캐리어의 위치
+_IM_IDXS = 2 * SUBCARRIER_IDXS
+_RE_IDXS = 2 * SUBCARRIER_IDXS + 1
+
+# 정상 CSI 문자열 "[0,0,-18,12,...]" (정수만, 끝 쉼표 없음)
+_CSI_TEXT_PATTERN = r"\s*\[\s*-?\d+(?:\s*,\s*-?\d+)*\s*\]\s*"
+
+
+def _fast_text_mask(s: pd.Series) -> np.ndarray:
+    """일괄 파서로 처리할 수 있는 행 표시"""
+    try:
+        matched = s.str.fullmatch(_CSI_TEXT_PATTERN)
+    except AttributeError:
+        # 문자열 값이 전혀 없음 (예: 전부 NaN인 float 컬럼)
+        return np.zeros(len(s), dtype=bool)
+    return matched.to_numpy(dtype=bool, na_value=False)
+
+
+def _literal_values(item):
+    """일괄 파서가 인식하지 못한 값의 기존 행 단위 파싱"""
+    if isinstance(item, str):
+        try:
+            values = ast.literal_eval(item.strip())
+        except (ValueError, SyntaxError):
+            return None
+        return values if isinstance(values, (list, tuple)) else None
+    try:
+        return list(item)
+    except TypeError:
+        return None
+
+
+def parse_csi_matrix(data, column='data'):
     """
+    CSI 문자열 컬럼 전체를 한 번에 정수 행렬로 변환.
+    정상 문자열은 정규식 한 번으로 검증한 뒤 이어 붙여 numpy 한 번으로 변환하고,
+    그 외(리스트/배열, 특이한 리터럴)는 기존 ast.literal_eval 경로로 처리.
+
     data  : pd.DataFrame 또는 pd.Series
     column: DataFrame일 때 CSI 문자열이 있는 컬럼명 (기본: 'data')
-    return: Amp (N,52), Pha (N,52)
+    return: raw (N,128) int16 (Im/Re 교차), valid (N,) bool
+            결측/파싱 실패/128개 미만 행은 0으로 남고 valid=False
     """
-    # --- Series 확보 ---
-    if isinstance(data, pd.DataFrame):
-        s = data[column]
-    else:
-        s = data  # 이미 Series인 경우
-
+    s = data[column] if isinstance(data, pd.DataFrame) else data
     N = len(s)
-    AmpCSI   = np.zeros((N, 64), dtype=np.float64)
-    PhaseCSI = np.zeros((N, 64), dtype=np.float64)
+    raw = np.zeros((N, NUM_CSI_VALUES), dtype=np.int16)
+    valid = np.zeros(N, dtype=bool)
+    if N == 0:
+        return raw, valid
+
+    fast = _fast_text_mask(s)
+    if fast.any():
+        rows = s[fast].str.strip().str[1:-1]
+        counts = rows.str.count(",").to_numpy() + 1
+        flat = np.fromstring(",".join(rows), dtype=np.int64, sep=",")
 
-    for i in range(N):
-        item = s.iat[i]  # 정수 위치 인덱싱 (KeyError 방지)
-        if pd.isna(item):
-            # 결측이면 0 그대로 두고 진행
+        # 앞 64쌍 = 128개만 사용
+        long_enough = counts >= NUM_CSI_VALUES
+        starts = (np.cumsum(counts) - counts)[long_enough]
+        rows_idx = np.flatnonzero(fast)[long_enough]
+        raw[rows_idx] = flat[starts[:, None] + np.arange(NUM_CSI_VALUES)]
+        valid[rows_idx] = True
+
+    slow = ~fast & s.notna().to_numpy(dtype=bool)
+    for i in np.flatnonzero(slow):
+        values = _literal_values(s.iat[i])
+        if values is None or len(values) < NUM_CSI_VALUES:
             continue
+        raw[i] = np.asarray(values[:NUM_CSI_VALUES], dtype=np.int64)
+        valid[i] = True
 
-        # 문자열 -> 리스트 안전 파싱
-        if isinstance(item, str):
-            values = ast.literal_eval(item.strip())
-        else:
-            # 이미 리스트/배열 형태라면 리스트로 변환
-            values = list(item)
-
-        # 실/허 교차 시퀀스 길이 보정 (앞 64쌍 = 128개만 사용)
-        if len(values) < 2*64:
-            # 필요하면 패딩 정책으로 바꿔도 됨 (여기선 스킵)
-            # 예: values = (values + [0]*(2*64 - len(values)))[:2*64]
-            raise ValueError(f"[row {i}] 값이 128개 미만: len={len(values)}")
-        values = values[:2*64]
-
-        # 짝수=Im, 홀수=Re (질문에서의 가정 유지)
-        ImCSI = np.asarray(values[::2], dtype=np.int64)   # (64,)
-        ReCSI = np.asarray(values[1::2], dtype=np.int64)  # (64,)
-
-        # 진폭/위상
-        AmpCSI[i, :]   = np.hypot(ImCSI, ReCSI)          # = sqrt(Im^2 + Re^2)
-        PhaseCSI[i, :] = np.arctan2(ImCSI, ReCSI)        # arctan2(y=Im, x=Re)
-
-    # 서브캐리어 선택: 0-based로 6..31, 33..58 -> 슬라이스 6:32, 33:59
-    Amp = np.concatenate([AmpCSI[:, 6:32],   AmpCSI[:, 33:59]], axis=1)  # (N,52)
-    Pha = np.concatenate([PhaseCSI[:, 6:32], PhaseCSI[:, 33:59]], axis=1)  # (N,52)
+    return raw, valid
+
+
+def amp_phase_from_raw(raw):
+    """
+    raw   : parse_csi_matrix가 반환한 (N,128) 행렬
+    return: Amp (N,52), Pha (N,52)
+    """
+    # 짝수=Im, 홀수=Re (질문에서의 가정 유지)
+    ImCSI = raw[:, _IM_IDXS].astype(np.float64)
+    ReCSI = raw[:, _RE_IDXS].astype(np.float64)
+
+    # 진폭/위상
+    Amp = np.hypot(ImCSI, ReCSI)          # = sqrt(Im^2 + Re^2)
+    Pha = np.arctan2(ImCSI, ReCSI)        # arctan2(y=Im, x=Re)
     return Amp, Pha
 
+
+def amp_phase_from_csi(data, column='data'):
+    """
+    data  : pd.DataFrame 또는 pd.Series
+    column: DataFrame일 때 CSI 문자열이 있는 컬럼명 (기본: 'data')
+    return: Amp (N,52), Pha (N,52)
+    """
+    s = data[column] if isinstance(data, pd.DataFrame) else data
+    raw, valid = parse_csi_matrix(s)
+
+    # 결측은 0 그대로 두고, 파싱 실패/128개 미만 행은 에러
+    bad = np.flatnonzero(~valid & s.notna().to_numpy(dtype=bool))
+    if bad.size:
+        raise ValueError(f"[row {bad[0]}] 값이 128개 미만이거나 파싱할 수 없음")
+
+    return amp_phase_from_raw(raw)
@@ -1,6 +1,61 @@
 import numpy as np
+from functools import lru_cache
 from typing import Tuple
 
+
+@lru_cache(maxsize=16)
+def _lowpass_weights(T: int, cutoff_freq_ratio: float, dtype: str) -> np.ndarray:
+    """
+    길이 T 신호의 rfft 빈별 가중치 (읽기 전용).
+
+    복소 fft 결과에 마스크 m(앞쪽 [0, c), 뒤쪽 [T-c, T))을 곱하고 실수부를 취한 결과는
+    irfft(rfft(x) * (m[k] + m[-k]) / 2)와 같습니다. +c 빈은 음의 주파수 쪽에만 남으므로 가중치가 0.5입니다.
+    """
+    cutoff_index = int(T * cutoff_freq_ratio)
+    mask = np.zeros(T)
+    mask[:cutoff_index] = 1.0
+    mask[T - cutoff_index:] = 1.0
+    w = ((mask + mask[-np.arange(T) % T]) / 2)[:T // 2 + 1].astype(dtype)
+    w.flags.writeable = False
+    return w
+
+
+class FFTLowpassFilter:
+    """
+    rfft/irfft 기반 저역 통과 필터.
+
+    실수 입력이므로 절반 크기의 rfft만 계산하고, (길이, 비율)별 가중치를 캐시해 같은 길이의 윈도우를
+    반복해서 거를 때 마스크를 다시 만들지 않습니다. axis 방향으로 여러 성분/윈도우를 한 번에 처리하며,
+    결과는 fft_lowpass_filter(1차원)와 같습니다.
+
+    예: FFTLowpassFilter(0.05)(windows, axis=1)  # windows: (B, T)
+    """
+    def __init__(self, cutoff_freq_ratio: float = 0.05):
+        self.cutoff_freq_ratio = cutoff_freq_ratio
+
+    def weights(self, T: int, dtype=np.float64) -> np.ndarray:
+        return _lowpass_weights(T, float(self.cutoff_freq_ratio), np.dtype(dtype).str)
+
+    def __call__(self, data: np.ndarray, axis: int = 0) -> np.ndarray:
+        """
+        Args:
+            data: 실수 배열. axis 방향이 시간축 (예: (T,), (T, C), (B, T)).
+            axis: 시간축.
+
+        Returns:
+            같은 모양의 필터링 결과. float32 입력은 float32로 계산합니다.
+        """
+        x = np.asarray(data)
+        if x.dtype != np.float32:
+            x = x.astype(float, copy=False)
+        T = x.shape[axis]
+        shape = [1] * x.ndim
+        shape[axis] = -1
+        spec = np.fft.rfft(x, axis=axis)
+        spec *= self.weights(T, x.dtype).reshape(shape)
+        return np.fft.irfft(spec, n=T, axis=axis)
+
+
 def fft_lowpass_filter(
     data_1d: np.ndarray,
     cutoff_freq_ratio: float = 0.05,
@@ -25,32 +80,6 @@ def fft_lowpass_filter(
     elif data_1d.ndim != 1:
         raise ValueError("입력 데이터는 1차원(T,) 또는 2차원(T, 1) 형태여야 합니다.")
         
-    T = data_1d.shape[0]
-
-    # 1. FFT 수행
-    # data_fft: 복소수 배열 (DC 성분부터 Nyquist 주파수까지 포함)
-    data_fft = np.fft.fft(data_1d)
-    
-    # 2. 필터 마스크 생성 (저역 통과 필터)
-    # FFT 결과의 인덱스는 0부터 T-1까지. 0은 DC, T/2 근처는 Nyquist 주파수.
-    # 대칭성을 고려하여 T/2 지점에서 필터링해야 함.
-    cutoff_index = int(T * cutoff_freq_ratio)
-    
-    # 마스크 생성: 저주파 성분(0 ~ cutoff_index)만 남기고 나머지는 0으로 설정
-    mask = np.zeros(T, dtype=bool)
-    
-    # DC 및 양의 주파수 성분 (0에서 cutoff_index - 1)
-    mask[:cutoff_index] = True
-    
-    # 음의 주파수 성분 (대칭되는 부분)
-    # T - (cutoff_index - 1) 부터 T-1 까지
-    mask[T - cutoff_index:] = True 
-    
-    # 3. 필터 적용
-    data_fft_filtered = data_fft * mask
-    
-    # 4. iFFT (역 고속 푸리에 변환) 수행
-    data_filtered = np.fft.ifft(data_fft_filtered)
-    
-    # 실수 성분만 추출 (필터링된 결과는 실수여야 함)
-    return np.real(data_filtered)
\ No newline at end of file
+    # rfft 후 캐시된 가중치를 곱하고 irfft (FFTLowpassFilter 참고).
+    # 기존의 복소 fft -> 마스크 -> ifft -> 실수부와 같은 결과입니다.
+    return FFTLowpassFilter(cutoff_freq_ratio)(data_1d)
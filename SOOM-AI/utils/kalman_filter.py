@@ -1,4 +1,5 @@
 import numpy as np
+from scipy.signal import lfilter
 
 def kalman_denoise_1d(
     z: np.ndarray,
@@ -63,6 +64,40 @@ def kalman_denoise_1d(
     return x_hat
 
 
+def _estimate_r(X: np.ndarray) -> np.ndarray:
+    """채널별 측정 잡음 분산 r = var(diff)/2 (kalman_denoise_1d와 같은 추정). X: (T, Ns)"""
+    T, Ns = X.shape
+    if T < 2:
+        return np.ones(Ns)
+    return np.maximum(np.var(np.diff(X, axis=0), axis=0, ddof=1) / 2.0, 1e-12)
+
+
+def steady_state_gain(q, r):
+    """
+    random walk 모델의 정상상태 칼만 이득 K.
+    예측 공분산 P는 P = P*r/(P+r) + q 의 해, 즉 P^2 - q*P - q*r = 0 -> P = (q + sqrt(q^2 + 4*q*r)) / 2.
+    """
+    q = np.asarray(q, dtype=float)
+    r = np.asarray(r, dtype=float)
+    P_pred = (q + np.sqrt(q * q + 4.0 * q * r)) / 2.0
+    return P_pred / (P_pred + r)
+
+
+def _smooth_first_order(Z: np.ndarray, K: np.ndarray, x0: np.ndarray) -> np.ndarray:
+    """
+    x_t = (1-K) x_{t-1} + K z_t  (x_{-1} = x0) 를 scipy.signal.lfilter로 시간축(axis=0)에 적용.
+    lfilter는 계수가 하나이므로 이득이 같은 채널끼리 묶어 한 번에 거릅니다. Z: (T, Ns), K/x0: (Ns,)
+    """
+    Y = np.empty_like(Z)
+    for k in np.unique(K):
+        cols = np.flatnonzero(K == k)
+        a = 1.0 - k
+        zi = (a * x0[cols])[None, :]          # lfilter 초기 상태: y_{-1} 기여분
+        b_, a_ = np.array([k], dtype=Z.dtype), np.array([1.0, -a], dtype=Z.dtype)
+        Y[:, cols], _ = lfilter(b_, a_, Z[:, cols], axis=0, zi=zi.astype(Z.dtype))
+    return Y
+
+
 def kalman_denoise_matrix(
     X: np.ndarray,
     *,
@@ -70,38 +105,65 @@ def kalman_denoise_matrix(
     r: float | None = None,
     q_factor: float = 0.01,
     axis_time_first: bool = True,
+    mode: str = "exact",
+    tol: float = 1e-12,
 ) -> np.ndarray:
     """
-    다채널 행렬에 칼만 필터를 열/행별로 적용.
+    다채널 행렬에 칼만 필터(random walk 모델)를 모든 채널에 한 번에 적용.
     - axis_time_first=True: X.shape=(T, Ns)  → 각 열을 1D로 처리
     - axis_time_first=False: X.shape=(Ns, T) → 각 행을 1D로 처리
 
+    칼만 이득 K_t는 데이터와 무관하게 (q, r, 초기 P)만으로 정해지고 정상상태 값 K로 빠르게 수렴하므로,
+    필터는 x_t = (1-K_t) x_{t-1} + K_t z_t 형태의 1차 IIR입니다.
+    - mode="exact": 이득이 정상상태에 tol 안으로 수렴할 때까지만 시간에 따라 변하는 이득으로 (채널 벡터 단위) 반복하고,
+      이후는 lfilter로 처리합니다. 결과는 채널별 kalman_denoise_1d와 (반올림 오차 수준으로) 같습니다.
+    - mode="steady": 처음부터 정상상태 이득을 쓰는 lfilter 한 번. 초기 수십~수백 샘플의 과도 구간만 다릅니다.
+
     Args:
-        X: 입력 행렬 (2D ndarray)
+        X: 입력 행렬 (2D ndarray). float32 입력은 float32로 계산합니다.
         q, r: 전 채널 공통 분산. None이면 채널별 자동(r) 추정, q=q_factor*r
         q_factor: q가 None일 때 q = q_factor * r
         axis_time_first: 시간축이 앞(T, Ns)인지 여부
+        mode: "exact" 또는 "steady"
+        tol: exact 모드에서 |K_t - K| <= tol * K 이면 정상상태로 봅니다.
 
     Returns:
         Y: 동일 shape의 denoised 행렬
     """
-    X = np.asarray(X, dtype=float)
+    if mode not in ("exact", "steady"):
+        raise ValueError("mode는 'exact' 또는 'steady'여야 합니다.")
+    X = np.asarray(X)
+    if X.dtype != np.float32:
+        X = X.astype(float, copy=False)
     if X.ndim != 2:
         raise ValueError(f"Expected 2D array, got {X.shape}")
 
-    if axis_time_first:
-        T, Ns = X.shape
-        Y = np.empty_like(X)
-        for k in range(Ns):
-            r_k = r  # 공통 r 사용 또는 None이면 채널별 추정
-            q_k = q
-            Y[:, k] = kalman_denoise_1d(X[:, k], q=q_k, r=r_k, q_factor=q_factor)
-        return Y
-    else:
-        Ns, T = X.shape
-        Y = np.empty_like(X)
-        for k in range(Ns):
-            r_k = r
-            q_k = q
-            Y[k, :] = kalman_denoise_1d(X[k, :], q=q_k, r=r_k, q_factor=q_factor)
-        return Y
+    Z = X if axis_time_first else X.T
+    T, Ns = Z.shape
+    if T == 0:
+        return X.copy()
+
+    # 채널별 r, q (kalman_denoise_1d와 같은 규칙)
+    r_vec = _estimate_r(Z.astype(float, copy=False)) if r is None else np.full(Ns, float(r))
+    q_vec = np.maximum(q_factor * r_vec, 1e-12) if q is None else np.full(Ns, float(q))
+    K_ss = steady_state_gain(q_vec, r_vec)
+
+    Y = np.empty_like(Z)
+    x = Z[0].astype(float)            # 초기 상태 x = z[0]
+    t0 = 0
+    if mode == "exact":
+        # 과도 구간: 초기 P = r 에서 시작하는 시간 가변 이득 (모든 채널 벡터로)
+        P = r_vec.copy()
+        while t0 < T:
+            P_pred = P + q_vec
+            K = P_pred / (P_pred + r_vec)
+            x = x + K * (Z[t0] - x)
+            P = (1.0 - K) * P_pred
+            Y[t0] = x
+            t0 += 1
+            if np.all(np.abs(K - K_ss) <= tol * K_ss):
+                break
+    if t0 < T:
+        Y[t0:] = _smooth_first_order(Z[t0:], K_ss.astype(Z.dtype), x.astype(Z.dtype))
+
+    return Y if axis_time_first else Y.T
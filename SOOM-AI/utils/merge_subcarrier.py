@@ -1,26 +1,40 @@
 # utils/merge_subcarrier.py
 # MRC-PCA 서브캐리어 융합
 
+from functools import lru_cache
+
 import numpy as np
 from scipy import signal
-from numpy.linalg import svd
 
-def bandpass_butter(x, fs, fmin=0.1, fmax=0.5, order=2):
+# numpy 2.0에서 trapz -> trapezoid
+_trapezoid = getattr(np, "trapezoid", None) or np.trapz
+
+
+@lru_cache(maxsize=16)
+def _butter_band(fs, fmin, fmax, order):
+    """(fs, 대역, 차수)별 butterworth 대역통과 계수 (b, a). 윈도우마다 다시 설계하지 않도록 캐시."""
     nyq = 0.5 * fs
-    b, a = signal.butter(order, [fmin/nyq, fmax/nyq], btype='band')
-    return signal.filtfilt(b, a, x)
+    return signal.butter(order, [fmin/nyq, fmax/nyq], btype='band')
 
-def snr_via_psd(x, fs, rr_band=(0.1, 0.5), nperseg=None):
+def bandpass_butter(x, fs, fmin=0.1, fmax=0.5, order=2, axis=-1):
+    """x의 axis 방향으로 zero-phase 대역통과 (2차원이면 모든 채널을 한 번에)."""
+    b, a = _butter_band(float(fs), float(fmin), float(fmax), int(order))
+    return signal.filtfilt(b, a, x, axis=axis)
+
+def snr_via_psd(x, fs, rr_band=(0.1, 0.5), nperseg=None, axis=-1):
     """
     SNR ≈ (호흡대역 에너지) / (상위대역 에너지)
+    x가 2차원이면 axis 방향을 시간축으로 보고 채널별 값을 배열로 반환합니다.
     """
-    f, Pxx = signal.welch(x, fs=fs, nperseg=nperseg)
+    f, Pxx = signal.welch(x, fs=fs, nperseg=nperseg, axis=axis)
+    Pxx = np.moveaxis(Pxx, axis, 0)  # (F, ...)
     # 호흡대역
     m1 = (f >= rr_band[0]) & (f <= rr_band[1])
     # 노이즈 대역: 호흡 상한 초과 ~ Nyquist (DC 제외)
     m2 = (f > rr_band[1]) & (f <= fs/2 * 0.999)
-    Esig = np.trapz(Pxx[m1], f[m1]) if np.any(m1) else 0.0
-    Enoi = np.trapz(Pxx[m2], f[m2]) if np.any(m2) else 0.0
+    zeros = np.zeros(Pxx.shape[1:])
+    Esig = _trapezoid(Pxx[m1], f[m1], axis=0) if np.any(m1) else zeros
+    Enoi = _trapezoid(Pxx[m2], f[m2], axis=0) if np.any(m2) else zeros
     # 안정화용 epsilon
     eps = 1e-12
     return Esig / (Enoi + eps), Esig, Enoi
@@ -41,30 +55,28 @@ def mrc_pca_fuse(X, fs, rr_band=(0.1, 0.5), welch_nperseg=None, butter_order=2,
         gains: (Ns,) 최종 gain (부호 정렬 포함)
         snr_info: dict( snr, Esig, Enoi per subcarrier )
     """
-    X = np.asarray(X)
+    X = np.asarray(X, dtype=float)
     T, Ns = X.shape
-    # 1) 각 서브캐리어 SNR 추정 (Welch)
-    snrs = np.zeros(Ns)
-    Esigs = np.zeros(Ns)
-    Enois = np.zeros(Ns)
-    for k in range(Ns):
-        snr_k, Esig_k, Enoi_k = snr_via_psd(X[:, k], fs, rr_band, welch_nperseg)
-        snrs[k], Esigs[k], Enois[k] = snr_k, Esig_k, Enoi_k
+    # 1) 각 서브캐리어 SNR 추정 (Welch, 모든 열을 axis=0으로 한 번에)
+    snrs, Esigs, Enois = snr_via_psd(X, fs, rr_band, welch_nperseg, axis=0)
 
     # 2) MRC 기본 gain ~ sqrt(SNR) (RMS_signal / RMS_noise)
     base_g = np.sqrt(np.maximum(snrs, 0.0))
     # 3) 대역통과(BP) + MRC 적용(노이즈 상한 억제 목적)
-    X_bp = np.empty_like(X, dtype=float)
-    for k in range(Ns):
-        X_bp[:, k] = bandpass_butter(X[:, k] * base_g[k], fs, rr_band[0], rr_band[1], order=butter_order)
+    #    filtfilt는 선형이므로 BP(x * g) = g * BP(x): 대역통과는 한 번만 하고 6단계에서도 재사용
+    X_bp = bandpass_butter(X, fs, rr_band[0], rr_band[1], order=butter_order, axis=0)
 
     # 4) PCA로 방향(부호) 정렬
     #  - 열(서브캐리어)별 평균 제거(공분산 안정화)
     Xc = X_bp - X_bp.mean(axis=0, keepdims=True)
-    #  - SVD로 첫 주성분(loading) 추출
-    #    Xc = U S V^T, 첫 로딩 벡터 v1 = V[:,0]; 부호는 임의이므로 나중에 통일
-    U, S, Vt = svd(Xc, full_matrices=False)
-    v1 = Vt[0, :]  # shape: (Ns,)
+    #  - (X_bp * base_g)의 Ns x Ns 공분산 = diag(g) Xc^T Xc diag(g). 첫 주성분(loading) = 최대 고유값의 고유벡터
+    #    (T x Ns 전체 SVD의 첫 오른쪽 특이벡터와 같음)
+    C = (Xc.T @ Xc) * np.outer(base_g, base_g)
+    _, V = np.linalg.eigh(C)
+    v1 = V[:, -1]  # shape: (Ns,)
+    #  - 고유벡터 부호는 임의이므로 절댓값이 가장 큰 loading이 양수가 되도록 고정 (sklearn svd_flip과 같은 규칙)
+    if v1[np.argmax(np.abs(v1))] < 0:
+        v1 = -v1
     sign_vec = np.sign(v1)
     sign_vec[sign_vec == 0] = 1.0  # 0이면 +로
 
@@ -76,15 +88,8 @@ def mrc_pca_fuse(X, fs, rr_band=(0.1, 0.5), welch_nperseg=None, butter_order=2,
         gains = gains / s  # 합=1 (절댓값 합 기준)로 안정화
 
     # 6) 최종 융합: 대역통과된 원신호(부호 교정 포함)에 gains 적용
-    #    (주의) 3단계에서 이미 base_g 를 곱해 BP 했으므로, 여기선 부호만 반영해서 합치거나
-    #           혹은 base_g 미반영 버전을 별도로 BP 해서 gains로 합치는 두 가지가 가능함.
-    #    아래는 “부호 교정 포함한 최종 gains”로 다시 가중합하는 보수적 구현:
-    X_bp2 = np.empty_like(X, dtype=float)
-    for k in range(Ns):
-        xk_bp = bandpass_butter(X[:, k], fs, rr_band[0], rr_band[1], order=butter_order)
-        X_bp2[:, k] = xk_bp
-
-    fused = X_bp2 @ gains  # (T, Ns) @ (Ns,) -> (T,)
+    #    (base_g 미반영 BP 결과 = 3단계의 X_bp)
+    fused = X_bp @ gains  # (T, Ns) @ (Ns,) -> (T,)
 
     # 출력 정보
     snr_info = {"snr": snrs, "Esig": Esigs, "Enoi": Enois}
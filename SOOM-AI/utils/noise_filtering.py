@@ -94,36 +94,47 @@ def dwt_denoise_matrix(
 ) -> np.ndarray:
     """
     다채널(예: (T, Ns) = 시간 x 서브캐리어) CSI 신호에 대해 열(column)별 1D DWT denoise.
+    채널마다 dwt_denoise_1d를 반복 호출하지 않고, 시간축으로 행렬 전체를 한 번에 분해(wavedec)/재구성(waverec)합니다.
+    임계치는 채널별 universal threshold(벡터화된 median)이고, 레벨별 수축도 모든 채널에 한 번에 적용합니다.
+    결과는 채널별로 dwt_denoise_1d를 적용한 것과 같습니다.
     """
     X = np.asarray(X, dtype=float)
-    if axis_time_first:
-        T, Ns = X.shape
-        out = np.empty_like(X)
-        for k in range(Ns):
-            out[:, k] = dwt_denoise_1d(
-                X[:, k],
-                wavelet=wavelet,
-                level=level,
-                mode=mode,
-                threshold_policy=threshold_policy,
-                shrink=shrink,
-                preserve_transients=preserve_transients,
-                per_level_scale=per_level_scale,
-            )
-        return out
-    else:
-        Ns, T = X.shape
-        out = np.empty_like(X)
-        for k in range(Ns):
-            out[k, :] = dwt_denoise_1d(
-                X[k, :],
-                wavelet=wavelet,
-                level=level,
-                mode=mode,
-                threshold_policy=threshold_policy,
-                shrink=shrink,
-                preserve_transients=preserve_transients,
-                per_level_scale=per_level_scale,
-            )
-        return out
+    axis = 0 if axis_time_first else 1
+    n = X.shape[axis]
+    w = pywt.Wavelet(wavelet)
+
+    if level is None:
+        level = pywt.dwt_max_level(n, w.dec_len)
+        level = max(1, level)
+
+    coeffs = pywt.wavedec(X, wavelet=w, mode=mode, level=level, axis=axis)
+    A = coeffs[0]
+    Ds = coeffs[1:]
+
+    if threshold_policy != "none":
+        # 채널별 임계치: D1에서 시간축 방향 MAD -> 시간축 길이 1로 유지해 브로드캐스트
+        D1 = Ds[-1]
+        med = np.median(D1, axis=axis, keepdims=True)
+        sigma = np.median(np.abs(D1 - med), axis=axis, keepdims=True) / 0.6745
+        base_tau = sigma * np.sqrt(2 * np.log(n))
 
+        new_Ds = []
+        for i, D in enumerate(Ds):
+            if preserve_transients:
+                scale_power = (len(Ds) - 1) - i
+                tau = base_tau * (per_level_scale ** scale_power)
+            else:
+                tau = base_tau
+
+            if shrink == "soft":
+                D_shrunk = np.sign(D) * np.maximum(np.abs(D) - tau, 0.0)
+            elif shrink == "hard":
+                D_shrunk = D * (np.abs(D) >= tau)
+            else:
+                raise ValueError("shrink must be 'soft' or 'hard'")
+            new_Ds.append(D_shrunk)
+        coeffs = [A] + new_Ds
+
+    out = pywt.waverec(coeffs, wavelet=w, mode=mode, axis=axis)
+    # 길이 차이가 생길 수 있어 앞부분 기준으로 맞춤
+    return out[:n] if axis_time_first else out[:, :n]
@@ -2,8 +2,13 @@
 # CSI 데이터 학습용 데이터 파서
 
 from __future__ import annotations
+import inspect
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
-from typing import Callable, Iterator, List, Tuple, Dict, Optional
+from typing import Any, Callable, Iterator, List, Tuple, Dict, Optional
 import numpy as np
 from tqdm.auto import tqdm # tqdm 임포트
 
@@ -29,7 +34,8 @@ def scan_dataset(
     for label in label_names:
         d = root / label
         for ext in exts:
-            for fp in d.glob(f"*{ext}"):
+            # 파일시스템 순서와 무관하게 항상 같은 순서 (저장/재시작 결과가 결정적)
+            for fp in sorted(d.glob(f"*{ext}")):
                 samples.append((str(fp), label_to_idx[label], label))
 
     if not samples:
@@ -99,6 +105,52 @@ def load_preprocessed_to_memory(
     return Xs, np.asarray(y_list, dtype=np.int64), p_list, label_names
 
 
+MANIFEST_NAME = "_manifest.json"
+
+
+def _accepts_timings(fn: Callable) -> bool:
+    """preprocess_fn이 timings(dict) 키워드를 받으면 단계별 시간을 수집합니다."""
+    try:
+        return "timings" in inspect.signature(fn).parameters
+    except (TypeError, ValueError):
+        return False
+
+
+def _source_signature(path: str) -> Dict[str, int]:
+    st = os.stat(path)
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def _atomic_write_json(path: Path, obj: Any) -> None:
+    """임시 파일에 쓴 뒤 os.replace로 교체 (중간에 끊겨도 이전 manifest가 남음)."""
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(obj, f, ensure_ascii=False, indent=1)
+    os.replace(tmp, path)
+
+
+def _process_one(path: str, dst: str, preprocess_fn: PreprocessFn, with_timings: bool) -> Dict[str, Any]:
+    """
+    파일 하나를 전처리해 dst(.npy)에 저장 (워커 프로세스에서 실행).
+    배열은 프로세스 사이로 보내지 않고 워커가 직접 저장하며, 예외는 결과에 담아 돌려줍니다.
+    """
+    timings: Dict[str, float] = {}
+    t0 = time.perf_counter()
+    try:
+        X = preprocess_fn(path, timings=timings) if with_timings else preprocess_fn(path)
+        t_save = time.perf_counter()
+        tmp = dst + ".tmp.npy"   # 저장이 끝난 파일만 dst 이름을 갖도록 (재시작 시 반쪽 파일 방지)
+        Path(dst).parent.mkdir(parents=True, exist_ok=True)
+        np.save(tmp, X)
+        os.replace(tmp, dst)
+        timings["save"] = time.perf_counter() - t_save
+        return {"path": path, "dst": dst, "ok": True, "shape": list(np.shape(X)),
+                "seconds": time.perf_counter() - t0, "timings": timings}
+    except Exception as e:
+        return {"path": path, "dst": dst, "ok": False, "error": f"{type(e).__name__}: {e}",
+                "seconds": time.perf_counter() - t0, "timings": timings}
+
+
 def save_preprocessed_to_disk(
     data_root: str | Path,
     out_dir: str | Path,
@@ -107,31 +159,126 @@ def save_preprocessed_to_disk(
     keep_tree: bool = True,  # True면 라벨 디렉토리 구조를 그대로 유지
     overwrite: bool = False,
     desc: Optional[str] = "Saving to disk", # tqdm 설명 추가
+    workers: Optional[int] = 1,  # 프로세스 수. None이면 os.cpu_count(), 1이면 현재 프로세스에서 실행
+    on_error: str = "warn",  # "warn" | "raise" | "skip"
+    manifest: bool = True,  # out_dir/_manifest.json에 파일별 결과를 기록하고 재시작 시 이어서 처리
+    checkpoint_every: int = 20,  # manifest를 몇 개 파일마다 저장할지
+    timings: Optional[Dict[str, float]] = None,  # 주어지면 단계별 누적 시간(초)을 채움
 ) -> List[str]:
     """
-    전처리 결과를 .npy로 디스크에 저장하고, 저장된 경로 리스트를 반환.
+    전처리 결과를 .npy로 디스크에 저장하고, 저장된 경로 리스트를 반환 (scan_dataset 순서, 실패한 파일 제외).
     진행률 표시줄(progress bar)이 표시됩니다.
+
+    - workers > 1: ProcessPoolExecutor로 파일 단위 병렬 처리. preprocess_fn은 pickle 가능한 모듈 수준 함수여야 합니다.
+    - 재시작: .npy는 임시 파일에 쓴 뒤 이름을 바꾸므로 존재하는 출력은 항상 완전합니다. overwrite=False이면
+      출력이 이미 있는 파일은 건너뛰되, manifest에 기록된 원본 크기/수정 시각이 바뀐 파일은 다시 처리합니다.
+      실패한 파일은 manifest에 에러와 함께 남고(이전 출력은 삭제) 다음 실행에서 다시 시도합니다.
+    - 단계별 시간: preprocess_fn이 timings 키워드를 받으면(예: preprocess_csi_data) 단계별 시간을 모아
+      저장("save") 시간과 함께 실행 전체에 대해 합산하고, 마지막에 요약을 출력합니다.
     """
     out_dir = Path(out_dir)
     out_dir.mkdir(parents=True, exist_ok=True)
 
     samples, _ = scan_dataset(data_root, exts)
-    saved_paths: List[str] = []
+    manifest_path = out_dir / MANIFEST_NAME
+    entries: Dict[str, Dict[str, Any]] = {}
+    if manifest and manifest_path.exists():
+        try:
+            entries = json.loads(manifest_path.read_text(encoding="utf-8")).get("files", {})
+        except (OSError, ValueError) as e:
+            tqdm.write(f"[manifest] {manifest_path} 무시 (읽기 실패: {e})")
 
-    # [개선] samples 리스트를 tqdm으로 감싸 진행률 표시
-    for path, _y, label in tqdm(samples, desc=desc):
-        src = Path(path)
-        rel_name = src.stem + ".npy"
+    # 처리할 파일 결정 (출력 경로는 입력 순서대로 고정)
+    dsts: List[str] = []
+    todo: List[int] = []
+    for i, (path, _y, label) in enumerate(samples):
         dst_dir = (out_dir / label) if keep_tree else out_dir
-        dst = dst_dir / rel_name
-
-        if dst.exists() and not overwrite:
-            saved_paths.append(str(dst))
+        dst = str(dst_dir / (Path(path).stem + ".npy"))
+        dsts.append(dst)
+        if overwrite or not os.path.exists(dst):
+            todo.append(i)
             continue
+        prev = entries.get(path)
+        if prev is not None and (prev.get("status") != "ok" or prev.get("dst") != dst
+                                 or prev.get("source") != _source_signature(path)):
+            todo.append(i)   # 지난 실행에서 실패했거나, 원본이 바뀌었거나, 다른 라벨에서 온 결과
 
-        X = preprocess_fn(path)
-        dst_dir.mkdir(parents=True, exist_ok=True)
-        np.save(str(dst), X)
-        saved_paths.append(str(dst))
+    todo_set = set(todo)
+    ok = [i not in todo_set for i in range(len(dsts))]   # 건너뛴 파일은 이미 출력이 있음
+    with_timings = _accepts_timings(preprocess_fn)
+    stage_totals: Dict[str, float] = {}
+    n_done = 0
+    failed: List[str] = []
+
+    def save_manifest():
+        if manifest:
+            _atomic_write_json(manifest_path, {"data_root": str(data_root),
+                                               "files": {k: entries[k] for k in sorted(entries)}})
+
+    def record(i: int, res: Dict[str, Any]):
+        nonlocal n_done
+        path = samples[i][0]
+        entry = {k: res[k] for k in ("dst", "seconds") if k in res}
+        entry["source"] = _source_signature(path)
+        entry["label"] = samples[i][2]
+        if res["ok"]:
+            entry.update(status="ok", shape=res["shape"])
+            ok[i] = True
+        else:
+            entry.update(status="error", error=res["error"])
+            ok[i] = False
+            # 이전 실행의 출력이 남아 있으면 유효한 결과로 취급되므로 지움
+            try:
+                os.remove(dsts[i])
+            except FileNotFoundError:
+                pass
+            failed.append(path)
+            msg = f"[preprocess error] {path}: {res['error']}"
+            if on_error == "raise":
+                entries[path] = entry
+                save_manifest()
+                raise RuntimeError(msg)
+            if on_error == "warn":
+                tqdm.write(msg)
+        entries[path] = entry
+        for k, v in res.get("timings", {}).items():
+            stage_totals[k] = stage_totals.get(k, 0.0) + v
+        n_done += 1
+        if n_done % max(1, checkpoint_every) == 0:
+            save_manifest()
+
+    n_workers = os.cpu_count() if workers is None else max(1, int(workers))
+    t_run = time.perf_counter()
+    bar = tqdm(total=len(samples), initial=len(samples) - len(todo), desc=desc)
+    try:
+        if n_workers == 1 or len(todo) <= 1:
+            for i in todo:
+                record(i, _process_one(samples[i][0], dsts[i], preprocess_fn, with_timings))
+                bar.update(1)
+        else:
+            with ProcessPoolExecutor(max_workers=n_workers) as ex:
+                futures = {ex.submit(_process_one, samples[i][0], dsts[i], preprocess_fn, with_timings): i
+                           for i in todo}
+                try:
+                    for fut in as_completed(futures):
+                        record(futures[fut], fut.result())
+                        bar.update(1)
+                except BaseException:
+                    for fut in futures:
+                        fut.cancel()
+                    raise
+    finally:
+        bar.close()
+        save_manifest()
+
+    elapsed = time.perf_counter() - t_run
+    if timings is not None:
+        timings.update(stage_totals)
+        timings["wall"] = elapsed
+    if n_done:
+        stages = " | ".join(f"{k} {v:.2f}s" for k, v in stage_totals.items())
+        tqdm.write(f"[save_preprocessed_to_disk] {n_done} files ({len(failed)} failed) in {elapsed:.1f}s "
+                   f"with {n_workers} worker(s), skipped {len(samples) - len(todo)}"
+                   + (f" | stage totals: {stages}" if stages else ""))
 
-    return saved_paths
\ No newline at end of file
+    return [d for d, good in zip(dsts, ok) if good]
@@ -1,20 +1,20 @@
 import json, os
+import time
 from paho.mqtt.client import Client
-from influxdb_client import InfluxDBClient, Point, WritePrecision
+from influxdb_client import InfluxDBClient, Point, WritePrecision, WriteOptions
 from dotenv import load_dotenv
 from datetime import timedelta, timezone, datetime
-from queue import Queue
+from queue import Queue, Empty, Full
 import threading
 
+from csi_codec import CSI_FORMAT_TEXT, apply_csi_fields
+
 # .env 로드
 load_dotenv()
 
-# 큐 생성
-data_queue = Queue()
-
 # MQTT 설정
 MQTT_BROKER = os.getenv("MQTT_BROKER")
-MQTT_PORT = int(os.getenv("MQTT_PORT"))
+MQTT_PORT = int(os.getenv("MQTT_PORT", 1883))
 MQTT_TOPIC = os.getenv("MQTT_TOPIC")
 
 # InfluxDB 설정
@@ -23,57 +23,226 @@ INFLUXDB_TOKEN = os.getenv("INFLUXDB_TOKEN")
 INFLUXDB_ORG = os.getenv("INFLUXDB_ORG")
 INFLUXDB_BUCKET = os.getenv("INFLUXDB_BUCKET")
 
-# InfluxDB 클라이언트 생성
-influx_client = InfluxDBClient(
-    url=INFLUXDB_URL,
-    token=INFLUXDB_TOKEN,
-    org=INFLUXDB_ORG
-)
-write_api = influx_client.write_api()
+# CSI 저장 형식: 1=기존 문자열, 2=base64 int8 + float 타임스탬프 (csi_codec.py 참고)
+CSI_PAYLOAD_FORMAT = int(os.getenv("CSI_PAYLOAD_FORMAT", CSI_FORMAT_TEXT))
+
+# 워커/배치 설정
+CSI_WORKERS = int(os.getenv("CSI_WORKERS", 2))                    # 큐를 비우는 워커 스레드 수
+CSI_BATCH_SIZE = int(os.getenv("CSI_BATCH_SIZE", 500))            # 워커가 한 번에 꺼내는 최대 메시지 수 / Influx 배치 크기
+CSI_FLUSH_INTERVAL_MS = int(os.getenv("CSI_FLUSH_INTERVAL_MS", 1000))  # Influx 배치 쓰기 주기
+CSI_QUEUE_MAXSIZE = int(os.getenv("CSI_QUEUE_MAXSIZE", 100000))   # 0이면 무제한. 가득 차면 버리고 dropped 증가
+CSI_METRICS_INTERVAL = float(os.getenv("CSI_METRICS_INTERVAL", 10))  # 처리량/지연 출력 주기(초)
+# 1이면 InfluxDB에 쓰지 않고 개수만 셈 (브로커만 띄워 부하 시험할 때)
+CSI_DRY_RUN = os.getenv("CSI_DRY_RUN", "0") == "1"
+
+CSI_TOPIC = "sensor/csi_measurement"
+KST = timezone(timedelta(hours=9))
+
+# 큐 생성: (수신 시각 monotonic, 수신 시각 KST, topic, payload)
+data_queue = Queue(maxsize=CSI_QUEUE_MAXSIZE)
+
+
+class Metrics:
+    """수신/쓰기 처리량과 큐 지연(수신 -> write_api 전달) 카운터."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.received = 0
+        self.dropped = 0
+        self.parse_errors = 0
+        self.queued_to_api = 0   # write_api에 넘긴 포인트 수
+        self.written = 0         # Influx가 성공을 알린 포인트 수
+        self.write_errors = 0
+        self.lag_sum = 0.0       # 지연 통계는 report 구간별 (합/개수/최대)
+        self.lag_count = 0
+        self.lag_max = 0.0
+        self._last_report = time.monotonic()
+        self._last_received = 0
+        self._last_written = 0
+
+    def add(self, **counts):
+        with self.lock:
+            for name, value in counts.items():
+                setattr(self, name, getattr(self, name) + value)
+
+    def record_batch(self, n_points, lags):
+        with self.lock:
+            self.queued_to_api += n_points
+            self.lag_sum += sum(lags)
+            self.lag_count += len(lags)
+            self.lag_max = max(self.lag_max, max(lags))
+
+    def report(self, queue_depth):
+        with self.lock:
+            now = time.monotonic()
+            dt = max(now - self._last_report, 1e-9)
+            recv_rate = (self.received - self._last_received) / dt
+            write_rate = (self.written - self._last_written) / dt
+            pending = self.queued_to_api - self.written - self.write_errors
+            avg_lag_ms = 1000.0 * self.lag_sum / self.lag_count if self.lag_count else 0.0
+            line = (f"recv={self.received} ({recv_rate:.0f}/s) written={self.written} ({write_rate:.0f}/s) "
+                    f"dropped={self.dropped} parse_errors={self.parse_errors} write_errors={self.write_errors} "
+                    f"queue={queue_depth} api_pending={pending} "
+                    f"lag avg={avg_lag_ms:.1f}ms max={1000.0 * self.lag_max:.1f}ms")
+            self._last_report = now
+            self._last_received = self.received
+            self._last_written = self.written
+            self.lag_sum = 0.0
+            self.lag_count = 0
+            self.lag_max = 0.0
+        return line
+
+
+metrics = Metrics()
+
+
+class NullWriteApi:
+    """InfluxDB 대신 쓰는 가짜 write_api. 포인트를 버리고 성공으로만 집계합니다."""
+
+    def write(self, bucket, record, **kwargs):
+        metrics.add(written=len(record) if isinstance(record, list) else 1)
+
+    def close(self):
+        pass
+
+
+def _line_count(data) -> int:
+    # 배치 write_api는 line protocol을 b"\n"으로 이어 붙인 bytes로 넘김 (한 줄 = 한 포인트)
+    return data.count(b"\n" if isinstance(data, bytes) else "\n") + 1
+
+
+def _on_write_success(conf, data: bytes):
+    metrics.add(written=_line_count(data))
+
+
+def _on_write_error(conf, data: bytes, exception):
+    metrics.add(write_errors=_line_count(data))
+    print("DB save error:", exception)
+
+
+def create_write_api():
+    """
+    배치 write_api를 만듭니다. 포인트는 write_api 내부에서 CSI_BATCH_SIZE개 또는
+    CSI_FLUSH_INTERVAL_MS마다 한 번에 전송되고, 실패 시 재시도합니다.
+    """
+    if CSI_DRY_RUN:
+        print("CSI_DRY_RUN=1: InfluxDB에 쓰지 않습니다.")
+        return None, NullWriteApi()
+
+    influx_client = InfluxDBClient(
+        url=INFLUXDB_URL,
+        token=INFLUXDB_TOKEN,
+        org=INFLUXDB_ORG
+    )
+    write_api = influx_client.write_api(
+        write_options=WriteOptions(batch_size=CSI_BATCH_SIZE, flush_interval=CSI_FLUSH_INTERVAL_MS),
+        success_callback=_on_write_success,
+        error_callback=_on_write_error,
+    )
+    return influx_client, write_api
 
 
 # MQTT 메시지 수신 → 큐에 저장
 def on_message(client, userdata, msg):
     try:
         payload = json.loads(msg.payload.decode())
-        topic = msg.topic
-        data_queue.put((topic, payload))  # 큐에 저장
     except Exception as e:
+        metrics.add(parse_errors=1)
         print("error:", e)
+        return
+    metrics.add(received=1)
+    try:
+        data_queue.put_nowait((time.monotonic(), datetime.now(KST), msg.topic, payload))  # 큐에 저장
+    except Full:
+        metrics.add(dropped=1)
 
 
-def influx_worker():
-    kst = timezone(timedelta(hours=9))
-    while True:
-        topic, payload = data_queue.get()
+def _drain(max_items):
+    """큐에서 하나를 기다려 꺼낸 뒤, 쌓여 있는 것을 max_items까지 더 꺼냅니다."""
+    try:
+        items = [data_queue.get(timeout=1.0)]
+    except Empty:
+        return []
+    while len(items) < max_items:
         try:
-            now_kst = datetime.now(kst)
-            point = None
-            if topic == "sensor/csi_measurement":
-                point = (
-                    Point("csi_measurement")
-                    .field("real_timestamp", str(payload["real_timestamp"]))  # 정밀 타임스탬프
-                    .field("data", str(payload["data"]))  # 문자열: CSI 데이터
-                    .time(now_kst, WritePrecision.MS))  # 기록 시각: 밀리초 정밀도
-
-            if point:
-                write_api.write(bucket=INFLUXDB_BUCKET, record=point)
-                print(f"[{topic}] save success")
+            items.append(data_queue.get_nowait())
+        except Empty:
+            break
+    return items
+
+
+def influx_worker(write_api, write_lock):
+    while True:
+        items = _drain(CSI_BATCH_SIZE)
+        if not items:
+            continue
+
+        points, lags = [], []
+        now = time.monotonic()
+        for received_at, recv_kst, topic, payload in items:
+            try:
+                if topic == CSI_TOPIC:
+                    points.append(
+                        apply_csi_fields(  # 정밀 타임스탬프 + CSI 데이터 (형식은 CSI_PAYLOAD_FORMAT)
+                            Point("csi_measurement"),
+                            payload["real_timestamp"],
+                            payload["data"],
+                            CSI_PAYLOAD_FORMAT)
+                        .time(recv_kst, WritePrecision.MS))  # 기록 시각(수신 시각): 밀리초 정밀도
+                    lags.append(now - received_at)
+            except Exception as e:
+                metrics.add(parse_errors=1)
+                print("CSI payload error:", e)
 
+        try:
+            if points:
+                # 배치 write_api 내부 스트림은 스레드 안전을 보장하지 않으므로 전달만 직렬화
+                with write_lock:
+                    write_api.write(bucket=INFLUXDB_BUCKET, record=points)
+                metrics.record_batch(len(points), lags)
         except Exception as e:
+            metrics.add(write_errors=len(points))
             print("DB save error:", e)
         finally:
-            data_queue.task_done()
+            for _ in items:
+                data_queue.task_done()
+
+
+def metrics_reporter():
+    while True:
+        time.sleep(CSI_METRICS_INTERVAL)
+        print(f"[csi] {metrics.report(data_queue.qsize())}")
+
+
+def main():
+    influx_client, write_api = create_write_api()
 
+    # 워커 스레드 실행
+    write_lock = threading.Lock()
+    for i in range(CSI_WORKERS):
+        threading.Thread(target=influx_worker, args=(write_api, write_lock), name=f"influx-worker-{i}", daemon=True).start()
+    threading.Thread(target=metrics_reporter, name="csi-metrics", daemon=True).start()
 
-# 워커 스레드 실행
-threading.Thread(target=influx_worker, daemon=True).start()
+    # MQTT 클라이언트 설정 및 시작
+    mqtt_client = Client(client_id="mqtt_csi_listener")
+    mqtt_client.on_message = on_message
+    mqtt_client.connect(MQTT_BROKER, MQTT_PORT)
+    mqtt_client.subscribe(MQTT_TOPIC)
+
+    print(f"MQTT listening... workers={CSI_WORKERS} batch={CSI_BATCH_SIZE} Ctrl+C to exit")
+    try:
+        mqtt_client.loop_forever()
+    except KeyboardInterrupt:
+        print("\nstopping...")
+    finally:
+        mqtt_client.disconnect()
+        data_queue.join()
+        # 남은 배치를 모두 전송
+        write_api.close()
+        if influx_client:
+            influx_client.close()
+        print(f"[csi] {metrics.report(data_queue.qsize())}")
 
-# MQTT 클라이언트 설정 및 시작
-mqtt_client = Client(client_id="mqtt_csi_listener")
-mqtt_client.on_message = on_message
-mqtt_client.connect(MQTT_BROKER, MQTT_PORT)
-mqtt_client.subscribe(MQTT_TOPIC)
 
-print("MQTT listening... Ctrl+C to exit")
-mqtt_client.loop_forever()
+if __name__ == "__main__":
+    main()
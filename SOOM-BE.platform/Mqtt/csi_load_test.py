@@ -0,0 +1,51 @@
+import argparse, json, os
+import random
+import time
+from paho.mqtt.client import Client
+from dotenv import load_dotenv
+
+# csi_data.py 부하 시험용 발행기: 여러 수신기(방)가 CSI 프레임을 보내는 상황을 흉내냅니다.
+# 로컬 브로커(mosquitto 등) + `CSI_DRY_RUN=1 python3 csi_data.py` 와 함께 쓰면 InfluxDB 없이도 확인할 수 있습니다.
+#
+#   python3 csi_load_test.py --rooms 8 --rate 60 --seconds 30
+
+load_dotenv()
+
+MQTT_BROKER = os.getenv("MQTT_BROKER", "localhost")
+MQTT_PORT = int(os.getenv("MQTT_PORT", 1883))
+CSI_TOPIC = "sensor/csi_measurement"
+
+
+def fake_frame(t0):
+    values = [random.randint(-30, 30) for _ in range(128)]
+    return {"real_timestamp": f"{time.monotonic() - t0:.3f}", "data": "[" + ",".join(map(str, values)) + "]"}
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Publish synthetic CSI frames for csi_data.py")
+    ap.add_argument("--rooms", type=int, default=4, help="number of simulated receivers")
+    ap.add_argument("--rate", type=float, default=60.0, help="frames per second per receiver")
+    ap.add_argument("--seconds", type=float, default=30.0)
+    args = ap.parse_args()
+
+    client = Client(client_id="csi_load_test")
+    client.connect(MQTT_BROKER, MQTT_PORT)
+    client.loop_start()
+
+    total_rate = args.rooms * args.rate
+    n_total = int(total_rate * args.seconds)
+    t0 = time.monotonic()
+    for i in range(n_total):
+        client.publish(CSI_TOPIC, json.dumps(fake_frame(t0)))
+        delay = t0 + (i + 1) / total_rate - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+    elapsed = time.monotonic() - t0
+    print(f"published {n_total} frames in {elapsed:.1f}s ({n_total / elapsed:.0f}/s, {args.rooms} rooms)")
+    client.loop_stop()
+    client.disconnect()
+
+
+if __name__ == "__main__":
+    main()
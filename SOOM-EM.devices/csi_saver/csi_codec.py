@@ -0,0 +1,53 @@
+# csi_codec.py
+# InfluxDB `csi_measurement` 페이로드 인코딩 (쓰기 전용, numpy 없이 동작)
+#
+#   v1 (text)  : data="[i,r,i,r,...]" 문자열, real_timestamp 문자열 필드 (기존 형식, 태그 없음)
+#   v2 (packed): data=base64(int8 x 128) 문자열, real_ts float 필드, 태그 csi_fmt="2"
+#
+# 읽기 쪽 디코더는 SOOM-AI.OnDevice/utils/csi_codec.py 에 있습니다.
+# 형식을 바꿀 때는 SOOM-EM.devices/csi_saver/, SOOM-BE.platform/Mqtt/ 의 이 파일과 함께 맞춰야 합니다.
+
+import base64
+from array import array
+
+CSI_FORMAT_TEXT = 1
+CSI_FORMAT_PACKED = 2
+
+CSI_FORMAT_TAG = "csi_fmt"
+DATA_FIELD = "data"
+TEXT_TIMESTAMP_FIELD = "real_timestamp"
+# v2는 float 필드라서 기존 문자열 필드(real_timestamp)와 타입이 충돌하지 않도록 이름을 분리
+PACKED_TIMESTAMP_FIELD = "real_ts"
+
+
+def to_int_values(data) -> list:
+    """list / tuple / "[...]" 문자열을 정수 리스트로 변환합니다."""
+    if isinstance(data, str):
+        body = data.strip().strip("[]")
+        return [int(v) for v in body.split(",")] if body.strip() else []
+    return [int(v) for v in data]
+
+
+def encode_packed(data) -> str:
+    """CSI 값을 int8로 묶어 base64 문자열로 인코딩합니다."""
+    return base64.b64encode(array("b", to_int_values(data)).tobytes()).decode("ascii")
+
+
+def apply_csi_fields(point, real_timestamp, data, fmt: int = CSI_FORMAT_TEXT):
+    """
+    influxdb_client Point에 선택한 형식의 CSI 필드(및 버전 태그)를 채워 반환합니다.
+
+    Args:
+        point: influxdb_client.Point
+        real_timestamp: ESP32 타임스탬프 (문자열 또는 숫자)
+        data: CSI 값 (list / "[...]" 문자열)
+        fmt (int): CSI_FORMAT_TEXT 또는 CSI_FORMAT_PACKED
+    """
+    if fmt == CSI_FORMAT_PACKED:
+        return point \
+            .tag(CSI_FORMAT_TAG, str(CSI_FORMAT_PACKED)) \
+            .field(PACKED_TIMESTAMP_FIELD, float(real_timestamp)) \
+            .field(DATA_FIELD, encode_packed(data))
+    return point \
+        .field(TEXT_TIMESTAMP_FIELD, str(real_timestamp)) \
+        .field(DATA_FIELD, str(data))
@@ -1,9 +1,16 @@
+import os
+import queue
+import threading
+import time
 import serial
 import pytz
 from datetime import datetime
 from influxdb_client import InfluxDBClient, Point, WritePrecision
 from influxdb_client.client.write_api import SYNCHRONOUS
 
+from csi_codec import CSI_FORMAT_TEXT, CSI_FORMAT_PACKED, apply_csi_fields
+from serial_reader import SerialCSIReader
+
 INFLUX_URL = "http://localhost:8086"
 INFLUX_TOKEN = "YOUR_INFLUX_TOKEN"
 INFLUX_ORG = "YOUR_ORG"
@@ -12,78 +19,279 @@ INFLUX_BUCKET = "YOUR_BUCKET"
 SERIAL_PORT = "/dev/ttyAMA2"
 BAUD_RATE = 921600
 
+# CSI_FORMAT_TEXT: 기존 문자열 형식, CSI_FORMAT_PACKED: base64 int8 + float 타임스탬프 (csi_codec.py 참고)
+CSI_PAYLOAD_FORMAT = CSI_FORMAT_TEXT
+
+# 시리얼 수신 스레드 -> 큐 -> Influx 쓰기 스레드
+READ_BATCH_SIZE = 64         # 시리얼 리더가 한 번에 넘기는 최대 프레임 수 (serial_reader.py)
+QUEUE_MAXSIZE = 2000         # 큐 크기(리더 배치 단위). 가득 차면 새 배치는 버리고 drop 카운터 증가 (시리얼 읽기는 절대 막지 않음)
+BATCH_SIZE = 500             # 이 개수만큼 모이면 바로 쓰기
+FLUSH_INTERVAL_SEC = 1.0     # 개수가 덜 차도 이 시간이 지나면 쓰기
+STATS_INTERVAL_SEC = 10.0    # 카운터 출력 주기 (프레임마다 출력하지 않음)
+
+# DB에 쓸 수 없을 때 line protocol로 저장해 두는 파일. 연결이 복구되면 다시 보내고 삭제.
+# 같은 시리즈/타임스탬프의 포인트는 Influx에서 덮어쓰므로 재전송 중 일부가 중복돼도 문제 없음.
+SPILL_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "csi_spill.lp")
+SPILL_RETRY_SEC = 5.0        # 쓰기 실패 후 DB 재시도 간격
+
+# 포인트 _time = ESP 타임스탬프 + (수신 시각 - ESP 타임스탬프) 오프셋.
+# 배치로 몰려 들어와도 프레임 간격이 유지되고, 오차가 이 값을 넘으면(ESP 재부팅 등) 오프셋을 다시 맞춤.
+CLOCK_RESYNC_MS = 1000
+
 KST = pytz.timezone('Asia/Seoul')
 
+
+class SaverStats:
+    """Thread-safe counters shared by the reader and writer threads."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.received = 0
+        self.format_errors = 0
+        self.dropped = 0
+        self.written = 0
+        self.spilled = 0
+        self.replayed = 0
+        self.write_errors = 0
+        self.batches = 0
+        self.latency_sum = 0.0
+        self.latency_max = 0.0
+
+    def add(self, **counts):
+        with self.lock:
+            for name, value in counts.items():
+                setattr(self, name, getattr(self, name) + value)
+
+    def record_write(self, n_points, latency):
+        with self.lock:
+            self.written += n_points
+            self.batches += 1
+            self.latency_sum += latency
+            self.latency_max = max(self.latency_max, latency)
+
+    def report(self, queue_depth):
+        with self.lock:
+            avg_ms = 1000.0 * self.latency_sum / self.batches if self.batches else 0.0
+            line = (f"recv={self.received} written={self.written} dropped={self.dropped} "
+                    f"spilled={self.spilled} replayed={self.replayed} "
+                    f"write_errors={self.write_errors} format_errors={self.format_errors} "
+                    f"queue={queue_depth}/{QUEUE_MAXSIZE} "
+                    f"write_latency avg={avg_ms:.1f}ms max={1000.0 * self.latency_max:.1f}ms")
+            # 지연 시간은 구간별로 보고
+            self.batches = 0
+            self.latency_sum = 0.0
+            self.latency_max = 0.0
+        return line
+
+
+def serial_reader(csi_reader, frame_queue, stats, stop_event):
+    """
+    SerialCSIReader가 묶어 준 (ESP 타임스탬프, int8 CSI 행렬, 원본 텍스트) 배치에 프레임별 _time(ms)을 붙여 큐에 넣습니다.
+    DB 상태와 무관하게 항상 계속 읽어야 하므로 큐가 가득 차면 기다리지 않고 버립니다.
+    """
+    skipped = 0
+    offset_ms = None
+    last_ms = -1
+    try:
+        for esp_ts, raw, texts in csi_reader.read_batches():
+            recv_ms = time.time_ns() // 1_000_000
+            esp_ms = esp_ts * 1000.0
+            if offset_ms is None or abs(recv_ms - (esp_ms[-1] + offset_ms)) > CLOCK_RESYNC_MS:
+                offset_ms = recv_ms - esp_ms[-1]
+            times_ms = (esp_ms + offset_ms).round().astype("int64")
+            if times_ms[0] <= last_ms:
+                # 재동기화로 시간이 뒤로 가면 이전 배치와 겹치지 않도록 밀어냄
+                shift = last_ms + 1 - times_ms[0]
+                offset_ms += shift
+                times_ms += shift
+            last_ms = times_ms[-1]
+            try:
+                frame_queue.put_nowait((times_ms, texts, raw))
+                stats.add(received=len(esp_ts))
+            except queue.Full:
+                stats.add(received=len(esp_ts), dropped=len(esp_ts))
+
+            stats.add(format_errors=csi_reader.skipped_lines - skipped)
+            skipped = csi_reader.skipped_lines
+            if stop_event.is_set():
+                break
+    except serial.SerialException as e:
+        print(f"Serial port error: {e}")
+    except Exception as e:
+        print(f"An error occurred while reading serial data: {e}")
+    finally:
+        stop_event.set()
+
+
+def _to_points(item):
+    """
+    리더 배치 하나를 Point 목록으로 변환합니다.
+    프레임마다 서로 다른 _time이 필요합니다. (같은 _time이면 Influx에서 덮어씀)
+    real_timestamp와 텍스트 형식의 data는 ESP가 보낸 문자열 그대로 저장합니다 (정밀도/값 개수 유지).
+    """
+    times_ms, texts, raw = item
+    points = []
+    for t_ms, (ts_token, payload), row in zip(times_ms.tolist(), texts, raw):
+        # packed 형식은 정의상 int8 128개이므로 파싱된 값을 사용
+        data = row.tolist() if CSI_PAYLOAD_FORMAT == CSI_FORMAT_PACKED else payload.decode("ascii")
+        points.append(apply_csi_fields(
+            Point("csi_measurement"), ts_token.decode("ascii"), data, CSI_PAYLOAD_FORMAT
+        ).time(t_ms, WritePrecision.MS))
+    return points
+
+
+def _write_records(write_api, records):
+    write_api.write(bucket=INFLUX_BUCKET, org=INFLUX_ORG, record=records,
+                    write_precision=WritePrecision.MS)
+
+
+def _spill(lines, stats):
+    """쓰지 못한 배치를 line protocol로 파일 끝에 추가합니다."""
+    try:
+        with open(SPILL_FILE, "a", encoding="utf-8") as f:
+            f.write("\n".join(lines))
+            f.write("\n")
+        stats.add(spilled=len(lines))
+    except OSError as e:
+        # 디스크도 쓸 수 없으면 버릴 수밖에 없음
+        print(f"Spill file write error: {e}")
+        stats.add(dropped=len(lines))
+
+
+def _replay_spill(write_api, stats):
+    """
+    스필 파일을 BATCH_SIZE 단위로 다시 보냅니다. 모두 성공하면 파일을 지우고 True,
+    중간에 실패하면 파일을 그대로 두고 False를 반환합니다.
+    """
+    if not os.path.exists(SPILL_FILE):
+        return True
+    try:
+        with open(SPILL_FILE, "r", encoding="utf-8") as f:
+            batch = []
+            for line in f:
+                line = line.rstrip("\n")
+                if not line:
+                    continue
+                batch.append(line)
+                if len(batch) >= BATCH_SIZE:
+                    _write_records(write_api, batch)
+                    stats.add(replayed=len(batch))
+                    batch = []
+            if batch:
+                _write_records(write_api, batch)
+                stats.add(replayed=len(batch))
+        os.remove(SPILL_FILE)
+        print("Spill file replayed to InfluxDB.")
+        return True
+    except Exception as e:
+        print(f"Spill replay failed (will retry): {e}")
+        stats.add(write_errors=1)
+        return False
+
+
+def influx_writer(write_api, frame_queue, stats, stop_event):
+    """
+    큐에서 리더 배치를 모아 BATCH_SIZE개 이상 또는 FLUSH_INTERVAL_SEC마다 한 번에 씁니다.
+    쓰기에 실패하면 배치를 스필 파일에 남기고, SPILL_RETRY_SEC 뒤에 DB를 다시 시도합니다.
+    """
+    db_ok = not os.path.exists(SPILL_FILE)
+    next_retry = 0.0
+    next_report = time.monotonic() + STATS_INTERVAL_SEC
+
+    while not (stop_event.is_set() and frame_queue.empty()):
+        points = []
+        deadline = time.monotonic() + FLUSH_INTERVAL_SEC
+        while len(points) < BATCH_SIZE:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                item = frame_queue.get(timeout=timeout)
+            except queue.Empty:
+                if stop_event.is_set():
+                    break
+                continue
+            try:
+                points.extend(_to_points(item))
+            except Exception as e:
+                # 변환 실패한 배치 하나만 버리고 쓰기 스레드는 계속 동작 (스레드가 죽으면 이후 프레임이 모두 버려짐)
+                print(f"Point conversion error, dropping batch of {len(item[0])} frames: {e}")
+                stats.add(format_errors=len(item[0]))
+
+        now = time.monotonic()
+        if not db_ok and now >= next_retry:
+            # 먼저 쌓인 스필을 비워야 순서가 크게 뒤섞이지 않음
+            db_ok = _replay_spill(write_api, stats)
+            next_retry = now + SPILL_RETRY_SEC
+
+        if points:
+            if db_ok:
+                t0 = time.perf_counter()
+                try:
+                    _write_records(write_api, points)
+                    stats.record_write(len(points), time.perf_counter() - t0)
+                except Exception as e:
+                    print(f"InfluxDB write error, spilling to {SPILL_FILE}: {e}")
+                    stats.add(write_errors=1)
+                    db_ok = False
+                    next_retry = time.monotonic() + SPILL_RETRY_SEC
+            if not db_ok:
+                _spill([p.to_line_protocol() for p in points], stats)
+
+        if now >= next_report:
+            print(f"[{datetime.now(KST).strftime('%Y-%m-%d %H:%M:%S')}] {stats.report(frame_queue.qsize())}")
+            next_report = now + STATS_INTERVAL_SEC
+
+
 def main():
     print(f"Attempting to connect to InfluxDB: {INFLUX_URL}")
     try:
         client = InfluxDBClient(url=INFLUX_URL, token=INFLUX_TOKEN, org=INFLUX_ORG)
         write_api = client.write_api(write_options=SYNCHRONOUS)
-        
-        # InfluxDB 연결 확인
-        if not client.ping():
-            print("InfluxDB connection failed. Check your settings (URL, Token).")
-            return
-        print("InfluxDB connection successful.")
-        
+
+        # InfluxDB 연결 확인 (실패해도 스필 파일에 저장하며 계속 수신)
+        if client.ping():
+            print("InfluxDB connection successful.")
+        else:
+            print(f"InfluxDB is not reachable. Data will be spilled to {SPILL_FILE} until it recovers.")
+
     except Exception as e:
         print(f"InfluxDB client initialization error: {e}")
         return
 
     ser = None
+    csi_reader = None
+    stats = SaverStats()
+    frame_queue = queue.Queue(maxsize=QUEUE_MAXSIZE)
+    stop_event = threading.Event()
+    writer = threading.Thread(target=influx_writer, args=(write_api, frame_queue, stats, stop_event),
+                              name="influx-writer", daemon=True)
     try:
         print(f"Attempt to open serial port: {SERIAL_PORT} (Baud: {BAUD_RATE})")
         ser = serial.Serial(SERIAL_PORT, BAUD_RATE, timeout=1)
         print("Serial port connection successful. Waiting for data to be received...")
 
-        while True:
-            try:
-                line_bytes = ser.readline()
-                if not line_bytes:
-                    continue
-
-                line = line_bytes.decode('utf-8').strip()
-
-                if not line:
-                    continue
+        csi_reader = SerialCSIReader(ser, batch_size=READ_BATCH_SIZE, timestamp_field=0, keep_text=True)
+        reader = threading.Thread(target=serial_reader, args=(csi_reader, frame_queue, stats, stop_event),
+                                  name="serial-reader", daemon=True)
+        writer.start()
+        reader.start()
+        while reader.is_alive():
+            reader.join(timeout=0.5)
 
-                parts = line.split(',', 1)
-                
-                if len(parts) == 2:
-                    esp_timestamp_str = parts[0]
-                    csi_data_str = parts[1].strip('"')
-                    
-                    payload = {
-                        "real_timestamp": esp_timestamp_str,
-                        "data": csi_data_str
-                    }
-                    
-                    now_kst = datetime.now(KST)
-
-                    point = Point("csi_measurement") \
-                        .field("real_timestamp", str(payload["real_timestamp"])) \
-                        .field("data", str(payload["data"])) \
-                        .time(now_kst, WritePrecision.MS)
-
-                    write_api.write(bucket=INFLUX_BUCKET, org=INFLUX_ORG, record=point)
-                    
-                    print(f"[{now_kst.strftime('%Y-%m-%d %H:%M:%S')}] Data storage success: TS={esp_timestamp_str}")
-
-                else:
-                    print(f"Data format error (ignored): {line}")
-
-            except UnicodeDecodeError:
-                print("Serial data decoding error. (Ignored)")
-            except Exception as e:
-                print(f"An error occurred while processing data: {e}")
-                
     except serial.SerialException as e:
         print(f"Serial port error: {e}")
         print(f"'{SERIAL_PORT}'Make sure it is the correct port and has permissions.")
     except KeyboardInterrupt:
         print("\nRequest to stop script (Ctrl+C).")
     finally:
-        # 리소스 정리
+        # 남은 큐를 비우고 리소스 정리
+        stop_event.set()
+        if csi_reader:
+            csi_reader.stop()
+        if writer.is_alive():
+            writer.join(timeout=FLUSH_INTERVAL_SEC + 10)
+        print(stats.report(frame_queue.qsize()))
         if ser and ser.is_open:
             ser.close()
             print("시리얼 포트 닫힘.")
@@ -92,4 +300,4 @@ def main():
             print("InfluxDB client closed.")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()